@@ -0,0 +1,9 @@
+from benchmarks.synthetic import synthetic_ohlcv, candle_chunks
+from benchmarks.suite import (
+    BENCHMARKS, run_benchmarks, compare, parse_size, format_size
+)
+
+__all__ = [
+    "synthetic_ohlcv", "candle_chunks", "BENCHMARKS", "run_benchmarks",
+    "compare", "parse_size", "format_size"
+]
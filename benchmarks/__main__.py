@@ -0,0 +1,109 @@
+"""
+Runs the benchmark suite and compares it against a stored baseline.
+
+    python -m benchmarks --sizes 10k,1m --output results.json
+    python -m benchmarks --sizes 10k,1m --update-baseline
+
+The run fails with exit status 1 if any benchmark is slower, or uses
+more memory, than the baseline by more than the tolerance, and with
+exit status 2 if there is no baseline for a benchmark that was run.
+Baselines are only comparable on the machine they were recorded on,
+so record one with --update-baseline before comparing against it.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from benchmarks.suite import BENCHMARKS, run_benchmarks, compare, parse_size
+
+_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks the engine core on synthetic OHLCV data."
+    )
+    parser.add_argument(
+        "--sizes", default="10k",
+        help="comma separated numbers of candles, ie. 10k,1m,10m"
+    )
+    parser.add_argument(
+        "--only", default=None,
+        help=(
+            "comma separated benchmarks to run, from: "
+            f"{', '.join(BENCHMARKS)}"
+        )
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="timed runs of each benchmark, the fastest is kept"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true",
+        help="skip the tracemalloc run that measures peak memory"
+    )
+    parser.add_argument(
+        "--output", default=None, help="file to save the results to as json"
+    )
+    parser.add_argument(
+        "--baseline", default=_BASELINE,
+        help="results to compare against, recorded with --update-baseline"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1,
+        help="fraction a benchmark may be worse than the baseline by"
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true",
+        help="save the results as the baseline instead of comparing"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        [parse_size(s) for s in args.sizes.split(",")],
+        args.only.split(",") if args.only else None,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        log=print
+    )
+
+    if args.output:
+        _save(args.output, results)
+
+    if args.update_baseline:
+        _save(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(
+            f"No baseline at {args.baseline}, record one with "
+            f"--update-baseline"
+        )
+        return 2
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    missing = [k for k in results["results"] if k not in baseline["results"]]
+
+    for key in missing:
+        print(f"MISSING {key}: not in the baseline")
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if regressions:
+        return 1
+
+    return 2 if missing else 0
+
+def _save(path: str, results: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+from __future__ import annotations
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+import gc
+import platform
+import tracemalloc
+import numpy as np
+import pandas as pd
+from finance_types import Candle, CandleList
+from handlers import DataHandler, IndicatorBase, StrategyBase
+from indicators import SMA, EMA, RSI, ATR, BollingerBands
+from engine import Engine
+from benchmarks.synthetic import synthetic_ohlcv, candle_chunks
+
+# Each benchmark is given the data and returns the seconds spent in
+# the part it measures
+Benchmark = Callable[[pd.DataFrame], float]
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+
+def bench_candle_construction(data: pd.DataFrame) -> float:
+    """
+    Candle.from_timestamp for every row, as the engine creates them.
+    """
+    tz = data.index.tz
+    columns = [data.index.as_unit("ns").asi8]
+    columns += [data[c].to_numpy() for c in _COLUMNS]
+    seconds = 0.0
+
+    for start in range(0, len(data), 65536):
+        rows = list(zip(*(c[start:start + 65536].tolist() for c in columns)))
+
+        began = perf_counter()
+        for row in rows:
+            Candle.from_timestamp(*row, tz)
+        seconds += perf_counter() - began
+
+    return seconds
+
+def bench_candle_list_add(data: pd.DataFrame) -> float:
+    """
+    CandleList.add of every candle into a list that keeps them all.
+    """
+    return _add_all(CandleList(), data)
+
+def bench_candle_list_add_bounded(data: pd.DataFrame) -> float:
+    """
+    CandleList.add of every candle into a list with a max_length.
+    """
+    return _add_all(CandleList(max_length=1024), data)
+
+def bench_candle_list_compress(data: pd.DataFrame) -> float:
+    """
+    CandleList.compress of the last 5 candles after every candle.
+    """
+    candles = CandleList(max_length=5)
+    seconds = 0.0
+
+    for chunk in candle_chunks(data):
+        began = perf_counter()
+        for candle in chunk:
+            candles.add(candle)
+            candles.compress()
+        seconds += perf_counter() - began
+
+    return seconds
+
+def bench_attempt_compress(data: pd.DataFrame) -> float:
+    """
+    DataHandler.update of every candle into a handler whose indicators
+    are at 5, 15 and 60 times its frequency, so every candle goes
+    through DataHandler._attempt_compress.
+    """
+    handler = _Handler()
+    handler.frequency = _frequency(data)
+
+    for multiple in (5, 15, 60):
+        indicator = _Indicator()
+        indicator.frequency = handler.frequency * multiple
+        handler.indicators[f"x{multiple}"] = indicator
+
+    seconds = 0.0
+
+    for chunk in candle_chunks(data):
+        began = perf_counter()
+        for candle in chunk:
+            handler.update(candle)
+        seconds += perf_counter() - began
+
+    return seconds
+
+def bench_engine_bare(data: pd.DataFrame) -> float:
+    """
+    Engine.run of a strategy without indicators.
+    """
+    return _run_engine(data, lambda frequency: {})
+
+def bench_engine_wide(data: pd.DataFrame) -> float:
+    """
+    Engine.run of a strategy with 8 indicators at its own frequency.
+    """
+    return _run_engine(data, lambda frequency: {
+        **{f"sma{p}": SMA(p) for p in (5, 10, 20, 50, 100, 200)},
+        "ema12": EMA(12),
+        "ema26": EMA(26)
+    })
+
+def bench_engine_deep(data: pd.DataFrame) -> float:
+    """
+    Engine.run of a strategy with a chain of 4 nested indicators.
+    """
+    def tree(frequency: timedelta) -> dict:
+        top = current = SMA(20)
+
+        for name, child in (("rsi", RSI()), ("atr", ATR()), ("ema", EMA(10))):
+            current.indicators[name] = child
+            current = child
+
+        return {"sma": top}
+
+    return _run_engine(data, tree)
+
+def bench_engine_multi_timeframe(data: pd.DataFrame) -> float:
+    """
+    Engine.run of a strategy with indicators at 1, 5, 15 and 60 times
+    its frequency.
+    """
+    def tree(frequency: timedelta) -> dict:
+        indicators = {}
+
+        for multiple in (1, 5, 15, 60):
+            for name, indicator in (
+                ("sma", SMA(20)), ("bands", BollingerBands())
+            ):
+                indicator.frequency = frequency * multiple
+                indicators[f"{name}{multiple}"] = indicator
+
+        return indicators
+
+    return _run_engine(data, tree)
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "candle_construction": bench_candle_construction,
+    "candle_list_add": bench_candle_list_add,
+    "candle_list_add_bounded": bench_candle_list_add_bounded,
+    "candle_list_compress": bench_candle_list_compress,
+    "attempt_compress": bench_attempt_compress,
+    "engine_bare": bench_engine_bare,
+    "engine_wide": bench_engine_wide,
+    "engine_deep": bench_engine_deep,
+    "engine_multi_timeframe": bench_engine_multi_timeframe
+}
+
+def run_benchmarks(
+    sizes: Iterable[int],
+    names: Iterable[str] = None,
+    repeat: int = 3,
+    memory: bool = True,
+    log: Callable[[str], None] = None
+) -> dict:
+    """
+    Runs the benchmarks on synthetic data of each size.
+
+    Each benchmark is timed `repeat` times and the fastest is kept, as
+    the slower runs only measure noise from the rest of the machine.
+    Peak memory is measured with tracemalloc in a separate run, so its
+    overhead doesn't slow the timed runs.
+
+    Args:
+        sizes (Iterable[int]): The numbers of candles to run on.
+        names (Iterable[str], optional): The benchmarks to run.
+            Defaults to None, which runs all of BENCHMARKS.
+        repeat (int, optional): Number of timed runs of each benchmark.
+            Defaults to 3.
+        memory (bool, optional): Whether to measure peak memory.
+            Defaults to True.
+        log (Callable[[str], None], optional): Called with a line for
+            each result. Defaults to None.
+
+    Raises:
+        ValueError: A name is not a benchmark.
+
+    Returns:
+        dict: The machine the benchmarks ran on under "meta", and under
+            "results" the bars, seconds, bars per second and peak memory
+            in bytes of each benchmark, keyed "<name>@<size>".
+    """
+    names = list(names or BENCHMARKS)
+
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(
+                f"Unknown benchmark: {name} | Expected one of: "
+                f"{', '.join(BENCHMARKS)}"
+            )
+
+    results = {}
+
+    for size in sizes:
+        data = synthetic_ohlcv(size)
+
+        for name in names:
+            benchmark = BENCHMARKS[name]
+
+            seconds = min(_timed(benchmark, data) for _ in range(repeat))
+            peak = _peak_memory(benchmark, data) if memory else None
+
+            result = {
+                "benchmark": name,
+                "bars": size,
+                "seconds": seconds,
+                "bars_per_second": size / seconds if seconds else None,
+                "peak_memory": peak
+            }
+            results[f"{name}@{format_size(size)}"] = result
+
+            if log:
+                log(_describe(f"{name}@{format_size(size)}", result))
+
+        del data
+
+    return {"meta": _meta(), "results": results}
+
+def compare(
+    results: dict, baseline: dict, tolerance: float = 0.1
+) -> list[str]:
+    """
+    Finds the benchmarks that got slower, or use more memory, than in
+    the baseline by more than `tolerance`. Benchmarks missing from
+    either are skipped.
+
+    Args:
+        results (dict): The results returned by run_benchmarks.
+        baseline (dict): Results to compare against, in the same form.
+        tolerance (float, optional): The fraction a benchmark may be
+            worse by. Defaults to 0.1.
+
+    Returns:
+        list[str]: A description of each regression, empty if none.
+    """
+    regressions = []
+
+    for key, result in results["results"].items():
+        base = baseline["results"].get(key)
+
+        if base is None:
+            continue
+
+        speed, base_speed = result["bars_per_second"], base["bars_per_second"]
+        if speed and base_speed and speed < base_speed * (1 - tolerance):
+            regressions.append(
+                f"{key}: {speed:,.0f} bars/s | Baseline: {base_speed:,.0f} "
+                f"bars/s ({speed / base_speed - 1:+.1%})"
+            )
+
+        peak, base_peak = result["peak_memory"], base["peak_memory"]
+        if peak and base_peak and peak > base_peak * (1 + tolerance):
+            regressions.append(
+                f"{key}: {peak / 2**20:,.1f} MiB peak | Baseline: "
+                f"{base_peak / 2**20:,.1f} MiB ({peak / base_peak - 1:+.1%})"
+            )
+
+    return regressions
+
+def parse_size(size: str) -> int:
+    """
+    Reads a number of candles written like 10k, 1m or 10000.
+
+    Args:
+        size (str): The number, optionally suffixed with k or m.
+
+    Raises:
+        ValueError: size is not a number of candles.
+
+    Returns:
+        int: The number of candles.
+    """
+    text = size.strip().lower()
+    multiple = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+
+    try:
+        value = int(float(text[:-1] if multiple > 1 else text) * multiple)
+    except ValueError:
+        raise ValueError(f"Invalid size: {size}") from None
+
+    if value < 2:
+        raise ValueError(f"Size must be at least 2 | Actual: {size}")
+
+    return value
+
+def format_size(size: int) -> str:
+    """
+    Writes a number of candles the way parse_size reads it, ie. 10k.
+    """
+    for suffix, multiple in (("m", 1_000_000), ("k", 1_000)):
+        if size % multiple == 0:
+            return f"{size // multiple}{suffix}"
+
+    return str(size)
+
+class _Handler(DataHandler):
+    def on_candle(self) -> None:
+        pass
+
+class _Indicator(IndicatorBase):
+    pass
+
+class _Strategy(StrategyBase):
+    def on_candle(self) -> None:
+        pass
+
+def _add_all(candles: CandleList, data: pd.DataFrame) -> float:
+    """
+    Times adding every candle of the data to the list.
+    """
+    seconds = 0.0
+
+    for chunk in candle_chunks(data):
+        began = perf_counter()
+        for candle in chunk:
+            candles.add(candle)
+        seconds += perf_counter() - began
+
+    return seconds
+
+def _run_engine(
+    data: pd.DataFrame, tree: Callable[[timedelta], dict]
+) -> float:
+    """
+    Times a full engine run of a strategy holding the indicators made
+    by `tree` for the frequency of the data.
+    """
+    strategy = _Strategy()
+
+    for name, indicator in tree(_frequency(data)).items():
+        strategy.indicators[name] = indicator
+
+    engine = Engine()
+    engine.load_data(data)
+    engine.load_strategy(strategy)
+
+    began = perf_counter()
+    engine.run()
+    return perf_counter() - began
+
+def _frequency(data: pd.DataFrame) -> timedelta:
+    return (data.index[1] - data.index[0]).to_pytimedelta()
+
+def _timed(benchmark: Benchmark, data: pd.DataFrame) -> float:
+    """
+    Runs a benchmark with the garbage collector settled beforehand.
+    """
+    gc.collect()
+    return benchmark(data)
+
+def _peak_memory(benchmark: Benchmark, data: pd.DataFrame) -> int:
+    """
+    The most memory allocated at once while a benchmark runs, on top
+    of what was allocated before it started.
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        benchmark(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+def _meta() -> dict:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform()
+    }
+
+def _describe(key: str, result: dict) -> str:
+    peak = result["peak_memory"]
+    memory = "" if peak is None else f"  {peak / 2**20:10,.1f} MiB"
+
+    return (
+        f"{key:<36} {result['bars_per_second'] or 0:>14,.0f} bars/s"
+        f"{memory}"
+    )
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from collections.abc import Iterator
+import numpy as np
+import pandas as pd
+from finance_types import Candle
+
+def synthetic_ohlcv(
+    length: int,
+    frequency: str = "1min",
+    seed: int = 0,
+    start: str = "2020-01-01"
+) -> pd.DataFrame:
+    """
+    Makes OHLCV data following a random walk of the log price. The
+    same arguments always give the same data, so results can be
+    compared across runs and machines.
+
+    Args:
+        length (int): Number of candles.
+        frequency (str, optional): Pandas frequency of the candles.
+            Defaults to "1min".
+        seed (int, optional): Seed of the random walk. Defaults to 0.
+        start (str, optional): Datetime of the first candle. Defaults
+            to "2020-01-01".
+
+    Returns:
+        pd.DataFrame: The OHLCV data, indexed by datetime.
+    """
+    rng = np.random.default_rng(seed)
+
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, length)))
+    open = np.empty(length)
+    open[0] = 100
+    open[1:] = close[:-1]
+
+    wicks = np.abs(rng.normal(0, 5e-4, (2, length)))
+    high = np.maximum(open, close) * (1 + wicks[0])
+    low = np.minimum(open, close) * (1 - wicks[1])
+    volume = rng.integers(100, 10_000, length).astype(np.float64)
+
+    return pd.DataFrame(
+        {
+            "open": open,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume
+        },
+        index=pd.date_range(start, periods=length, freq=frequency)
+    )
+
+def candle_chunks(
+    data: pd.DataFrame, size: int = 65536
+) -> Iterator[list[Candle]]:
+    """
+    Creates the candles of the data a chunk at a time, so benchmarks
+    can time what is done with the candles without holding every candle
+    of a large dataset or timing their creation.
+
+    Args:
+        data (pd.DataFrame): The OHLCV data.
+        size (int, optional): Number of candles per chunk. Defaults to
+            65536.
+
+    Yields:
+        list[Candle]: The candles of the next `size` rows.
+    """
+    tz = data.index.tz
+    columns = [data.index.as_unit("ns").asi8] + [
+        data[c].to_numpy() for c in ("open", "high", "low", "close", "volume")
+    ]
+
+    for start in range(0, len(data), size):
+        rows = zip(*(c[start:start + size].tolist() for c in columns))
+        yield [Candle.from_timestamp(*row, tz) for row in rows]
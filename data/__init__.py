@@ -1,3 +1,13 @@
-from datahelp import prep_data, validate_data, get_frequency
+from datahelp import (
+    prep_data, stream_data, validate_data, is_uniform, get_frequency,
+    resample_data, fingerprint_data
+)
+from shared import SharedFrame
+from indicator_cache import IndicatorCache
+from replay import ReplaySource
 
-__all__ = ["prep_data", "validate_data", "get_frequency"]
\ No newline at end of file
+__all__ = [
+    "prep_data", "stream_data", "validate_data", "is_uniform",
+    "get_frequency", "resample_data", "fingerprint_data", "SharedFrame",
+    "IndicatorCache", "ReplaySource"
+]
\ No newline at end of file
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from datahelp import _frame_from_arrays, _tz_name, _utc_nanoseconds
+
+# Bumped whenever the layout of the cache files changes
+_VERSION = 1
+
+def read_cache(path: str) -> pd.DataFrame | None:
+    """
+    Opens the binary cache of the csv file at `path` if one exists and
+    was made from the file as it is now, judged by its size and
+    modification time.
+
+    The columns are memory mapped, so opening the cache is near instant
+    and the data is only read from disk once a column is touched.
+
+    Args:
+        path (str): The file path of the source csv file.
+
+    Returns:
+        pd.DataFrame | None: A read only dataframe on top of the cache,
+            None if there is no up to date cache.
+    """
+    meta_path, block_path = _cache_paths(path)
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("source") != _stamp(path):
+        return None
+
+    length, width = meta["length"], len(meta["columns"])
+
+    if length == 0:
+        block = np.empty(0, dtype=np.uint8)
+    else:
+        block = np.memmap(block_path, dtype=np.uint8, mode="r")
+
+    timestamps = block[:8 * length].view(np.int64)
+    values = block[8 * length:].view(np.float64).reshape(width, length)
+
+    return _frame_from_arrays(timestamps, values, meta["columns"], meta["tz"])
+
+def write_cache(path: str, data: pd.DataFrame) -> bool:
+    """
+    Writes `data`, parsed from the csv file at `path`, into a binary
+    cache next to it. The cache holds the int64 epoch nanosecond
+    timestamps followed by each column as float64, and a small json
+    file recording what the cache was made from.
+
+    Data with columns that are not numeric is not cached.
+
+    Args:
+        path (str): The file path of the source csv file.
+        data (pd.DataFrame): The parsed data, indexed by datetime.
+
+    Returns:
+        bool: Whether the cache was written.
+    """
+    writer = CacheWriter(path)
+
+    if not writer.append(data):
+        return False
+
+    writer.finish()
+    return True
+
+class CacheWriter:
+    """
+    Writes the binary cache of the csv file at `path` a chunk at a time,
+    so data larger than memory can be cached while it is streamed. Each
+    column goes to its own temporary file until finish() joins them into
+    the cache, so a reader never sees half a cache.
+
+    Args:
+        path (str): The file path of the source csv file.
+    """
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+
+        self._stamp: dict = _stamp(path)
+        self._length: int = 0
+        self._columns: list[str] = None
+        self._tz: str = None
+        self._files: list = []
+
+    def append(self, data: pd.DataFrame) -> bool:
+        """
+        Adds the next chunk of parsed data to the cache. If the data
+        can't be cached the writer is aborted.
+
+        Args:
+            data (pd.DataFrame): The next rows, indexed by datetime.
+
+        Returns:
+            bool: Whether the chunk was added.
+        """
+        columns = [str(c) for c in data.columns]
+
+        if self._columns is None:
+            self._columns = columns
+            self._tz = _tz_name(data.index)
+            self._files = [
+                open(self._part(i), "wb") for i in range(len(columns) + 1)
+            ]
+
+        if (
+            columns != self._columns or 
+            _tz_name(data.index) != self._tz or 
+            not all(pd.api.types.is_numeric_dtype(d) for d in data.dtypes)
+        ):
+            self.abort()
+            return False
+
+        self._files[0].write(_utc_nanoseconds(data.index).tobytes())
+
+        for f, column in zip(self._files[1:], data.columns):
+            f.write(data[column].to_numpy(np.float64).tobytes())
+
+        self._length += len(data)
+        return True
+
+    def finish(self) -> None:
+        """
+        Joins the parts into the cache and records what it was made
+        from.
+        """
+        meta_path, block_path = _cache_paths(self.path)
+
+        with open(block_path + ".tmp", "wb") as block:
+            for i, f in enumerate(self._files):
+                f.close()
+                with open(self._part(i), "rb") as part:
+                    shutil.copyfileobj(part, block)
+                os.remove(self._part(i))
+
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({
+                "source": self._stamp,
+                "length": self._length,
+                "columns": self._columns or [],
+                "tz": self._tz
+            }, f)
+
+        os.replace(block_path + ".tmp", block_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+        self._files = []
+
+    def abort(self) -> None:
+        """
+        Removes anything written so far.
+        """
+        for i, f in enumerate(self._files):
+            f.close()
+            os.remove(self._part(i))
+
+        self._files = []
+
+    def _part(self, i: int) -> str:
+        """
+        The temporary file of the timestamps (0) or of a column (1...).
+        """
+        return f"{_cache_paths(self.path)[1]}.{i}.tmp"
+
+def _cache_paths(path: str) -> tuple[str, str]:
+    """
+    The paths of the json description and binary block of the cache for
+    the csv file at `path`.
+    """
+    return path + ".cache.json", path + ".cache.bin"
+
+def _stamp(path: str) -> dict:
+    """
+    What identifies the csv file at `path` as it is now.
+    """
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "version": _VERSION
+    }
@@ -1,18 +1,43 @@
+from collections.abc import Iterator
+from datetime import timedelta
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 
-def prep_data(path: str) -> pd.DataFrame:
+# The columns every dataset run by the engine needs
+_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Rows checked at a time by validate_data, to bound its temporaries
+_BLOCK_SIZE = 1 << 20
+
+def prep_data(path: str, cache: bool = False) -> pd.DataFrame:
     """
     This method uses a csv file `path` to create a `pandas` `dataframe`
     it then converts the datetime `string` column to `datetime` objects
     and sets the `datetime` column to the index of the dataframe.
 
+    With `cache` the parsed data is also written to a binary cache next
+    to the csv file, and later calls open the cache instead of parsing
+    the csv again for as long as the file is unchanged. The numeric
+    columns are then float64 and the index is in nanoseconds, whether
+    the data was parsed or read from the cache.
+
     Args:
         path (str): The file path to the data being prep. for `Engine`.
+        cache (bool, optional): Whether to read from and write to the
+            binary cache. Defaults to False.
 
     Returns:
         pd.DataFrame: Properly formatted dataframe compatable with the
-            `Engine` class.
+            `Engine` class, read only if it was opened from the cache.
     """
+    from cache import read_cache, write_cache
+
+    if cache:
+        data = read_cache(path)
+        if data is not None:
+            return data
 
     data = pd.read_csv(path)
     
@@ -20,10 +45,287 @@ def prep_data(path: str) -> pd.DataFrame:
 
     data = data.set_index("datetime")
 
+    if cache:
+        data = _normalize(data)
+        write_cache(path, data)
+
     return data
 
+def stream_data(
+    path: str, chunksize: int = 100_000, cache: bool = False
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads the csv file at `path` a chunk of rows at a time, each chunk
+    formatted the same way as `prep_data`, so datasets larger than
+    memory can be run with `Engine.load_stream`.
+
+    With `cache` the chunks are sliced out of the binary cache if it is
+    up to date, otherwise the cache is written as the csv is read. The
+    chunks have the same dtypes either way, see `prep_data`.
+
+    Args:
+        path (str): The file path to the data being prep. for `Engine`.
+        chunksize (int, optional): Number of rows in each chunk.
+            Defaults to 100,000.
+        cache (bool, optional): Whether to read from and write to the
+            binary cache. Defaults to False.
+
+    Yields:
+        pd.DataFrame: The next rows of the dataset, in time order.
+    """
+    from cache import read_cache, CacheWriter
+
+    if cache:
+        data = read_cache(path)
+        if data is not None:
+            for start in range(0, len(data), chunksize):
+                yield data.iloc[start:start + chunksize]
+            return
+
+    writer = CacheWriter(path) if cache else None
+
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+
+            chunk['datetime'] = pd.to_datetime(chunk['datetime'])
+            chunk = chunk.set_index("datetime")
+
+            if cache:
+                chunk = _normalize(chunk)
+
+            if writer and not writer.append(chunk):
+                writer = None
+
+            yield chunk
+
+        if writer:
+            writer.finish()
+            writer = None
+    finally:
+        if writer: # the stream was closed before the end
+            writer.abort()
+
+def resample_data(data: pd.DataFrame, frequency: timedelta) -> pd.DataFrame:
+    """
+    Combines the rows of `data` into rows of a larger `frequency`. The
+    buckets line up with the calendar the same way `CandleAggregator`
+    buckets do, labelled by their start, and buckets without any rows
+    are left out.
+
+    Args:
+        data (pd.DataFrame): The OHLCV data to be combined.
+        frequency (timedelta): The frequency of the combined rows.
+
+    Returns:
+        pd.DataFrame: The OHLCV data at the new frequency.
+    """
+    resampler = data.resample(
+        frequency, 
+        origin=pd.Timestamp(1970, 1, 5, tz=data.index.tz),
+        label="left",
+        closed="left"
+    )
+
+    combined = resampler.agg({
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "sum"
+    })
+
+    return combined[resampler.size() > 0]
+
+def _frame_from_arrays(
+    timestamps: np.ndarray, 
+    values: np.ndarray, 
+    columns: list[str], 
+    tz: str = None
+) -> pd.DataFrame:
+    """
+    Builds a dataframe on top of int64 epoch nanosecond `timestamps` and
+    a float64 `values` block shaped (column, row) without copying either,
+    so the frame can sit on shared or memory mapped buffers. The index of
+    a timezone aware frame is the only part that gets copied.
+
+    Args:
+        timestamps (np.ndarray): int64 epoch nanoseconds, one per row.
+        values (np.ndarray): float64 values shaped (column, row).
+        columns (list[str]): The names of the columns.
+        tz (str, optional): The timezone of the index. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Dataframe indexed by `datetime`.
+    """
+    index = pd.DatetimeIndex(
+        timestamps.view("M8[ns]"), copy=False, name="datetime"
+    )
+
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+
+    return pd.DataFrame(values.T, index=index, columns=columns, copy=False)
+
+def _normalize(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gives parsed data the dtypes it has when read from the binary cache,
+    numeric columns as float64 and the index in nanoseconds, so a
+    dataset is the same frame whether or not it was cached yet.
+    """
+    numeric = [
+        c for c in data.columns
+        if pd.api.types.is_numeric_dtype(data[c].dtype)
+    ]
+
+    data = data.astype({c: np.float64 for c in numeric}, copy=False)
+
+    if isinstance(data.index, pd.DatetimeIndex):
+        data.index = data.index.as_unit("ns")
+
+    return data
+
+def _tz_name(index: pd.DatetimeIndex) -> str:
+    """
+    The name of the timezone of an index, None if it is naive.
+    """
+    return None if index.tz is None else str(index.tz)
+
+def _utc_nanoseconds(index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    The int64 epoch nanoseconds of an index, in UTC if it is timezone
+    aware.
+    """
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8
+
 def validate_data(data: pd.DataFrame) -> bool:
-    pass
+    """
+    Checks that `data` can be run by the `Engine`, in vectorized passes
+    over the index and a block of rows at a time:
+
+    - the index is a `DatetimeIndex` that strictly increases, so there
+      are no duplicates or rows out of order
+    - there are open, high, low, close and volume columns of numbers
+      without NaNs
+    - high and low are the highest and lowest price of each row and the
+      volume is not negative
+
+    Args:
+        data (pd.DataFrame): The OHLCV data to check.
+
+    Returns:
+        bool: Whether the data is properly formatted.
+
+    Gaps in the index, ie. overnight or over a weekend, are allowed, see
+    is_uniform() for whether the data has any.
+    """
+    if (
+        not isinstance(data, pd.DataFrame) or 
+        not isinstance(data.index, pd.DatetimeIndex) or
+        any(c not in data.columns for c in _COLUMNS)
+    ):
+        return False
+
+    if len(data) > 1:
+        steps = np.diff(data.index.as_unit("ns").asi8)
+        if (steps <= 0).any():
+            return False
+
+    try:
+        columns = [data[c].to_numpy(np.float64) for c in _COLUMNS]
+    except (TypeError, ValueError):
+        return False
+
+    for start in range(0, len(data), _BLOCK_SIZE):
+        open, high, low, close, volume = (
+            c[start:start + _BLOCK_SIZE] for c in columns
+        )
+
+        # comparisons with NaN are False, so NaNs fail these too
+        valid = (
+            (high >= np.maximum(open, close)) & 
+            (low <= np.minimum(open, close)) & 
+            (volume >= 0)
+        )
+        if not valid.all():
+            return False
+
+    return True
+
+def is_uniform(data: pd.DataFrame) -> bool:
+    """
+    Checks that the rows of `data` are all the same step apart, so it
+    has no gaps and its timeline doesn't need checking candle by candle.
+
+    Args:
+        data (pd.DataFrame): Data indexed by datetime, in order.
+
+    Returns:
+        bool: Whether every row is one step after the row before it.
+    """
+    if len(data) < 3:
+        return True
+
+    steps = np.diff(data.index.as_unit("ns").asi8)
+    return bool((steps == steps[0]).all())
+
+def get_frequency(data: pd.DataFrame) -> timedelta:
+    """
+    Infers the frequency of `data` from the smallest step between the
+    datetimes of its index.
+
+    Args:
+        data (pd.DataFrame): Data indexed by datetime, in order.
+
+    Raises:
+        ValueError: The data has fewer than 2 rows or is not in order.
+
+    Returns:
+        timedelta: The time between consecutive rows.
+    """
+    if len(data) < 2:
+        raise ValueError(
+            f"Expected at least 2 rows to infer a frequency | "
+            f"Actual: {len(data)}"
+        )
+
+    step = int(np.diff(data.index.as_unit("ns").asi8).min())
+
+    if step <= 0:
+        raise ValueError("Data must be in strictly increasing time order")
+
+    return pd.Timedelta(step, "ns").to_pytimedelta()
+
+def fingerprint_data(data: pd.DataFrame) -> str:
+    """
+    Hashes the index, column names and values of `data`, so two
+    datasets can be told apart without keeping a copy of either.
+
+    Numeric columns are hashed as float64, and any other columns, ie.
+    notes kept alongside the OHLCV data, by their pandas hash.
+
+    Args:
+        data (pd.DataFrame): Data indexed by datetime.
+
+    Returns:
+        str: The hex digest of the data.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(
+        [[str(c) for c in data.columns], _tz_name(data.index)]
+    ).encode())
+    h.update(_utc_nanoseconds(data.index).tobytes())
+
+    for column in data.columns:
+        values = data[column]
+
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            h.update(values.to_numpy(np.float64).tobytes())
+        else:
+            h.update(
+                pd.util.hash_pandas_object(values, index=False)
+                .to_numpy().tobytes()
+            )
 
-def get_frequency(self, data: pd.DataFrame) -> str:
-    pass
+    return h.hexdigest()
@@ -0,0 +1,390 @@
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import os
+import weakref
+from datetime import date, time, timedelta
+import numpy as np
+import pandas as pd
+from datahelp import fingerprint_data, _tz_name, _utc_nanoseconds
+
+# Bumped whenever the layout of the cache files or keys changes
+_VERSION = 2
+
+class _Undescribable(Exception):
+    """
+    Raised by _describe() for an argument with no deterministic
+    description, so the indicator is not cached.
+    """
+
+class IndicatorCache:
+    """
+    Keeps the frames returned by indicators' compute() in a directory,
+    so later runs over the same data load them instead of computing
+    them again. Pass it to the Engine to use it.
+
+    An entry is keyed by the indicator's class, the arguments it was
+    constructed with, the source code of its class and of the classes
+    it inherits compute() from, and a fingerprint of the data given to
+    compute(). Changing any of them misses the cache, but code outside
+    the class that compute() calls is not part of the key. Arrays and
+    frames given as arguments are keyed by a hash of their contents,
+    and indicators constructed with an argument that can't be described
+    the same way in every run, ie. an arbitrary object, are not cached.
+
+    Each entry is a small json file describing the frame and a binary
+    file holding the index as int64 epoch nanoseconds followed by the
+    raw bytes of each column. When the entries take up more than
+    `max_bytes`, the least recently used are removed.
+
+    Frames with columns that are not numbers or bools, or an index that
+    isn't a DatetimeIndex or the default RangeIndex, are not cached.
+
+    Args:
+        directory (str): The directory of the cache, created if needed.
+        max_bytes (int, optional): The most bytes the entries may take
+            up. Defaults to 1 GiB.
+    """
+    def __init__(self, directory: str, max_bytes: int = 1 << 30) -> None:
+        if max_bytes <= 0:
+            raise ValueError(
+                f"max_bytes must be positive | Actual: {max_bytes}"
+            )
+
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+
+        # the last data fingerprinted, as every indicator at the same
+        # frequency is given the same frame
+        self._fingerprinted: tuple[weakref.ref, str] = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, indicator: object, data: pd.DataFrame) -> str | None:
+        """
+        Works out the key of an indicator's compute() over the data.
+
+        Args:
+            indicator (IndicatorBase): The indicator.
+            data (pd.DataFrame): The data given to its compute().
+
+        Returns:
+            str | None: The key, None if the indicator or data can't be
+                keyed, ie. its source code is not available or one of
+                its arguments can't be described.
+        """
+        cls = type(indicator)
+        source = _source_digest(cls)
+        fingerprint = self.fingerprint(data)
+
+        if source is None or fingerprint is None:
+            return None
+
+        args, kwargs = getattr(indicator, "_arguments", ((), {}))
+
+        try:
+            arguments = _describe((args, kwargs))
+        except _Undescribable:
+            return None
+
+        description = json.dumps({
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "arguments": arguments,
+            "source": source,
+            "data": fingerprint,
+            "version": _VERSION
+        })
+
+        return hashlib.blake2b(
+            description.encode(), digest_size=16
+        ).hexdigest()
+
+    def fingerprint(self, data: pd.DataFrame) -> str | None:
+        """
+        Hashes the index, columns and values of a dataframe.
+
+        Args:
+            data (pd.DataFrame): The data, indexed by datetime.
+
+        Returns:
+            str | None: The hex digest, None if a column is not numeric.
+        """
+        if self._fingerprinted is not None:
+            frame, digest = self._fingerprinted
+            if frame() is data:
+                return digest
+
+        if not all(pd.api.types.is_numeric_dtype(d) for d in data.dtypes):
+            return None
+
+        digest = fingerprint_data(data)
+        self._fingerprinted = (weakref.ref(data), digest)
+        return digest
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Loads the frame stored under a key, marking it as recently used.
+
+        Args:
+            key (str): The key from key().
+
+        Returns:
+            pd.DataFrame | None: The frame, None if it is not cached.
+        """
+        meta_path, block_path = self._paths(key)
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+
+            with open(block_path, "rb") as f:
+                block = bytearray(os.fstat(f.fileno()).st_size)
+                f.readinto(block)
+
+            os.utime(block_path)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("version") != _VERSION:
+            return None
+
+        length = meta["length"]
+        offset = 0
+
+        if meta["index"] == "datetime":
+            timestamps = np.frombuffer(block, np.int64, length)
+            offset = 8 * length
+
+            index = pd.DatetimeIndex(
+                timestamps.view("M8[ns]"), name=meta["index_name"]
+            ).as_unit(meta["unit"])
+            if meta["tz"] is not None:
+                index = index.tz_localize("UTC").tz_convert(meta["tz"])
+            if meta["freq"] is not None:
+                index = pd.DatetimeIndex(index, freq=meta["freq"])
+        else:
+            index = pd.RangeIndex(length, name=meta["index_name"])
+
+        columns = {}
+
+        for column, dtype in zip(meta["columns"], meta["dtypes"]):
+            dtype = np.dtype(dtype)
+            columns[column] = np.frombuffer(block, dtype, length, offset)
+            offset += dtype.itemsize * length
+
+        return pd.DataFrame(columns, index=index, columns=meta["columns"])
+
+    def put(self, key: str, computed: pd.DataFrame) -> bool:
+        """
+        Stores a frame under a key, then removes the least recently used
+        entries until the cache fits in max_bytes again.
+
+        Args:
+            key (str): The key from key().
+            computed (pd.DataFrame): The frame returned by compute().
+
+        Returns:
+            bool: Whether the frame was stored.
+        """
+        index = computed.index
+
+        if isinstance(index, pd.DatetimeIndex):
+            kind = "datetime"
+        elif isinstance(index, pd.RangeIndex) and index.equals(
+            pd.RangeIndex(len(index))
+        ):
+            kind = "range"
+        else:
+            return False
+
+        columns = list(computed.columns)
+        arrays = [computed[c].to_numpy() for c in columns]
+
+        if (
+            len(set(columns)) != len(columns) or
+            not all(isinstance(c, str) for c in columns) or
+            not all(a.dtype.kind in "biuf" for a in arrays)
+        ):
+            return False
+
+        size = sum(a.nbytes for a in arrays)
+        if kind == "datetime":
+            size += 8 * len(index)
+
+        if size > self.max_bytes:
+            return False
+
+        meta_path, block_path = self._paths(key)
+        suffix = f".{os.getpid()}.tmp"
+
+        with open(block_path + suffix, "wb") as f:
+            if kind == "datetime":
+                f.write(_utc_nanoseconds(index).tobytes())
+            for a in arrays:
+                f.write(np.ascontiguousarray(a).tobytes())
+
+        with open(meta_path + suffix, "w") as f:
+            json.dump({
+                "length": len(index),
+                "index": kind,
+                "index_name": index.name,
+                "tz": _tz_name(index) if kind == "datetime" else None,
+                "unit": index.unit if kind == "datetime" else None,
+                "freq": index.freqstr if kind == "datetime" else None,
+                "columns": columns,
+                "dtypes": [a.dtype.str for a in arrays],
+                "version": _VERSION
+            }, f)
+
+        os.replace(block_path + suffix, block_path)
+        os.replace(meta_path + suffix, meta_path)
+
+        self._evict()
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        for key, _, _ in self._entries():
+            self._remove(key)
+
+    @property
+    def size(self) -> int:
+        """
+        The bytes taken up by the entries.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used entries until the rest fit in
+        max_bytes.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+
+        for key, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+
+            self._remove(key)
+            total -= size
+
+    def _entries(self) -> list[tuple[str, int, int]]:
+        """
+        The key, size in bytes and last use in nanoseconds of every
+        entry.
+        """
+        entries = []
+
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".bin"):
+                continue
+
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            entries.append((entry.name[:-4], stat.st_size, stat.st_mtime_ns))
+
+        return entries
+
+    def _remove(self, key: str) -> None:
+        """
+        Removes an entry, if another process hasn't already.
+        """
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        """
+        The paths of the json description and binary block of an entry.
+        """
+        path = os.path.join(self.directory, key)
+        return path + ".json", path + ".bin"
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_fingerprinted"] = None
+        return state
+
+def _source_digest(cls: type) -> str | None:
+    """
+    Hashes the source code of a class and of the classes it inherits
+    from, up to the one that defines precompute(), ie. IndicatorBase.
+    None if the source of one of them is not available.
+    """
+    h = hashlib.blake2b(digest_size=16)
+
+    for base in cls.__mro__:
+        if "precompute" in vars(base) or base is object:
+            break
+
+        try:
+            h.update(inspect.getsource(base).encode())
+        except (OSError, TypeError):
+            return None
+
+    return h.hexdigest()
+
+def _describe(argument: object) -> object:
+    """
+    Describes a constructor argument for the key of the cache, as json
+    that is the same in every run for an equal argument. Containers are
+    described item by item, and arrays and frames by a hash of their
+    dtype, shape and contents.
+
+    Raises:
+        _Undescribable: The argument, or an item of it, has no such
+            description, ie. an object whose repr holds its address.
+    """
+    if isinstance(argument, (bool, int, float, str)) or argument is None:
+        return argument
+    if isinstance(argument, np.generic) and argument.dtype.kind in "biuf":
+        return [argument.dtype.str, argument.item()]
+
+    if isinstance(argument, (tuple, list)):
+        return [type(argument).__name__, [_describe(a) for a in argument]]
+    if isinstance(argument, dict):
+        items = [[_describe(k), _describe(v)] for k, v in argument.items()]
+        return ["dict", sorted(items, key=json.dumps)]
+
+    # before datetime and timedelta, which they subclass
+    if isinstance(argument, pd.Timestamp):
+        return ["Timestamp", argument.value, str(argument.tz)]
+    if isinstance(argument, pd.Timedelta):
+        return ["Timedelta", argument.value]
+    if isinstance(argument, (date, time, timedelta)):
+        return [type(argument).__name__, repr(argument)]
+
+    if isinstance(argument, np.ndarray) and argument.dtype.kind in "biufmM":
+        content = np.ascontiguousarray(argument).tobytes()
+        return [
+            "ndarray", argument.dtype.str, list(argument.shape),
+            hashlib.blake2b(content, digest_size=16).hexdigest()
+        ]
+
+    if isinstance(argument, (pd.Series, pd.DataFrame)):
+        kind = type(argument).__name__
+        frame = argument.to_frame() if kind == "Series" else argument
+        index = frame.index
+
+        if isinstance(index, pd.DatetimeIndex):
+            index = [_tz_name(index), _describe(_utc_nanoseconds(index))]
+        else:
+            index = _describe(index.to_numpy())
+
+        columns = [frame.iloc[:, i] for i in range(frame.shape[1])]
+
+        return [
+            kind, _describe(list(frame.columns)), index,
+            [_describe(c.to_numpy()) for c in columns]
+        ]
+
+    raise _Undescribable
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from collections.abc import AsyncIterator, Iterator, Mapping
+from datetime import timedelta
+from heapq import merge
+from itertools import repeat
+import asyncio
+import pandas as pd
+from finance_types import Candle
+from datahelp import validate_data, get_frequency
+
+# Number of rows converted from numpy to python scalars at a time
+_CHUNK_SIZE = 65536
+
+class ReplaySource:
+    """
+    Replays OHLCV data as an async iterator of candles, so a strategy
+    can be run with Engine.run_live() against a known dataset, ie. to
+    check that it trades the same live as it does in a backtest.
+
+    Data for a single symbol is replayed as candles, and data for
+    several symbols as (candle, symbol) pairs merged in time order,
+    which is what run_live() takes from any source.
+
+    By default the candles are replayed as fast as they are taken. With
+    `speed` each candle is held back until its datetime, relative to
+    the first candle, has passed on the event loop's clock, sped up by
+    that factor, ie. 60 replays an hour of minute candles in a minute.
+
+    A source can be iterated more than once, each time from the start.
+
+    Args:
+        data (pd.DataFrame | Mapping[str, pd.DataFrame]): The data to
+            replay, or the data of each symbol.
+        speed (float, optional): How many times faster than real time
+            the candles are replayed. Defaults to None, as fast as
+            possible.
+
+    Raises:
+        TypeError: data is not a pandas dataframe or mapping of them.
+        ValueError: data is improperly formatted, or speed is not
+            positive.
+    """
+    def __init__(
+        self,
+        data: pd.DataFrame | Mapping[str, pd.DataFrame],
+        speed: float = None
+    ) -> None:
+        feeds = data if isinstance(data, Mapping) else {None: data}
+
+        if not feeds:
+            raise ValueError("No data to replay")
+
+        for symbol, frame in feeds.items():
+            name = "Data" if symbol is None else f"Data for {symbol}"
+
+            if not isinstance(frame, pd.DataFrame):
+                raise TypeError(f"{name} must be a pandas.DataFrame")
+            if not validate_data(frame):
+                raise ValueError(f"{name} is improperly formatted")
+
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be positive | Actual: {speed}")
+
+        self._feeds: dict[str, pd.DataFrame] = dict(feeds)
+        self.speed: float = speed
+        self.frequency: timedelta = get_frequency(
+            next(iter(self._feeds.values()))
+        )
+
+    def __aiter__(self) -> AsyncIterator[Candle | tuple[Candle, str]]:
+        return self._replay()
+
+    async def _replay(self) -> AsyncIterator[Candle | tuple[Candle, str]]:
+        """
+        Yields the candles, or (candle, symbol) pairs, pacing them when
+        the source has a speed.
+        """
+        if None in self._feeds:
+            items = _candles(self._feeds[None])
+        else:
+            items = merge(
+                *(
+                    zip(_candles(d), repeat(s))
+                    for s, d in self._feeds.items()
+                ),
+                key=lambda pair: pair[0].timestamp
+            )
+
+        if self.speed is None:
+            for item in items:
+                yield item
+            return
+
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        start = None
+
+        for item in items:
+            candle = item[0] if type(item) is tuple else item
+
+            if start is None:
+                start = candle.timestamp
+
+            due = began + (candle.timestamp - start) / 1e9 / self.speed
+            delay = due - loop.time()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            yield item
+
+def _candles(data: pd.DataFrame) -> Iterator[Candle]:
+    """
+    Creates a candle for each row of the data in order, a chunk of rows
+    at a time, from the int64 nanosecond timestamps and OHLCV columns.
+    """
+    tz = data.index.tz
+    columns = [data.index.as_unit("ns").asi8] + [
+        data[c].to_numpy() for c in ("open", "high", "low", "close", "volume")
+    ]
+
+    for start in range(0, len(data), _CHUNK_SIZE):
+        rows = zip(*(c[start:start + _CHUNK_SIZE].tolist() for c in columns))
+        yield from (Candle.from_timestamp(*row, tz) for row in rows)
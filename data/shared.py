@@ -0,0 +1,145 @@
+from __future__ import annotations
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from datahelp import _frame_from_arrays, _tz_name, _utc_nanoseconds
+
+class SharedFrame:
+    """
+    An OHLCV dataframe published once into shared memory so that worker
+    processes can read it without each holding their own copy.
+
+    Pickling a SharedFrame only sends the name and shape of the shared
+    block, a worker then builds a dataframe on top of the block without
+    copying the data. This makes it cheap to pass to a process pool,
+    either as the data of a sweep or as a parameter of a strategy
+    factory that gives it to its indicators.
+
+    The process that publishes the frame owns the block and should
+    unlink() it once every worker is done, or use it as a context
+    manager. Every column is stored as float64.
+
+    Args:
+        name (str): The name of the shared memory block.
+        length (int): The number of rows.
+        columns (list[str]): The names of the columns.
+        tz (str, optional): The timezone of the index. Defaults to None.
+    """
+    def __init__(
+        self, name: str, length: int, columns: list[str], tz: str = None
+    ) -> None:
+        self.name: str = name
+        self.length: int = length
+        self.columns: list[str] = list(columns)
+        self.tz: str = tz
+
+        self._shm: shared_memory.SharedMemory = None
+        self._frame: pd.DataFrame = None
+
+    @classmethod
+    def publish(cls, data: pd.DataFrame) -> SharedFrame:
+        """
+        Copies a dataframe into a new shared memory block.
+
+        Args:
+            data (pd.DataFrame): The data to be shared, indexed by
+                datetime.
+
+        Returns:
+            SharedFrame: The published frame, owning the block.
+        """
+        length, width = data.shape
+
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(1, 8 * length * (width + 1))
+        )
+
+        shared = cls(shm.name, length, data.columns, _tz_name(data.index))
+        shared._shm = shm
+
+        timestamps, values = shared._arrays()
+        timestamps[:] = _utc_nanoseconds(data.index)
+        values[:] = data.to_numpy(dtype=np.float64).T
+
+        return shared
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        The shared data as a read only dataframe, attaching to the
+        shared memory block on first use.
+
+        Returns:
+            pd.DataFrame: Dataframe on top of the shared block.
+        """
+        if self._frame is None:
+
+            if self._shm is None:
+                self._shm = shared_memory.SharedMemory(name=self.name)
+
+            timestamps, values = self._arrays()
+            timestamps.flags.writeable = False
+            values.flags.writeable = False
+
+            self._frame = _frame_from_arrays(
+                timestamps, values, self.columns, self.tz
+            )
+
+        return self._frame
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared block. Any frame taken
+        from it must no longer be used.
+        """
+        self._frame = None
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self) -> None:
+        """
+        Detaches and frees the shared block, only to be called by the
+        process that published it.
+        """
+        shm = self._shm or shared_memory.SharedMemory(name=self.name)
+        self._shm = shm
+        self.close()
+        shm.unlink()
+
+    def _arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The timestamp and value arrays laid over the shared block, the
+        int64 timestamps first followed by one float64 row per column.
+        """
+        buffer = self._shm.buf
+        width = len(self.columns)
+
+        timestamps = np.ndarray(
+            (self.length,), dtype=np.int64, buffer=buffer
+        )
+        values = np.ndarray(
+            (width, self.length), 
+            dtype=np.float64, 
+            buffer=buffer, 
+            offset=8 * self.length
+        )
+        return timestamps, values
+
+    def __enter__(self) -> SharedFrame:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.unlink()
+
+    def __getstate__(self) -> dict:
+        return {
+            "name": self.name, 
+            "length": self.length, 
+            "columns": self.columns, 
+            "tz": self.tz
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
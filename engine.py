@@ -1,7 +1,32 @@
+from collections.abc import AsyncIterable, Iterable, Iterator, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextvars import copy_context
+from datetime import timedelta
+from heapq import merge
+from itertools import repeat
+import asyncio
+import os
+import pickle
 from finance_types import Candle
+import numpy as np
 import pandas as pd
-from handlers import StrategyBase, IndicatorBase, DataHandler, Broker
-from data import validate_data, get_frequency
+from handlers import (
+    StrategyBase, IndicatorBase, DataHandler, DispatchPlan, Broker
+)
+from data import (
+    validate_data, is_uniform, get_frequency, resample_data,
+    fingerprint_data, IndicatorCache
+)
+from profiler import Profiler
+
+# Number of rows converted from numpy to python scalars at a time
+_CHUNK_SIZE = 65536
+
+# Bumped whenever what a snapshot holds changes
+_SNAPSHOT_VERSION = 2
+
+# Marks the end of a live source in the queue of its candles
+_END = object()
 
 class Engine:
     """
@@ -9,34 +34,307 @@ class Engine:
     handling the data. It manages the data loading, strategy loading,
     and the execution of the strategy on the data as well as the 
     execution of data on indicators.
+
+    Args:
+        profile (bool, optional): Whether to time each handler and phase
+            of a run, see Profiler. The report of the last run is kept
+            in self.profiler. Defaults to False.
+        cache (IndicatorCache, optional): Keeps the results of the
+            indicators that override compute() across runs. Defaults to
+            None, which computes them on every run.
+        processes (int, optional): Number of worker processes the
+            indicators holding their own back data are run on before the
+            strategy starts, see _run_indicators(). None uses every
+            core. Defaults to 1, which runs them in this process.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        profile: bool = False,
+        cache: IndicatorCache = None,
+        processes: int = 1
+    ) -> None:
         
         self._data: pd.DataFrame = None
+        self._stream: Iterable[pd.DataFrame] = None
+        self._feeds: dict[str, pd.DataFrame] = None
         self._strategy: StrategyBase = None
         self._broker: Broker = Broker()
+        self.profile: bool = profile
+        self.cache: IndicatorCache = cache
+        self.processes: int = processes
+        self._profiler: Profiler = None
     
-    def run(self, handler: DataHandler=None) -> None:
+    def run(self, handler: DataHandler=None, snapshot: str = None) -> None:
         """
         By default the engine will run the strategy on the data stored
         in the engine. 
         
         If an DataHandler is passed in, it will run the data
         stored by the DataHandler.
+
+        If a stream was loaded instead of data, the strategy is run on
+        the stream one chunk at a time. If data for several symbols was
+        loaded, the strategy is run on all of them merged in time order.
         
-        Before running the data, it will run any indicators that may be
-        stored in the indicator or strategy.
+        Before running the data, it will precompute any indicators that
+        override compute() over the data they will be given, then run
+        any indicators that may be stored in the indicator or strategy.
+        The indicators are then compiled into a DispatchPlan, which
+        passes each candle through them for the rest of the run.
+
+        A strategy run on loaded data can be snapshot to a file, which
+        resume() carries on from once new candles are appended to the
+        data.
 
         Args:
             handler (DataHandler, optional): The current handler being
                 ran. Defaults to None.
+            snapshot (str, optional): The path to write a snapshot of
+                the strategy to at the end of the run. Defaults to None.
 
         Raises:
             NullDataException: If the handler has no data to run
             NullStrategyException: If there is no strategy to run
             TypeError: If handler is not a DataHandler object
         """
+        if not self.profile or (self._profiler and self._profiler.active):
+            self._run(handler, snapshot)
+            return
+
+        self._profiler = Profiler(handler or self.strategy, self)
+
+        with self._profiler:
+            self._run(handler, snapshot)
+
+    def resume(self, path: str, save: bool = True) -> None:
+        """
+        Restores the strategy, its indicators and its broker from a
+        snapshot written by run() or resume(), then runs only the
+        candles of the loaded data that are new since the snapshot.
+
+        A snapshot holds the state from just before the last candle of
+        its run, when that candle wasn't yet known to be the last, so
+        the last candle is run again along with the new ones. The
+        result is the same as running the whole of the new data from
+        its first candle. The data up to that candle must be unchanged,
+        which is checked against a fingerprint of it in the snapshot,
+        and the same symbols must be loaded.
+
+        Indicators that override compute() are computed again over the
+        whole of the new data. The strategy and the classes it holds
+        must be importable to be restored.
+
+        Args:
+            path (str): The path of the snapshot.
+            save (bool, optional): Whether to replace the snapshot with
+                one of this run. Defaults to True.
+
+        Raises:
+            ValueError: There is no data loaded, the file is not a
+                snapshot, or the data has changed since it was taken.
+        """
+        if self._stream is not None:
+            raise ValueError(
+                "A snapshot can only be resumed on data loaded with "
+                "load_data()"
+            )
+
+        feeds = self._loaded_feeds()
+        state = self._read_snapshot(path, feeds)
+
+        self._strategy = state["strategy"]
+        if self._strategy.broker is not None:
+            self._broker = self._strategy.broker
+
+        if not self.profile or (self._profiler and self._profiler.active):
+            self._resume(state, feeds, path if save else None)
+            return
+
+        self._profiler = Profiler(self.strategy, self)
+
+        with self._profiler:
+            self._resume(state, feeds, path if save else None)
+
+    async def run_live(
+        self,
+        source: AsyncIterable[Candle | tuple[Candle, str]],
+        frequency: timedelta = None,
+        max_queue: int = 1024,
+        executor: Executor = None
+    ) -> None:
+        """
+        Runs the strategy on candles as they arrive from an async
+        iterator, ie. a socket, a queue or a file being tailed, such as
+        a ReplaySource. Run it with asyncio.run(engine.run_live(source))
+        or await it alongside the rest of an event loop.
+
+        The source yields candles, or (candle, symbol) pairs for several
+        symbols, in time order. Each candle goes through the handler's
+        update(), the same as a backtest, so the broker fills orders
+        before the strategy sees it and the indicators are updated
+        through a DispatchPlan. The candles are checked against the
+        timeline as they are added, as no data was validated up front.
+
+        The source is read by its own task into a queue of at most
+        `max_queue` candles. If the strategy falls behind, the queue
+        fills and the source isn't read again until there's room, so it
+        is held back rather than buffered without bound. The strategy
+        gives the event loop back after each candle. A candle is run on
+        the event loop unless an executor is given, which keeps slow
+        indicators from holding up the loop at the cost of a thread
+        hop per candle. The candles are still run one at a time, so
+        the executor should be a thread pool.
+
+        The first candle of each symbol is marked as its first. The end
+        of a live source isn't known until after its last candle has
+        been run, so no candle is marked as the last, and the strategy's
+        on_end() is called once the source is exhausted instead.
+
+        Indicators holding their own back data are run on it before the
+        first candle is taken. Indicators that override compute() need
+        the whole dataset and can't be run live.
+
+        Args:
+            source (AsyncIterable[Candle | tuple[Candle, str]]): The
+                candles, or (candle, symbol) pairs, to run.
+            frequency (timedelta, optional): The frequency of the
+                candles. Defaults to None, the source's `frequency`.
+            max_queue (int, optional): The most candles read ahead of
+                the strategy. Defaults to 1024.
+            executor (Executor, optional): Runs each candle off the
+                event loop. Defaults to None, on the event loop.
+
+        Raises:
+            ValueError: There is no strategy, the frequency isn't known,
+                max_queue is not positive, or an indicator overrides
+                compute().
+            TypeError: The source yields something other than candles.
+        """
+        handler = self.strategy
+
+        if not handler:
+            raise ValueError("No handler to run")
+        if max_queue < 1:
+            raise ValueError(
+                f"max_queue must be a positive integer | "
+                f"Actual: {max_queue}"
+            )
+
+        frequency = frequency or getattr(source, "frequency", None)
+
+        if frequency is None:
+            raise ValueError(
+                "The frequency of the candles must be given, the source "
+                "has none"
+            )
+        if any(map(self._needs_precompute, handler.indicators.values())):
+            raise ValueError(
+                "Indicators that override compute() need the whole "
+                "dataset, they can't be run live"
+            )
+
+        if not self.profile or (self._profiler and self._profiler.active):
+            await self._run_live(
+                handler, source, frequency, max_queue, executor
+            )
+            return
+
+        self._profiler = Profiler(handler, self)
+
+        with self._profiler:
+            await self._run_live(
+                handler, source, frequency, max_queue, executor
+            )
+
+    async def _run_live(
+        self,
+        handler: StrategyBase,
+        source: AsyncIterable[Candle | tuple[Candle, str]],
+        frequency: timedelta,
+        max_queue: int,
+        executor: Executor
+    ) -> None:
+        """
+        Runs the candles of a live source, see run_live().
+        """
+        if handler.indicators:
+            self._run_indicators(handler.indicators)
+
+        handler.frequency = frequency
+        compiled = self._compile(handler)
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(max_queue)
+        reader = asyncio.create_task(self._read_live(source, queue))
+        seen = set()
+
+        try:
+            while True:
+                item = await queue.get()
+
+                if item is _END:
+                    break
+
+                if type(item) is tuple:
+                    candle, symbol = item
+                else:
+                    candle, symbol = item, None
+
+                if not isinstance(candle, Candle):
+                    raise TypeError(
+                        f"Expected argument type: Candle | "
+                        f"Actual: {type(candle)}"
+                    )
+
+                # candles are marked here rather than by the source, as
+                # each symbol starts whenever its first candle arrives
+                candle.is_first = symbol not in seen
+                candle.is_last = False
+                seen.add(symbol)
+
+                if executor is None:
+                    handler.update(candle, symbol)
+                    await asyncio.sleep(0)
+                else:
+                    # run in a copy of this context, so the candle is
+                    # timed by this run's profiler if it has one
+                    await loop.run_in_executor(
+                        executor, copy_context().run, handler.update,
+                        candle, symbol
+                    )
+
+            # re-raises an error reading the source
+            await reader
+        finally:
+            reader.cancel()
+            if compiled:
+                handler.plan = None
+
+        handler.on_end()
+
+    async def _read_live(
+        self, source: AsyncIterable, queue: asyncio.Queue
+    ) -> None:
+        """
+        Reads the source into the queue, waiting for room whenever it
+        is full, then marks the end of the source. The end is marked
+        too if reading fails, so the run takes the candles read before
+        the error and then raises it when it awaits the reader.
+        """
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception:
+            await queue.put(_END)
+            raise
+
+        await queue.put(_END)
+
+    def _run(self, handler: DataHandler = None, snapshot: str = None) -> None:
+        """
+        Runs the handler, see run().
+        """
         if not handler:
             handler = self.strategy
             data = self.data
@@ -45,24 +343,205 @@ class Engine:
         elif isinstance(handler, IndicatorBase):
             data = handler.data
 
-        if data is None or data.empty:
+            has_data = data is not None and not data.empty
+
+            if has_data and not validate_data(data):
+                raise ValueError(
+                    f"Back data of {type(handler).__name__} is improperly "
+                    f"formatted"
+                )
+
+        stream = feeds = None
+        if isinstance(handler, StrategyBase):
+            stream, feeds = self._stream, self._feeds
+
+        if (
+            stream is None and feeds is None and 
+            (data is None or data.empty)
+        ):
             raise ValueError("No data to run")
         if not handler:
             raise ValueError("No handler to run")
+
+        if snapshot is not None:
+            if not isinstance(handler, StrategyBase) or stream is not None:
+                raise ValueError(
+                    "Only a strategy run on data loaded with load_data() "
+                    "can be snapshot"
+                )
+
+            snapshot = self._snapshot(snapshot, feeds or {None: data})
+
+        if isinstance(handler, StrategyBase) and handler.broker is not None:
+            handler.broker.portfolio.reserve(self._bar_count(data, feeds))
+
+        if feeds is not None:
+            self._run_feeds(feeds, handler, snapshot)
+            return
         
+        if isinstance(handler, StrategyBase) and handler.indicators:
+            if stream is None:
+                self._precompute_indicators(handler, data)
+            elif any(map(self._needs_precompute, handler.indicators.values())):
+                raise ValueError(
+                    "Indicators that override compute() need the whole "
+                    "dataset, use load_data() instead of load_stream()"
+                )
+
         if handler.indicators:
-            self._run_indicators(handler)
+            self._run_indicators(handler.indicators)
+
+        if stream is None:
+            self._iter_data(data, handler, snapshot=snapshot)
+        else:
+            self._iter_stream(stream, handler)
+
+    def run_vectorized(self) -> pd.Series:
+        """
+        Runs a strategy that overrides signals() in one vectorized pass
+        over the loaded data instead of candle by candle.
+
+        The strategy's indicators are precomputed, then signals() gives
+        the position to hold after each candle. Each change of position
+        is traded at the open of the next candle, with the commission
+        of the broker's portfolio, and the trades and equity curve are
+        booked into the portfolio as the event driven run would.
+
+        on_candle() and the indicators' on_candle() are never called,
+        so the strategy should read its indicators from their
+        `computed` frames. Data for several symbols is run one symbol
+        at a time, selecting each before signals() is called.
+
+        Raises:
+            ValueError: There is no strategy or data to run, or the
+                data was loaded as a stream.
+            TypeError: The strategy doesn't override signals().
+
+        Returns:
+            pd.Series: The equity curve of the run.
+        """
+        strategy = self.strategy
+
+        if not strategy:
+            raise ValueError("No handler to run")
+        if not strategy.vectorizable:
+            raise TypeError(
+                f"{type(strategy).__name__} doesn't override signals()"
+            )
+        if self._stream is not None:
+            raise ValueError(
+                "A vectorized run needs the whole dataset, use load_data() "
+                "instead of load_stream()"
+            )
+
+        if self._feeds is not None:
+            feeds = self._feeds
+        elif self.data is not None and not self.data.empty:
+            feeds = {None: self.data}
+        else:
+            raise ValueError("No data to run")
+
+        portfolio = self.broker.portfolio
+        commission = portfolio.commission
+        cash = portfolio.cash
+
+        times = [d.index.as_unit("ns").asi8 for d in feeds.values()]
+        union = np.unique(np.concatenate(times))
+        flows = np.zeros(len(union))
+        value = np.zeros(len(union))
+
+        for (symbol, data), symbol_times in zip(feeds.items(), times):
+
+            if symbol is not None:
+                strategy.select(symbol)
+
+            held = self._signal_positions(strategy, data)
+            opens = data["open"].to_numpy(np.float64)
+            closes = data["close"].to_numpy(np.float64)
 
-        self._iter_data(data, handler)
+            trades = np.diff(held, prepend=0.0)
+            costs = trades * opens
 
-    def load_data(self, data: pd.DataFrame) -> None:
+            # positions of this symbol's rows among every datetime, and
+            # the last row of the symbol at or before each datetime
+            rows = np.searchsorted(union, symbol_times)
+            last = np.searchsorted(symbol_times, union, side="right") - 1
+
+            flows[rows] -= costs + np.abs(costs) * commission
+            value += np.where(last >= 0, (held * closes)[last], 0.0)
+
+            traded = trades != 0
+            portfolio.fill_many(
+                symbol, data.index[traded], trades[traded], opens[traded]
+            )
+            portfolio.set_price(symbol, closes[-1])
+
+        equity = cash + np.cumsum(flows) + value
+        index = pd.DatetimeIndex(union.astype("datetime64[ns]"))
+
+        tz = next(iter(feeds.values())).index.tz
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+
+        portfolio.record_many(index, equity)
+        return portfolio.equity_curve
+
+    def load_data(
+        self, data: pd.DataFrame | Mapping[str, pd.DataFrame]
+    ) -> None:
         """ 
         Loads the data being passed in for the strategy to be tested on
 
+        Data for several symbols is given as a mapping of each symbol
+        to its data. Every symbol must have the same frequency.
+
         Args:
-            data (pd.DataFrame): Data to be tested on.
+            data (pd.DataFrame | Mapping[str, pd.DataFrame]): Data to be
+                tested on, or the data of each symbol.
+
+        Raises:
+            TypeError: data is not a pandas dataframe or mapping of them
+            InvalidDataException: data is improperly formatted
         """
-        self.data = data
+        self._stream = None
+
+        if not isinstance(data, Mapping):
+            self.data = data
+            self._feeds = None
+            return
+
+        for symbol, frame in data.items():
+
+            if not isinstance(frame, pd.DataFrame):
+                raise TypeError(
+                    f"Data for {symbol} must be a pandas.DataFrame"
+                )
+            if not validate_data(frame):
+                raise ValueError(f"Data for {symbol} is improperly formatted")
+
+        if not data:
+            raise ValueError("No data to run")
+
+        self._feeds = dict(data)
+        self._data = None
+
+    def load_stream(self, chunks: Iterable[pd.DataFrame]) -> None:
+        """
+        Loads data for the strategy to be tested on as time ordered
+        chunks, ie. from `stream_data`, so that only two chunks are
+        held at a time. The chunks are validated as they are run, and
+        can only be run once.
+
+        Give the strategy and its indicators a max_length to keep the
+        memory of the whole run bounded.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Data to be tested on, split
+                into chunks in time order.
+        """
+        self._stream = chunks
+        self._data = None
+        self._feeds = None
 
     def load_strategy(self, strategy: StrategyBase) -> None:
         """
@@ -74,32 +553,419 @@ class Engine:
         self.strategy = strategy
         strategy.broker = self.broker
 
-    def _run_indicators(self, handler: DataHandler) -> None:
+    def _signal_positions(
+        self, strategy: StrategyBase, data: pd.DataFrame
+    ) -> np.ndarray:
         """
-        For each indicator in the handler, it will check if there
-        is data stored by the indicator.
-        
-        If there is, it will call run(indicator) on that indicator. 
-        
-        If there isnt, it will recursively call run_indicators() on
-        that indicator.
+        Precomputes the strategy's indicators on the data and works out
+        the position held during each candle from its signals, which is
+        the signal of the candle before.
 
         Args:
-            handler (DataHandler): The handler which contains the 
-                indicators
+            strategy (StrategyBase): The strategy, with the symbol of
+                the data selected.
+            data (pd.DataFrame): The data of one symbol.
 
         Raises:
-            TypeError: The handler is not a DataHandler object
+            ValueError: signals() didn't return one value per row.
+
+        Returns:
+            np.ndarray: The shares held during each candle.
         """
-    
-        for i in handler.indicators:
+        if strategy.indicators:
+            self._precompute_indicators(strategy, data)
+
+        signals = strategy.signals(data)
+
+        if len(signals) != len(data):
+            raise ValueError(
+                f"Expected signals() to return {len(data)} values | "
+                f"Actual: {len(signals)}"
+            )
+
+        signals = pd.Series(np.asarray(signals, dtype=np.float64))
+        signals = signals.ffill().fillna(0.0).to_numpy()
+
+        held = np.empty(len(data))
+        held[0] = 0.0
+        held[1:] = signals[:-1]
+        return held
+
+    def _bar_count(
+        self, data: pd.DataFrame, feeds: dict[str, pd.DataFrame]
+    ) -> int:
+        """
+        The number of distinct datetimes a run will see, which sizes the
+        equity curve of the portfolio. 0 for a stream, whose length is
+        not known up front.
+
+        Args:
+            data (pd.DataFrame): The data of a single symbol.
+            feeds (dict[str, pd.DataFrame]): The data of each symbol.
+        """
+        if feeds is not None:
+            return len(np.unique(np.concatenate(
+                [d.index.as_unit("ns").asi8 for d in feeds.values()]
+            )))
+
+        return 0 if data is None else len(data)
+
+    def _run_indicators(self, *indicators: dict) -> None:
+        """
+        Walks the indicators, depth first, for those with data stored
+        by the indicator.
+
+        Each of them is run with run(indicator), which also passes its
+        data on to the indicators below it, so those aren't walked. The
+        indicators without data are walked into instead. An indicator
+        held by several handlers is only run once.
+
+        The runs don't depend on each other, so with more than one
+        process they are spread over a process pool. Each indicator is
+        sent to a worker, run there, and its state is copied back into
+        it, which replaces the indicators below it with the worker's
+        copies. They are run in this process instead if any of them
+        shares an indicator with the others or with the rest of the
+        tree, as the copies would no longer be shared.
+
+        Args:
+            *indicators (dict): The indicators of a handler, one dict
+                for each symbol of a handler given several symbols.
+        """
+        pending = [
+            i for d in reversed(indicators) for i in reversed(d.values())
+        ]
+        seen = set()
+        back_filled = []
+
+        while pending:
+            i = pending.pop()
+
+            if id(i) in seen:
+                continue
+            seen.add(id(i))
 
             if i.data is not None and not i.data.empty:
+                back_filled.append(i)
+            else:
+                pending.extend(reversed(i.indicators.values()))
+
+        processes = self.processes or os.cpu_count() or 1
+
+        if (
+            processes == 1 or len(back_filled) < 2 or
+            not self._independent(back_filled, seen)
+        ):
+            for i in back_filled:
                 self.run(i)
-            elif i.indicators:
-                self._run_indicators(i)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(back_filled))
+        ) as executor:
+            states = executor.map(
+                _pre_run, back_filled, repeat(self.cache)
+            )
+
+            for i, state in zip(back_filled, states):
+                i.__dict__.update(state)
+
+    def _independent(
+        self, indicators: list[IndicatorBase], walked: set[int]
+    ) -> bool:
+        """
+        Whether no indicator is reached from more than one of the
+        indicators, counting each of them and every indicator below it,
+        or from the handlers walked to find them.
+
+        Args:
+            indicators (list[IndicatorBase]): The indicators to be run.
+            walked (set[int]): The ids of the indicators walked to find
+                them, including themselves.
+        """
+        outside = walked - {id(i) for i in indicators}
+        reached = set()
+
+        for indicator in indicators:
+            pending = [indicator]
+            tree = set()
+
+            while pending:
+                i = pending.pop()
+                if id(i) not in tree:
+                    tree.add(id(i))
+                    pending.extend(i.indicators.values())
+
+            if tree & reached or tree & outside:
+                return False
+
+            reached |= tree
+
+        return True
+
+    def _precompute_indicators(
+        self, 
+        handler: DataHandler, 
+        data: pd.DataFrame, 
+        frequency: timedelta = None
+    ) -> None:
+        """
+        For each indicator in the handler, works out the data it will
+        be given during the run, its own back data followed by the
+        handler's data resampled to its frequency. Indicators that
+        override compute() are precomputed on it, then the same is
+        done for their own indicators.
+
+        Args:
+            handler (DataHandler): The handler which contains the
+                indicators.
+            data (pd.DataFrame): The data the handler will be given.
+            frequency (timedelta, optional): The frequency of the data.
+                Defaults to None, in which case it is worked out.
+        """
+        frequency = frequency or get_frequency(data)
+
+        for i in handler.indicators.values():
+
+            if not self._needs_precompute(i):
+                continue
+
+            has_data = i.data is not None and not i.data.empty
+            
+            i_frequency = (
+                i.frequency or 
+                (get_frequency(i.data) if has_data else frequency)
+            )
 
-    def _iter_data(self, data: pd.DataFrame, handler: DataHandler) -> None:
+            i_data = (
+                data if i_frequency == frequency 
+                else resample_data(data, i_frequency)
+            )
+
+            # back data runs first, then only newer candles are passed
+            if has_data:
+                i_data = pd.concat(
+                    [i.data, i_data[i_data.index > i.data.index[-1]]]
+                )
+
+            if i.precomputable:
+                i.precompute(i_data, self.cache)
+
+            if i.indicators:
+                self._precompute_indicators(i, i_data, i_frequency)
+
+    def _needs_precompute(self, indicator: IndicatorBase) -> bool:
+        """
+        Whether the indicator or any indicator nested in it overrides
+        compute().
+
+        Args:
+            indicator (IndicatorBase): The indicator to check.
+        """
+        return indicator.precomputable or any(
+            self._needs_precompute(i) for i in indicator.indicators.values()
+        )
+
+    def _run_feeds(
+        self,
+        feeds: dict[str, pd.DataFrame],
+        handler: DataHandler,
+        snapshot: dict = None
+    ) -> None:
+        """
+        Prepares the indicators of each symbol, precomputing and running
+        them on that symbol's data, then runs every symbol's data merged
+        in time order.
+
+        Args:
+            feeds (dict[str, pd.DataFrame]): The data of each symbol.
+            handler (DataHandler): handler to be passsed the data
+            snapshot (dict, optional): The snapshot to write during the
+                run, see _snapshot(). Defaults to None.
+
+        Raises:
+            ValueError: The symbols don't all have the same frequency.
+        """
+        frequencies = {s: get_frequency(d) for s, d in feeds.items()}
+
+        if len(set(frequencies.values())) > 1:
+            raise ValueError(
+                f"Every symbol must have the same frequency: {frequencies}"
+            )
+
+        books = []
+
+        for symbol, data in feeds.items():
+
+            handler.select(symbol)
+
+            if handler.indicators:
+                self._precompute_indicators(
+                    handler, data, frequencies[symbol]
+                )
+                books.append(handler.indicators)
+
+        # every symbol's indicators are run together, so they can share
+        # one pool of processes
+        if books:
+            self._run_indicators(*books)
+
+        self._iter_feeds(feeds, handler, snapshot=snapshot)
+
+    def _iter_feeds(
+        self,
+        feeds: dict[str, pd.DataFrame],
+        handler: DataHandler,
+        first: bool = True,
+        snapshot: dict = None,
+        uniform: bool = None
+    ) -> None:
+        """
+        Merges the candles of every symbol in time order with a k-way
+        heap merge, so each candle costs O(log k) for k symbols, and
+        passes each one to the handler with its symbol. Candles with
+        the same datetime are passed in the order the symbols were
+        loaded, and each symbol has its own first and last candle.
+
+        Args:
+            feeds (dict[str, pd.DataFrame]): The data of each symbol.
+            handler (DataHandler): handler to be passsed the data
+            first (bool, optional): Whether the data starts the dataset
+                of each symbol. Defaults to True.
+            snapshot (dict, optional): The snapshot to write during the
+                run, see _snapshot(). Defaults to None.
+            uniform (bool, optional): Whether every symbol's data is
+                free of gaps, see is_uniform(). Defaults to None, checked
+                here.
+        """
+        if first:
+            handler.frequency = get_frequency(next(iter(feeds.values())))
+
+        if uniform is None:
+            uniform = all(is_uniform(d) for d in feeds.values())
+
+        candles = merge(
+            *(
+                zip(self._candles(d, first), repeat(s))
+                for s, d in feeds.items()
+            ),
+            key=lambda pair: pair[0].timestamp
+        )
+
+        compiled = self._compile(handler)
+
+        # gapped data is left to the per candle checks, see _iter_data
+        trusted = handler.trusted
+        handler.trusted = uniform
+
+        if snapshot is not None:
+            candles = self._snapshot_before(
+                candles, snapshot, handler, trusted
+            )
+
+        try:
+            for candle, symbol in candles:
+                handler.update(candle, symbol)
+
+            if snapshot is not None:
+                os.replace(snapshot["path"] + ".tmp", snapshot["path"])
+        finally:
+            handler.trusted = trusted
+            if compiled:
+                handler.plan = None
+            if snapshot is not None:
+                tmp = snapshot["path"] + ".tmp"
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    def _iter_stream(
+        self, chunks: Iterable[pd.DataFrame], handler: DataHandler
+    ) -> None:
+        """
+        Runs each chunk through _iter_data in order. A chunk is only
+        run once the next one has arrived, so the last candle of the
+        last chunk can be marked as the last candle of the dataset.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): data to be passed to
+                handler, split into chunks in time order.
+            handler (DataHandler): handler to be passsed the data
+
+        Raises:
+            ValueError: A chunk is improperly formatted or out of order
+        """
+        current = None
+        before = None # datetime of the last candle run
+        first = True
+
+        for chunk in chunks:
+
+            if chunk.empty:
+                continue
+            if not validate_data(chunk):
+                raise ValueError("Data is improperly formatted")
+
+            if current is not None:
+                if chunk.index[0] <= current.index[-1]:
+                    raise ValueError(
+                        f"Chunk starting at {chunk.index[0]} is not after "
+                        f"the previous chunk ending at {current.index[-1]}"
+                    )
+
+                self._iter_data(
+                    current, handler, first=first, last=False,
+                    uniform=self._uniform(current, before, handler)
+                )
+                before = current.index[-1]
+                first = False
+
+            current = chunk
+
+        if current is None:
+            raise ValueError("No data to run")
+
+        self._iter_data(
+            current, handler, first=first, last=True,
+            uniform=self._uniform(current, before, handler)
+        )
+
+    def _uniform(
+        self, chunk: pd.DataFrame, before: pd.Timestamp, handler: DataHandler
+    ) -> bool:
+        """
+        Whether a chunk of a stream is free of gaps, both within itself
+        and from the end of the chunk run before it.
+
+        Args:
+            chunk (pd.DataFrame): The chunk about to be run.
+            before (pd.Timestamp): The datetime of the last candle run,
+                None if the chunk starts the stream.
+            handler (DataHandler): The handler the chunks are run on.
+
+        Returns:
+            bool: Whether the chunk can be trusted, see is_uniform().
+        """
+        if not is_uniform(chunk):
+            return False
+        if before is None:
+            return True
+
+        step = handler.frequency
+        index = chunk.index
+
+        return index[0] - before == step and (
+            len(index) < 2 or index[1] - index[0] == step
+        )
+
+    def _iter_data(
+        self, 
+        data: pd.DataFrame, 
+        handler: DataHandler, 
+        first: bool = True, 
+        last: bool = True,
+        snapshot: dict = None,
+        uniform: bool = None
+    ) -> None:
         """
         Assigns the handler the frequency of the data. And identifies
         the first and last candles in the dataset.
@@ -111,26 +977,352 @@ class Engine:
         Args:
             data (pd.DataFrame): data to be passed to handler
             handler (DataHandler): handler to be passsed the data
+            first (bool, optional): Whether data starts the dataset.
+                Defaults to True.
+            last (bool, optional): Whether data ends the dataset.
+                Defaults to True.
+            snapshot (dict, optional): The snapshot to write during the
+                run, see _snapshot(). Defaults to None.
+            uniform (bool, optional): Whether the data is free of gaps,
+                carrying on from any data run before it, see
+                is_uniform(). Defaults to None, checked here.
 
         Raises:
             TypeError: data or handler is not the correct type
             InvalidDataException: data is improperly formatted
         """
 
-        handler.frequency = get_frequency(data)
+        if first:
+            handler.frequency = get_frequency(data)
 
-        first_dt = data.iloc[0].name
-        last_dt = data.iloc[-1].name
+        compiled = self._compile(handler)
 
-        for dt, row in data.iterrows():
-            
-            candle = Candle(row)
-    
-            candle.is_first = dt == first_dt
-            candle.is_last = dt == last_dt
+        if uniform is None:
+            uniform = is_uniform(data)
+
+        # the data was validated as a whole when it was loaded, so the
+        # handlers can skip checking each candle against the timeline,
+        # unless it has gaps, which the per candle checks decide on
+        trusted = handler.trusted
+        handler.trusted = uniform
+
+        candles = self._candles(data, first, last)
+
+        if snapshot is not None:
+            candles = self._snapshot_before(
+                candles, snapshot, handler, trusted
+            )
+
+        try:
+            for candle in candles:
+                handler.update(candle)
+
+            if snapshot is not None:
+                os.replace(snapshot["path"] + ".tmp", snapshot["path"])
+        finally:
+            handler.trusted = trusted
+            if compiled:
+                handler.plan = None
+            if snapshot is not None:
+                tmp = snapshot["path"] + ".tmp"
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    def _resume(
+        self, state: dict, feeds: dict[str, pd.DataFrame], snapshot: str
+    ) -> None:
+        """
+        Runs the candles of the data from the cut of a restored snapshot
+        onwards, see resume().
+
+        Args:
+            state (dict): The snapshot, with the strategy restored.
+            feeds (dict[str, pd.DataFrame]): The data of each symbol,
+                keyed None for a single symbol.
+            snapshot (str): The path to write a snapshot of this run to,
+                None to not write one.
+        """
+        handler = self.strategy
+        cut = state["cut"]
+
+        for symbol, data in feeds.items():
+
+            if symbol is not None:
+                handler.select(symbol)
+
+            if handler.indicators:
+                self._precompute_indicators(handler, data)
+
+        tails = {
+            symbol: data[data.index.as_unit("ns").asi8 >= cut]
+            for symbol, data in feeds.items()
+        }
+
+        if snapshot is not None:
+            snapshot = self._snapshot(snapshot, feeds)
 
-            handler.update(candle)
+        # the tails carry on from the candles in the snapshot, so they are
+        # only free of gaps if the data they were cut from is
+        uniform = all(is_uniform(d) for d in feeds.values())
+
+        if None in tails:
+            self._iter_data(
+                tails[None], handler, first=False, snapshot=snapshot,
+                uniform=uniform
+            )
+        else:
+            self._iter_feeds(
+                tails, handler, first=False, snapshot=snapshot,
+                uniform=uniform
+            )
+
+    def _loaded_feeds(self) -> dict[str, pd.DataFrame]:
+        """
+        The data of each symbol loaded, keyed None for a single symbol.
+
+        Raises:
+            ValueError: No data is loaded.
+        """
+        if self._feeds is not None:
+            return self._feeds
+        if self.data is not None and not self.data.empty:
+            return {None: self.data}
+
+        raise ValueError("No data to run")
+
+    def _snapshot(self, path: str, feeds: dict[str, pd.DataFrame]) -> dict:
+        """
+        Works out where a run should be snapshot and what it is taken of.
+
+        The snapshot is cut just before the first candle of the last
+        datetime any symbol ends on, so no candle before the cut is the
+        last of its symbol, and every symbol has candles from the cut on.
+
+        Args:
+            path (str): The path to write the snapshot to.
+            feeds (dict[str, pd.DataFrame]): The data of each symbol,
+                keyed None for a single symbol.
+
+        Returns:
+            dict: The path, and the state to write with the strategy,
+                which holds the cut in epoch nanoseconds and the number
+                of rows and fingerprint of each symbol before the cut.
+        """
+        times = {s: d.index.as_unit("ns").asi8 for s, d in feeds.items()}
+        cut = min(int(t[-1]) for t in times.values())
+        prefix = {}
+
+        for symbol, data in feeds.items():
+            rows = int(np.searchsorted(times[symbol], cut))
+            prefix[symbol] = (rows, fingerprint_data(data.iloc[:rows]))
+
+        return {
+            "path": path,
+            "cut": cut,
+            "state": {
+                "version": _SNAPSHOT_VERSION,
+                "cut": cut,
+                "prefix": prefix
+            }
+        }
+
+    def _read_snapshot(
+        self, path: str, feeds: dict[str, pd.DataFrame]
+    ) -> dict:
+        """
+        Reads a snapshot and checks that the data loaded carries on
+        from the data it was taken of.
+
+        Args:
+            path (str): The path of the snapshot.
+            feeds (dict[str, pd.DataFrame]): The data of each symbol,
+                keyed None for a single symbol.
+
+        Raises:
+            ValueError: The file is not a snapshot, or the data doesn't
+                carry on from it.
+
+        Returns:
+            dict: The snapshot, holding the restored strategy.
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+
+        if (
+            not isinstance(state, dict) or 
+            state.get("version") != _SNAPSHOT_VERSION
+        ):
+            raise ValueError(f"{path} is not a snapshot of this engine")
+
+        if set(state["prefix"]) != set(feeds):
+            raise ValueError(
+                f"Snapshot was taken of symbols: {list(state['prefix'])} | "
+                f"Loaded: {list(feeds)}"
+            )
+
+        cut = state["cut"]
+
+        for symbol, data in feeds.items():
+            rows, fingerprint = state["prefix"][symbol]
+            times = data.index.as_unit("ns").asi8
+            name = "Data" if symbol is None else f"Data for {symbol}"
+
+            if (
+                int(np.searchsorted(times, cut)) != rows or 
+                fingerprint_data(data.iloc[:rows]) != fingerprint
+            ):
+                raise ValueError(
+                    f"{name} before {pd.Timestamp(cut, tz=data.index.tz)} "
+                    f"has changed since the snapshot was taken"
+                )
+            if rows == len(data):
+                raise ValueError(
+                    f"{name} ends before "
+                    f"{pd.Timestamp(cut, tz=data.index.tz)}, where the "
+                    f"snapshot was taken"
+                )
+
+        return state
+
+    def _snapshot_before(
+        self,
+        candles: Iterator,
+        snapshot: dict,
+        handler: DataHandler,
+        trusted: bool
+    ) -> Iterator:
+        """
+        Passes on the candles, or (candle, symbol) pairs, writing the
+        snapshot of the handler just before the first candle at or after
+        the cut of the snapshot.
+
+        Args:
+            candles (Iterator): The candles about to be run.
+            snapshot (dict): The snapshot to write, see _snapshot().
+            handler (DataHandler): The strategy being run.
+            trusted (bool): Whether the handler was trusted before the
+                run, as it is restored with.
+
+        Yields:
+            Candle | tuple[Candle, str]: The next candle, or pair.
+        """
+        cut = snapshot["cut"]
+
+        for item in candles:
+            candle = item[0] if type(item) is tuple else item
+
+            if candle.timestamp >= cut:
+                self._capture(handler, trusted, snapshot)
+                yield item
+                break
+
+            yield item
+
+        yield from candles
+
+    def _capture(
+        self, handler: DataHandler, trusted: bool, snapshot: dict
+    ) -> None:
+        """
+        Pickles the handler, and so its indicators and broker, into a
+        temporary file next to the snapshot, which replaces the snapshot
+        once the run has finished. The handler is pickled without the
+        plan and trust the engine gave it for the run.
+
+        Args:
+            handler (DataHandler): The strategy being run.
+            trusted (bool): Whether the handler was trusted before the
+                run.
+            snapshot (dict): The snapshot to write, see _snapshot().
+        """
+        plan = handler.plan
+        running = handler.trusted
+        handler.plan = None
+        handler.trusted = trusted
+
+        try:
+            with open(snapshot["path"] + ".tmp", "wb") as f:
+                pickle.dump(
+                    {**snapshot["state"], "strategy": handler}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+        finally:
+            handler.trusted = running
+            handler.plan = plan
+
+    def _compile(self, handler: DataHandler) -> bool:
+        """
+        Compiles the indicators of the handler into a DispatchPlan for
+        the candles about to be passed to it, unless it already has one.
+        The plan should be removed once they have all been passed.
+
+        Args:
+            handler (DataHandler): The handler, with its frequency set.
+
+        Raises:
+            ValueError: An indicator's frequency is not compatible.
+
+        Returns:
+            bool: Whether a plan was compiled.
+        """
+        if handler.plan is not None or not handler.indicators:
+            return False
+
+        handler.plan = DispatchPlan(handler)
+        return True
+
+    def _candles(
+        self, data: pd.DataFrame, first: bool = True, last: bool = True
+    ) -> Iterator[Candle]:
+        """
+        Creates a candle for each row of the data in order.
+
+        The int64 nanosecond timestamps and OHLCV columns are taken out
+        as numpy arrays once and turned into python scalars a chunk at
+        a time, so no datetime objects are made. The first and last
+        candles are found by their row position.
+
+        Args:
+            data (pd.DataFrame): data to create candles from
+            first (bool, optional): Whether data starts the dataset.
+                Defaults to True.
+            last (bool, optional): Whether data ends the dataset.
+                Defaults to True.
+
+        Yields:
+            Candle: The candle of the next row.
+        """
+        # row positions of the first and last candles, -1 if not here
+        first_row = 0 if first else -1
+        last_row = len(data) - 1 if last else -1
+        tz = data.index.tz
+        columns = [data.index.as_unit("ns").asi8] + [
+            data[c].to_numpy() 
+            for c in ("open", "high", "low", "close", "volume")
+        ]
+
+        for start in range(0, len(data), _CHUNK_SIZE):
+            stop = start + _CHUNK_SIZE
+
+            rows = zip(*(c[start:stop].tolist() for c in columns))
+
+            for i, row in enumerate(rows, start):
+
+                candle = Candle.from_timestamp(*row, tz)
+
+                candle.is_first = i == first_row
+                candle.is_last = i == last_row
+
+                yield candle
     
+    @property
+    def profiler(self) -> Profiler:
+        """
+        The profiler of the last run, None if it wasn't profiled. Its
+        report() gives the time spent in each handler and phase.
+        """
+        return self._profiler
+
     @property
     def data(self) -> pd.DataFrame:
         return self._data
@@ -196,3 +1388,21 @@ class Engine:
 
         self._broker = broker
         if self.strategy: self.strategy.broker = self.broker
+
+def _pre_run(indicator: IndicatorBase, cache: IndicatorCache) -> dict:
+    """
+    Runs an indicator on its back data in a worker process.
+
+    Args:
+        indicator (IndicatorBase): The indicator, sent to the worker.
+        cache (IndicatorCache): The cache of the engine, or None.
+
+    Returns:
+        dict: The indicator's state after the run, without its back
+            data, which the parent process already holds.
+    """
+    Engine(cache=cache).run(indicator)
+
+    state = vars(indicator).copy()
+    del state["_data"], state["_arguments"]
+    return state
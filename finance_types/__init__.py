@@ -1,5 +1,11 @@
 from candle import Candle, Direction
 from indicator_dict import IndicatorDict
 from candle_list import CandleList
+from candle_aggregator import CandleAggregator
+from tick_aggregator import TickAggregator
+from order import Order, OrderType, OrderStatus, Side
 
-__all__ = ['Candle', 'Direction', 'IndicatorDict', 'CandleList']
+__all__ = [
+    'Candle', 'Direction', 'IndicatorDict', 'CandleList', 'CandleAggregator',
+    'TickAggregator', 'Order', 'OrderType', 'OrderStatus', 'Side'
+]
@@ -1,6 +1,5 @@
 from __future__ import annotations
-from datetime import datetime
-from dataclasses import dataclass
+from datetime import datetime, tzinfo
 from numbers import Number
 import pandas as pd
 from enum import Enum
@@ -13,14 +12,23 @@ class Direction(Enum):
     DOWN = 1
     UP = 2
 
-@dataclass(frozen=True)
 class Candle:
     """
     Data type with attributes for OHLCV properties and `datetime`. Also
     derives other properties from OHLCV ie. `movement` and `direction`.
 
+    The OHLCV values and `datetime` are read only once the `Candle` is
+    made, the attributes are stored in `__slots__` to keep each `Candle`
+    small and `movement` and `direction` are only worked out once.
+
+    The time of a `Candle` is held as an int of epoch nanoseconds in
+    UTC, `timestamp`, which is what the engine compares and does
+    arithmetic with. `datetime` is only made from it when asked for.
+
     Attributes:
         datetime (datetime): Datetime object of `Candle`.
+        timestamp (int): Epoch nanoseconds of `datetime` in UTC.
+        tz (tzinfo): The timezone of `datetime`, None if naive.
         open (float): Starting price.
         high (float): Highest price.
         low (float): Lowest price.
@@ -32,7 +40,13 @@ class Candle:
             dataset.
     """
 
-    def __init__(self, candle: pd.Series) -> None:
+    __slots__ = (
+        "_timestamp", "_tz", "_datetime", "_open", "_high", "_low",
+        "_close", "_volume", "_movement", "_direction", "is_first",
+        "is_last"
+    )
+
+    def __init__(self, candle: pd.Series, validate: bool = True) -> None:
         """
         Assigns the instance variables to the data in the `candle`
         pandas series data argument passed in.
@@ -43,17 +57,146 @@ class Candle:
         Args:
             candle (pandas.Series): Data that contains the OHLCV and
                 datetime values for the properties.
-        """
-
-        self.datetime: datetime = candle.name
-        self.open: float = candle.open
-        self.high: float = candle.high
-        self.low: float = candle.low
-        self.close: float = candle.close
-        self.volume: float = candle.volume
+            validate (bool, optional): Whether to check the types of
+                the values. Defaults to True.
+
+        Raises:
+            TypeError: The index of the series is not a datetime.
+        """
+        self._timestamp, self._tz = _nanoseconds(candle.name)
+        self._datetime: datetime = None
+        self._open: float = candle.open
+        self._high: float = candle.high
+        self._low: float = candle.low
+        self._close: float = candle.close
+        self._volume: float = candle.volume
+        self._movement: float = None
+        self._direction: Direction = None
         self.is_first: bool = False
         self.is_last: bool = False
 
+        if validate:
+            self.validate()
+
+    @classmethod
+    def from_values(
+        cls,
+        datetime: datetime,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        validate: bool = False
+    ) -> Candle:
+        """
+        Creates a `Candle` straight from its datetime and OHLCV values.
+        This skips the type checks by default, as the values usually
+        come from a dataset that has already been validated as a whole.
+
+        Raises:
+            TypeError: datetime is not a datetime.
+
+        Args:
+            datetime (datetime): The datetime of the candle.
+            open (float): Starting price.
+            high (float): Highest price.
+            low (float): Lowest price.
+            close (float): Closing price.
+            volume (float): Amount of shares traded.
+            validate (bool, optional): Whether to check the types of
+                the values. Defaults to False.
+
+        Returns:
+            Candle: The new candle.
+        """
+        candle = cls.__new__(cls)
+
+        candle._timestamp, candle._tz = _nanoseconds(datetime)
+        candle._datetime = None
+        candle._open = open
+        candle._high = high
+        candle._low = low
+        candle._close = close
+        candle._volume = volume
+        candle._movement = None
+        candle._direction = None
+        candle.is_first = False
+        candle.is_last = False
+
+        if validate:
+            candle.validate()
+
+        return candle
+
+    @classmethod
+    def from_timestamp(
+        cls,
+        timestamp: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        tz: tzinfo = None
+    ) -> Candle:
+        """
+        Creates a `Candle` from its epoch nanoseconds and OHLCV values
+        without any checks or datetime objects, which is how the engine
+        creates candles.
+
+        Args:
+            timestamp (int): Epoch nanoseconds of the candle in UTC.
+            open (float): Starting price.
+            high (float): Highest price.
+            low (float): Lowest price.
+            close (float): Closing price.
+            volume (float): Amount of shares traded.
+            tz (tzinfo, optional): The timezone of the candle's
+                datetime. Defaults to None, a naive datetime.
+
+        Returns:
+            Candle: The new candle.
+        """
+        candle = cls.__new__(cls)
+
+        candle._timestamp = timestamp
+        candle._tz = tz
+        candle._datetime = None
+        candle._open = open
+        candle._high = high
+        candle._low = low
+        candle._close = close
+        candle._volume = volume
+        candle._movement = None
+        candle._direction = None
+        candle.is_first = False
+        candle.is_last = False
+
+        return candle
+
+    def validate(self) -> None:
+        """
+        Ensures the `timestamp` is an int and that each of the OHLCV
+        values is a number.
+
+        Raises:
+            TypeError: A value is not the correct type.
+        """
+        if not isinstance(self._timestamp, int):
+            raise TypeError(
+                f"Expected timestamp type: int | "
+                f"Actual: {type(self._timestamp)}"
+            )
+
+        for name in ("open", "high", "low", "close", "volume"):
+            value = getattr(self, name)
+            if not isinstance(value, Number):
+                raise TypeError(
+                    f"Expected {name} type: Number | "
+                    f"Actual: {type(value)}"
+                )
+
     @property
     def movement(self) -> float:
         """
@@ -63,7 +206,9 @@ class Candle:
         Returns:
             float: `Candle.close` - `Candle.open`
         """
-        return self.close - self.open
+        if self._movement is None:
+            self._movement = self._close - self._open
+        return self._movement
 
     @property
     def direction(self) -> Direction:
@@ -74,39 +219,51 @@ class Candle:
         Returns:
             Direction: The direction of the candle
         """
-        if self.movement > 0:
-            return Direction.UP
+        if self._direction is None:
+
+            if self.movement > 0:
+                self._direction = Direction.UP
+
+            elif self.movement < 0:
+                self._direction = Direction.DOWN
+
+            else: # movement is 0
+                self._direction = Direction.EVEN
 
-        elif self.movement < 0:
-            return Direction.DOWN
+        return self._direction
 
-        else: # movement is 0
-            return Direction.EVEN
-        
     @property
     def datetime(self) -> datetime:
         """
-        Returns the datetime of the `Candle` object.
+        Returns the datetime of the `Candle` object, made from its
+        `timestamp` the first time it is asked for.
 
         Returns:
             datetime: The datetime of the candle.
         """
+        if self._datetime is None:
+            self._datetime = pd.Timestamp(self._timestamp, tz=self._tz)
         return self._datetime
-    
-    @datetime.setter
-    def datetime(self, datetime: datetime) -> None:
+
+    @property
+    def timestamp(self) -> int:
         """
-        Sets the datetime of the `Candle` object.
+        Returns the epoch nanoseconds of the `Candle` object in UTC.
 
-        Args:
-            datetime (datetime): The datetime to set for the candle.
+        Returns:
+            int: The timestamp of the candle.
         """
-        if not isinstance(datetime, datetime):
-            raise TypeError(
-                f"Expected datetime type: datetime | "
-                f"Actual: {type(datetime)}"
-            )
-        self._datetime = datetime
+        return self._timestamp
+
+    @property
+    def tz(self) -> tzinfo:
+        """
+        Returns the timezone of the `Candle` object's datetime.
+
+        Returns:
+            tzinfo: The timezone, None if the datetime is naive.
+        """
+        return self._tz
 
     @property
     def open(self) -> float:
@@ -117,21 +274,6 @@ class Candle:
             float: The open price of the candle.
         """
         return self._open
-    
-    @open.setter
-    def open(self, open: float) -> None:
-        """
-        Sets the open price of the `Candle` object.
-
-        Args:
-            open (float): The open price to set for the candle.
-        """
-        if not isinstance(open, Number):
-            raise TypeError(
-                f"Expected open type: Number | "
-                f"Actual: {type(open)}"
-            )
-        self._open = open
 
     @property
     def high(self) -> float:
@@ -141,23 +283,8 @@ class Candle:
         Returns:
             float: The high price of the candle.
         """
-        return self._high  
-    
-    @high.setter
-    def high(self, high: float) -> None:
-        """
-        Sets the high price of the `Candle` object.
+        return self._high
 
-        Args:
-            high (float): The high price to set for the candle.
-        """
-        if not isinstance(high, Number):
-            raise TypeError(
-                f"Expected high type: Number | "
-                f"Actual: {type(high)}"
-            )
-        self._high = high
-    
     @property
     def low(self) -> float:
         """
@@ -167,21 +294,6 @@ class Candle:
             float: The low price of the candle.
         """
         return self._low
-    
-    @low.setter
-    def low(self, low: float) -> None:
-        """
-        Sets the low price of the `Candle` object.
-
-        Args:
-            low (float): The low price to set for the candle.
-        """
-        if not isinstance(low, Number):
-            raise TypeError(
-                f"Expected low type: Number | "
-                f"Actual: {type(low)}"
-            )
-        self._low = low
 
     @property
     def close(self) -> float:
@@ -192,21 +304,6 @@ class Candle:
             float: The close price of the candle.
         """
         return self._close
-    
-    @close.setter
-    def close(self, close: float) -> None:
-        """
-        Sets the close price of the `Candle` object.
-
-        Args:
-            close (float): The close price to set for the candle.
-        """
-        if not isinstance(close, Number):
-            raise TypeError(
-                f"Expected close type: Number | "
-                f"Actual: {type(close)}"
-            )
-        self._close = close
 
     @property
     def volume(self) -> float:
@@ -217,22 +314,16 @@ class Candle:
             float: The volume of the candle.
         """
         return self._volume
-    
-    @volume.setter
-    def volume(self, volume: float) -> None:
-        """
-        Sets the volume of the `Candle` object.
 
-        Args:
-            volume (float): The volume to set for the candle.
+    def _key(self) -> tuple:
         """
-        if not isinstance(volume, Number):
-            raise TypeError(
-                f"Expected volume type: Number | "
-                f"Actual: {type(volume)}"
-            )
-        self._volume = volume
-        
+        The values that identify a candle.
+        """
+        return (
+            self._timestamp, self._open, self._high, self._low,
+            self._close, self._volume
+        )
+
     def __eq__(self, other: Candle) -> bool:
         """
         Compares two Candle objects for equality based on their
@@ -247,6 +338,69 @@ class Candle:
         if not isinstance(other, Candle):
             return False
 
-        return vars(self) == vars(other)
-    
+        return (
+            self._key() == other._key() and
+            self.is_first == other.is_first and
+            self.is_last == other.is_last
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __reduce__(self) -> tuple:
+        # pickled as its values rather than its slots, which is about
+        # three times faster when handlers are sent between processes
+        return (_restore, (
+            self._timestamp, self._open, self._high, self._low, self._close,
+            self._volume, self._tz, self.is_first, self.is_last
+        ))
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.datetime}, o={self._open}, "
+            f"h={self._high}, l={self._low}, c={self._close}, "
+            f"v={self._volume})"
+        )
+
+def _nanoseconds(dt: datetime) -> tuple[int, tzinfo]:
+    """
+    The epoch nanoseconds in UTC and the timezone of a datetime.
+
+    Args:
+        dt (datetime): A datetime, naive or timezone aware.
 
+    Raises:
+        TypeError: dt is not a datetime.
+
+    Returns:
+        tuple[int, tzinfo]: The timestamp and timezone, None if naive.
+    """
+    if not isinstance(dt, datetime):
+        raise TypeError(
+            f"Expected datetime type: datetime | Actual: {type(dt)}"
+        )
+    if not isinstance(dt, pd.Timestamp):
+        dt = pd.Timestamp(dt)
+
+    return dt.value, dt.tzinfo
+
+def _restore(
+    timestamp: int,
+    open: float,
+    high: float,
+    low: float,
+    close: float,
+    volume: float,
+    tz: tzinfo,
+    is_first: bool,
+    is_last: bool
+) -> Candle:
+    """
+    Recreates a pickled candle, see Candle.__reduce__().
+    """
+    candle = Candle.from_timestamp(
+        timestamp, open, high, low, close, volume, tz
+    )
+    candle.is_first = is_first
+    candle.is_last = is_last
+    return candle
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from datetime import timedelta, tzinfo
+import pandas as pd
+from candle import Candle
+
+# Buckets are counted from a Monday midnight so that minutes, hours,
+# days and weeks all line up with the calendar.
+_ORIGIN = (1970, 1, 5)
+
+class CandleAggregator:
+    """
+    Combines a stream of candles into candles of a larger frequency,
+    keeping a running open, high, low, close and volume so each new
+    candle is handled in O(1).
+
+    Buckets are aligned to the calendar, ie. a 5 minute bucket starts
+    on a multiple of 5 minutes past the hour, a day at midnight and a
+    week on Monday. The combined candle takes the datetime of the start
+    of its bucket and is handed out as soon as the last candle of the
+    bucket arrives. If the stream skips the end of a bucket, the bucket
+    is handed out when the first candle past it arrives, and the bucket
+    holding the last candle of the dataset is handed out with it.
+
+    The buckets are worked out with the int nanosecond timestamps of
+    the candles, and the frequencies in nanoseconds.
+
+    Args:
+        frequency (timedelta): The frequency of the combined candles.
+        source_frequency (timedelta): The frequency of the candles
+            passed to update().
+    """
+    def __init__(
+        self, frequency: timedelta, source_frequency: timedelta
+    ) -> None:
+
+        if frequency % source_frequency != timedelta(0):
+            raise ValueError(
+                f"Frequency, {frequency}, must be divisible by the "
+                f"source frequency, {source_frequency}."
+            )
+
+        self.frequency: timedelta = frequency
+        self.source_frequency: timedelta = source_frequency
+
+        self._step: int = pd.Timedelta(frequency).value
+        self._source_step: int = pd.Timedelta(source_frequency).value
+        self._origin: int = None
+        self._tz: tzinfo = None
+        self._start: int = None
+        self._end: int = None
+        self._open: float = None
+        self._high: float = None
+        self._low: float = None
+        self._close: float = None
+        self._volume: float = None
+        self._is_first: bool = False
+
+        # the last candle seen and what it produced, so handlers that
+        # share an aggregator can all ask for the same candle
+        self._candle: Candle = None
+        self._finished: tuple[Candle, ...] = ()
+
+    def update(self, candle: Candle) -> tuple[Candle, ...]:
+        """
+        Adds a candle to the current bucket.
+
+        Args:
+            candle (Candle): The newest candle of the source frequency.
+
+        Returns:
+            tuple[Candle, ...]: The combined candles of any buckets
+                that were finished by this candle, oldest first.
+        """
+        if candle is self._candle:
+            return self._finished
+
+        finished = ()
+        timestamp = candle.timestamp
+
+        # the previous bucket was never filled, hand it out as it is
+        if self._end is not None and timestamp >= self._end:
+            finished = (self._finish(False),)
+
+        if self._end is None:
+            if self._origin is None:
+                self._tz = candle.tz
+                self._origin = pd.Timestamp(*_ORIGIN, tz=self._tz).value
+
+            self._start = self.bucket(timestamp)
+            self._end = self._start + self._step
+            self._open = candle.open
+            self._high = candle.high
+            self._low = candle.low
+            self._volume = candle.volume
+            self._is_first = candle.is_first
+        else:
+            if candle.high > self._high:
+                self._high = candle.high
+            if candle.low < self._low:
+                self._low = candle.low
+            self._volume += candle.volume
+
+        self._close = candle.close
+
+        if timestamp + self._source_step >= self._end or candle.is_last:
+            finished += (self._finish(candle.is_last),)
+
+        self._candle = candle
+        self._finished = finished
+
+        return finished
+
+    def bucket(self, timestamp: int) -> int:
+        """
+        Finds the start of the bucket that a timestamp falls in.
+
+        Args:
+            timestamp (int): The epoch nanoseconds to find the bucket
+                of, after the first candle has been passed to update().
+
+        Returns:
+            int: The epoch nanoseconds of the start of the bucket.
+        """
+        return timestamp - (timestamp - self._origin) % self._step
+
+    def _finish(self, is_last: bool) -> Candle:
+        """
+        Turns the current bucket into a candle and empties it.
+
+        Args:
+            is_last (bool): Whether the bucket holds the last candle of
+                the dataset.
+
+        Returns:
+            Candle: The combined candle of the bucket.
+        """
+        candle = Candle.from_timestamp(
+            self._start, self._open, self._high, self._low, self._close,
+            self._volume, self._tz
+        )
+        candle.is_first = self._is_first
+        candle.is_last = is_last
+
+        self._start = None
+        self._end = None
+
+        return candle
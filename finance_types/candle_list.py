@@ -1,12 +1,12 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
 from collections import UserList
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from datetime import timedelta
 import pandas as pd
+from candle import Candle
 
-if TYPE_CHECKING:
-    from candle import Candle
+# Slots a new unbounded CandleList starts with before it needs to grow
+_MIN_CAPACITY = 64
 
 class CandleList(UserList):
     """
@@ -17,41 +17,104 @@ class CandleList(UserList):
     A CandleList also ensures that the timeline is maintained for each
     new candle that is added.
 
+    Candles are stored in a ring buffer, index 0 is always the newest
+    candle and index -1 the oldest. Adding a candle to the front is
+    O(1). If `max_length` is given the buffer never grows past it and
+    the oldest candle is dropped once it is full, otherwise the buffer
+    doubles in size whenever it fills up.
+
+    The timeline is checked with the int nanosecond timestamps of the
+    candles and `step`, the frequency in nanoseconds. Each candle must
+    be a whole number of steps after the one before it, so data with
+    gaps, ie. overnight or over a weekend, can be added. The step is
+    inferred from the first two candles unless a frequency is given,
+    which should be done for data that may start with a gap.
+
     Attributes:
         frequency (timedelta): The frequency of the Candle objects in
             this CandleList.
+        step (int): The frequency in nanoseconds, 0 if not yet known.
+            Set through `frequency` it is kept as the list empties,
+            rather than inferred again.
+        max_length (int): The most candles the list will hold, or None
+            if it is unbounded.
+        validate (bool): Whether add() checks each candle against the
+            timeline. Turned off for candles from data that was already
+            validated as a whole, ie. by the Engine.
     """
-    def __init__(self, initlist: CandleList=None) -> None:
+    def __init__(
+        self, initlist: CandleList=None, max_length: int=None
+    ) -> None:
 
-        super().__init__()
-        self.frequency: timedelta = None
+        if max_length is not None and max_length < 1:
+            raise ValueError(
+                f"max_length must be a positive integer | "
+                f"Actual: {max_length}"
+            )
 
-        self._validate_candle_list(initlist)
+        self.step: int = 0
+        self.validate: bool = True
+        self._given: bool = False # whether the step was set, not inferred
+        self._max_length: int = max_length
+        self._ring: list[Candle] = [None] * (max_length or _MIN_CAPACITY)
+        self._head: int = -1 # slot of the newest candle in the ring
+        self._size: int = 0
 
         if initlist is not None:
+            self._validate_candle_list(initlist)
             self.add(initlist)
 
     @property
-    def data(self):
-        raise AttributeError("Direct access to internal data is not allowed.")
+    def data(self) -> list[Candle]:
+        """
+        A newest first copy of the candles in the list. The ring buffer
+        itself is never exposed, assigning to this replaces the
+        contents of the list.
+        """
+        return list(self)
+
+    @data.setter
+    def data(self, candles: list[Candle]) -> None:
+        self._load(candles)
+
+    @property
+    def frequency(self) -> timedelta:
+        """
+        The frequency of the candles, None until there are 2 of them.
+        """
+        if not self.step:
+            return None
+        return pd.Timedelta(self.step, "ns").to_pytimedelta()
+
+    @frequency.setter
+    def frequency(self, frequency: timedelta) -> None:
+        self.step = pd.Timedelta(frequency).value if frequency else 0
+        self._given = bool(self.step)
+
+    @property
+    def max_length(self) -> int:
+        """
+        The most candles the list will hold, None if unbounded.
+        """
+        return self._max_length
 
     @property
     def current(self) -> Candle:
         """
         Refers to the most recent candle in the list.
         """
-        if not self.data:
+        if not self._size:
             raise IndexError("CandleList is empty")
-        return self.data[0]
+        return self._ring[self._head]
     
     @property
     def initial(self) -> Candle:
         """
         Refers to the oldest candle in the list.
         """
-        if not self.data:
+        if not self._size:
             raise IndexError("CandleList is empty")
-        return self.data[-1]
+        return self._ring[self._head - self._size + 1]
     
     def add(self, candle: Candle | CandleList) -> None:
         """
@@ -62,10 +125,19 @@ class CandleList(UserList):
                 added to the list.
         """
         if isinstance(candle, CandleList):
-            self.data[:0] = candle
-        else:
+            self[:0] = candle
+            return
+
+        if self.validate:
             self._validate_candle(candle)
-            self.insert(0, candle)
+
+            if self._size:
+                self._validate_newer(candle, 0)
+
+        self._push(candle)
+
+        if not self.step:
+            self._set_frequency()
 
     def compress(self) -> Candle:
         """
@@ -75,18 +147,15 @@ class CandleList(UserList):
         Returns:
             Candle: The combined candle data of the list.
         """
-        from candle import Candle
-
-        data = {
-            'name': self.current.datetime,
-            'open': self.initial.open,
-            'high': max(c.high for c in self.data),
-            'low': min(c.low for c in self.data),
-            'close': self.current.close,
-            'volume': sum(c.volume for c in self.data)
-        }
-
-        candle = Candle(pd.Series(data))
+        candle = Candle.from_timestamp(
+            self.current.timestamp,
+            self.initial.open,
+            max(c.high for c in self),
+            min(c.low for c in self),
+            self.current.close,
+            sum(c.volume for c in self),
+            self.current.tz
+        )
 
         if self.initial.is_first:
             candle.is_first = True
@@ -107,9 +176,9 @@ class CandleList(UserList):
         if len(self) > 0: 
             self._validate_older(candle, -1)
 
-        super().append(candle)
-
-        self._set_frequency()
+        data = self.data
+        data.append(candle)
+        self.data = data
 
     def extend(self, candle_list: CandleList) -> None:
         """
@@ -126,15 +195,15 @@ class CandleList(UserList):
 
         # If this list only contains 1 item, we need to check
         # against the new lists frequency to ensure consistency.
-        if not self.frequency and candle_list.frequency:
-            self.frequency = candle_list.frequency
+        if not self.step and candle_list.step:
+            self.step = candle_list.step
         
         if len(self) > 0:
             self._validate_older(candle_list.current, -1)
 
-        super().extend(candle_list)
-
-        self._set_frequency()
+        data = self.data
+        data.extend(candle_list)
+        self.data = data
 
     def insert(self, index: int, candle: Candle) -> None:
         """
@@ -155,9 +224,9 @@ class CandleList(UserList):
         if 0 <= index < len(self):
             self._validate_newer(candle, index)
 
-        super().insert(index, candle)
-
-        self._set_frequency()
+        data = self.data
+        data.insert(index, candle)
+        self.data = data
 
     def pop(self, index: int=-1) -> Candle:
         """
@@ -176,16 +245,29 @@ class CandleList(UserList):
             index += len(self)
         if index != 0 and index != len(self) - 1:
             raise IndexError("Can only remove candles from the front/rear")
-        
+
+        if index == 0: # newest, step the head back
+            slot = self._head
+            self._head = (self._head - 1) % len(self._ring)
+        else: # oldest, the head stays where it is
+            slot = (self._head - index) % len(self._ring)
+
+        candle = self._ring[slot]
+        self._ring[slot] = None
+        self._size -= 1
+
         self._set_frequency()
-        return super().pop(index)
+        return candle
     
     def clear(self) -> None:
         """
         Ensures the frequency goes back to None upon clearing the list.
         """
+        self._ring = [None] * (self._max_length or _MIN_CAPACITY)
+        self._head = -1
+        self._size = 0
+
         self._set_frequency()
-        super().clear()
 
     def remove(self, candle: Candle) -> None:
         """
@@ -201,14 +283,15 @@ class CandleList(UserList):
         """
         self._validate_candle(candle)
         index, match = next(
-            ((i, c) for i, c in enumerate(self.data) if c == candle),
+            ((i, c) for i, c in enumerate(self) if c == candle),
             (None, None)
         )
+        if index is None:
+            raise ValueError("Candle is not in the CandleList")
         if index != 0 and index != len(self) - 1:
             raise IndexError("Can only remove candles from the front/rear")
 
-        self._set_frequency()
-        super().remove(candle)
+        self.pop(index)
 
     def __setitem__(
         self, index: int | slice, item: Candle | CandleList
@@ -232,8 +315,8 @@ class CandleList(UserList):
             
             # If this list only contains 1 item, we need to check
             # against the new lists frequency to ensure consistency.
-            if not self.frequency and item.frequency:
-                self.frequency = item.frequency
+            if not self.step and item.step:
+                self.step = item.step
 
             # Normalize start & stop ensure within [0, len(self)]
             start, stop, _ = index.indices(len(self))
@@ -246,9 +329,9 @@ class CandleList(UserList):
             elif start > stop and start < len(self):
                 self._validate_newer(item.initial, start)
             
-            super().__setitem__(index, item)
-
-            self._set_frequency()
+            data = self.data
+            data[index] = item
+            self.data = data
 
         elif isinstance(index, int) and not isinstance(item, Iterable):
 
@@ -258,17 +341,22 @@ class CandleList(UserList):
             if index < 0:
                 index += len(self)
             
+            if not 0 <= index < len(self):
+                raise IndexError("CandleList index out of range")
+
             if 0 < index < len(self):
                 self._validate_older(item, index - 1)
 
             if 0 < index + 1 < len(self):
                 self._validate_newer(item, index + 1)
             
-            super().__setitem__(index, item)
-
-            self._set_frequency()
+            self._ring[(self._head - index) % len(self._ring)] = item
         
-        else: super().__setitem__(index, item)
+        else:
+            raise TypeError(
+                f"Expected a Candle for an index or a CandleList for a "
+                f"slice | Actual: {type(item)} for {type(index)}"
+            )
 
     def __delitem__(self, index: int | slice) -> None:
         """
@@ -302,8 +390,13 @@ class CandleList(UserList):
                 raise IndexError(
                     "Can only remove candles from the front/rear"
                 )
-        self._set_frequency()
-        super().__delitem__(index)
+        if isinstance(index, int):
+            self.pop(index)
+            return
+
+        data = self.data
+        del data[index]
+        self.data = data
 
     def __iadd__(self, candle_list: CandleList) -> CandleList:
         """
@@ -324,17 +417,15 @@ class CandleList(UserList):
 
         # If this list only contains 1 item, we need to check
         # against the new lists frequency to ensure consistency.
-        if not self.frequency and candle_list.frequency:
-            self.frequency = candle_list.frequency
+        if not self.step and candle_list.step:
+            self.step = candle_list.step
         
         if len(self) > 0:
             self._validate_older(candle_list.current, -1)
             
-        new_list = super().__iadd__(candle_list)
+        self.data = self.data + candle_list.data
 
-        self._set_frequency()
-
-        return new_list
+        return self
     
     def __add__(self, candle_list: CandleList) -> CandleList:
         """
@@ -354,18 +445,38 @@ class CandleList(UserList):
         
         # If this list only contains 1 item, we need to check
         # against the new lists frequency to ensure consistency.
-        if not self.frequency and candle_list.frequency:
-            self.frequency = candle_list.frequency
+        if not self.step and candle_list.step:
+            self.step = candle_list.step
 
         if len(self) > 0:
             self._validate_older(candle_list.current, -1)
             
-        new_list = super().__add__(candle_list)
-
-        self._set_frequency()
+        new_list = self.__class__(max_length=self.max_length)
+        new_list.step = self.step
+        new_list.data = self.data + candle_list.data
 
         return new_list
 
+    def reverse(self) -> None:
+        """
+        Reversing a CandleList is not allowed, the newest candle is
+        always at index 0.
+
+        Raises:
+            TypeError: Any attempt to call this method.
+        """
+        raise TypeError("Reversing a CandleList is not allowed.")
+
+    def sort(self, *args, **kwargs) -> None:
+        """
+        Sorting a CandleList is not allowed, the candles are always
+        ordered newest first.
+
+        Raises:
+            TypeError: Any attempt to call this method.
+        """
+        raise TypeError("Sorting a CandleList is not allowed.")
+
     def __imul__(self, n: int) -> None:
         """
         In-place multiplication of a CandleList is not allowed.
@@ -390,9 +501,94 @@ class CandleList(UserList):
         """
         raise TypeError("List multiplication is not allowed.")
     
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Candle]:
+        """
+        Iterates from the newest candle to the oldest.
+        """
+        ring, head = self._ring, self._head
+        for i in range(self._size):
+            yield ring[head - i]
+
+    def __getitem__(self, index: int | slice) -> Candle | CandleList:
+        """
+        Looks up a Candle by index or a CandleList by slice (steps are
+        not allowed), where index 0 is the newest candle.
+
+        Args:
+            index (int | slice): The index or slice to look up.
+
+        Raises:
+            TypeError: Attempted to slice with a step.
+            IndexError: The index is out of range.
+        """
+        if isinstance(index, slice):
+            if index.step is not None:
+                raise TypeError("Slicing with a step is not allowed")
+
+            start, stop, _ = index.indices(self._size)
+
+            candle_list = self.__class__()
+            candle_list._load(
+                [self._ring[self._head - i] for i in range(start, stop)]
+            )
+            return candle_list
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("CandleList index out of range")
+
+        return self._ring[self._head - index]
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({list(self)})"
 
+    def _push(self, candle: Candle) -> None:
+        """
+        Places a candle in the slot after the newest candle. Once the
+        ring is full a bounded list overwrites its oldest candle and an
+        unbounded list doubles the size of its ring.
+
+        Args:
+            candle (Candle): The candle to become the newest candle.
+        """
+        capacity = len(self._ring)
+
+        if self._size == capacity and self._max_length is None:
+            self._ring = list(reversed(self.data)) + [None] * capacity
+            self._head = capacity - 1
+            capacity *= 2
+
+        self._head = (self._head + 1) % capacity
+        self._ring[self._head] = candle
+
+        if self._size < capacity:
+            self._size += 1
+
+    def _load(self, candles: list[Candle]) -> None:
+        """
+        Replaces the contents of the ring with a newest first list of
+        candles, keeping only the newest max_length candles if bounded.
+
+        Args:
+            candles (list[Candle]): The candles ordered newest first.
+        """
+        if self._max_length is not None:
+            candles = candles[:self._max_length]
+            capacity = self._max_length
+        else:
+            capacity = max(_MIN_CAPACITY, 2 * len(candles))
+
+        self._ring = list(reversed(candles))
+        self._ring += [None] * (capacity - len(candles))
+        self._head = len(candles) - 1
+        self._size = len(candles)
+
+        self._set_frequency()
+
     def _validate_candle(self, candle: Candle) -> None:
         """
         Ensures that the candle argument is a properly formatted Candle
@@ -424,18 +620,18 @@ class CandleList(UserList):
             TypeError: candle_list argument has a differing frequency
                 as this CandleList object.
         """
-        if isinstance(candle_list, CandleList):
+        if not isinstance(candle_list, CandleList):
             raise TypeError(
                 f"Expected argument: CandleList | Actual: {type(candle_list)}"
             )
 
         if (
-            (self.frequency and candle_list.frequency) and 
-            (self.frequency != candle_list.frequency)
+            (self.step and candle_list.step) and 
+            (self.step != candle_list.step)
         ):
             raise ValueError(
                 f"Argument has an unequal frequency with this CandleList. "
-                f"Expected: {self.frequency} Actual: {candle_list.freq}"
+                f"Expected: {self.frequency} Actual: {candle_list.frequency}"
             )
         
         for i in range(len(candle_list) - 1):
@@ -444,26 +640,28 @@ class CandleList(UserList):
     def _validate_older(self, candle: Candle, index: int) -> None:
         """
         Ensures the candle argument is older than the candle at the 
-        index by the frequency of the CandleList.
+        index by a whole number of steps of the CandleList.
 
         Args:
             candle (Candle): The candle being added to the list.
             index (int): The index for the candle to be compared to.
 
         Raises:
-            TypeError: The candle argument is not older by frequency.
-        """
-        previous_dt = (self.data[index].datetime + self.frequency
-                       if self.frequency else None)
-
-        if candle.datetime != previous_dt:
-            raise ValueError(
-                f"Expected datetime before index {index} is {previous_dt}. "
-                f"The candle argument is at {candle.datetime}."
-            )
-        elif ( # If there's no frequency -> self.data has only 1 candle
-            not self.frequency and self.data[index].datetime < candle.datetime
-        ):
+            ValueError: The candle argument is not older by a multiple
+                of the frequency.
+        """
+        gap = self[index].timestamp - candle.timestamp
+
+        if self.step:
+            if gap <= 0 or gap % self.step:
+                raise ValueError(
+                    f"Expected datetime after index {index} is a multiple "
+                    f"of {self.frequency} before "
+                    f"{self[index].datetime}. The candle argument is at "
+                    f"{candle.datetime}."
+                )
+        # If there's no frequency -> the list has only 1 candle
+        elif gap <= 0:
             raise ValueError(
                 f"Cannot add a newer datetime to an older index."
             )
@@ -471,26 +669,28 @@ class CandleList(UserList):
     def _validate_newer(self, candle, index) -> None:
         """
         Ensures the candle argument is newer than the candle at the
-        index by the frequency of the CandleList.
+        index by a whole number of steps of the CandleList.
 
         Args:
             candle (Candle): The candle being added to the list.
             index (int): The index for the candle to be compared to.
 
         Raises:
-            TypeError: The candle argument is not newer by frequency.
-        """
-        next_dt = (self.data[index].datetime - self.frequency 
-                   if self.frequency else None)
-
-        if candle.datetime != next_dt:
-            raise ValueError(
-                f"Expected datetime after index {index} is {next_dt}. The "
-                f"candle argument is at {candle.datetime}."
-            )
-        elif ( # If there's no frequency -> self.data has only 1 candle
-            not self.frequency and self.data[index].datetime > candle.datetime
-        ):
+            ValueError: The candle argument is not newer by a multiple
+                of the frequency.
+        """
+        gap = candle.timestamp - self[index].timestamp
+
+        if self.step:
+            if gap <= 0 or gap % self.step:
+                raise ValueError(
+                    f"Expected datetime before index {index} is a multiple "
+                    f"of {self.frequency} after "
+                    f"{self[index].datetime}. The candle argument is at "
+                    f"{candle.datetime}."
+                )
+        # If there's no frequency -> the list has only 1 candle
+        elif gap <= 0:
             raise ValueError(
                 f"Cannot add an older datetime to a newer index."
             )
@@ -499,9 +699,13 @@ class CandleList(UserList):
         """
         If the frequency is not set and the length is 2, it can then be
         set. Otherwise, we will set the frequency to none if the length
-        is less than 2 and it was previously set.
+        is less than 2 and it was previously set. A frequency that was
+        given rather than inferred is left as it is.
         """
-        if not self.frequency and len(self) > 1:
-            self.frequency = self.data[0].datetime - self.data[1].datetime
-        elif self.frequency and len(self) < 2:
-            self.frequency = None
+        if self._given:
+            return
+
+        if not self.step and len(self) > 1:
+            self.step = self[0].timestamp - self[1].timestamp
+        elif self.step and len(self) < 2:
+            self.step = 0
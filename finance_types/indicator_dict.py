@@ -1,8 +1,10 @@
+from __future__ import annotations
 from collections import UserDict
+from collections.abc import ItemsView, KeysView, ValuesView
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from engine import IndicatorBase
+    from indicator_base import IndicatorBase
 
 class IndicatorDict(UserDict):
     """
@@ -28,6 +30,9 @@ class IndicatorDict(UserDict):
             TypeError: The value is not a IndicatorBase object.
             KeyError: The key is already taken by another indicator.
         """
+        # imported here as the handlers import finance_types themselves
+        from indicator_base import IndicatorBase
+
         if not isinstance(key, str):
             raise TypeError(f"Expected key type: str | Actual: {type(key)}")
         if not isinstance(value, IndicatorBase):
@@ -49,6 +54,25 @@ class IndicatorDict(UserDict):
         for key, value in items.items():
             self[key] = value
 
+    def keys(self) -> KeysView[str]:
+        """
+        The keys of the indicators, as a view of the underlying dict so
+        that, unlike a UserDict's, they can be iterated in reverse.
+        """
+        return self.data.keys()
+
+    def values(self) -> ValuesView[IndicatorBase]:
+        """
+        The indicators, as a view of the underlying dict.
+        """
+        return self.data.values()
+
+    def items(self) -> ItemsView[str, IndicatorBase]:
+        """
+        The key and indicator pairs, as a view of the underlying dict.
+        """
+        return self.data.items()
+
     def setdefault(self, key, default=None) -> None:
         """
         This method is not allowed for a IndicatorDict object, use
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from datetime import datetime
+from enum import Enum
+
+class Side(Enum):
+    """
+    Enum object that refers to the side of an `Order`.
+    """
+    BUY = 1
+    SELL = -1
+
+class OrderType(Enum):
+    """
+    Enum object that refers to how an `Order` is filled.
+
+    MARKET fills at the open of the next candle, LIMIT fills at its
+    price or better and STOP fills once the price trades through it.
+    """
+    MARKET = 0
+    LIMIT = 1
+    STOP = 2
+
+class OrderStatus(Enum):
+    """
+    Enum object that refers to the state of an `Order`.
+    """
+    PENDING = 0
+    FILLED = 1
+    CANCELLED = 2
+
+class Order:
+    """
+    Data type for an order sent to the `Broker`.
+
+    Attributes:
+        side (Side): Whether the order buys or sells.
+        type (OrderType): How the order is filled.
+        size (float): Amount of shares, always positive.
+        price (float): The limit or stop price, None for market orders.
+        symbol (str): The symbol traded, None for a single symbol.
+        id (int): Set by the broker when the order is submitted.
+        status (OrderStatus): Whether the order is pending, filled or
+            cancelled.
+        filled_price (float): The price the order was filled at.
+        filled_at (datetime): The datetime of the candle it was filled
+            on.
+    """
+
+    __slots__ = (
+        "side", "type", "size", "price", "symbol", "id", "status",
+        "filled_price", "filled_at"
+    )
+
+    def __init__(
+        self,
+        side: Side,
+        size: float,
+        type: OrderType = OrderType.MARKET,
+        price: float = None,
+        symbol: str = None
+    ) -> None:
+        """
+        Args:
+            side (Side): Whether the order buys or sells.
+            size (float): Amount of shares, must be positive.
+            type (OrderType, optional): How the order is filled.
+                Defaults to OrderType.MARKET.
+            price (float, optional): The limit or stop price. Defaults
+                to None, which is only allowed for market orders.
+            symbol (str, optional): The symbol traded. Defaults to None.
+
+        Raises:
+            ValueError: The size is not positive or the price doesn't
+                match the order type.
+        """
+        if not size > 0:
+            raise ValueError(f"Order size must be positive | Actual: {size}")
+        if (type is OrderType.MARKET) != (price is None):
+            raise ValueError(
+                f"Only limit and stop orders have a price | "
+                f"Actual: {type} at {price}"
+            )
+
+        self.side: Side = side
+        self.type: OrderType = type
+        self.size: float = size
+        self.price: float = price
+        self.symbol: str = symbol
+        self.id: int = None
+        self.status: OrderStatus = OrderStatus.PENDING
+        self.filled_price: float = None
+        self.filled_at: datetime = None
+
+    @property
+    def quantity(self) -> float:
+        """
+        The size of the order signed by its side, positive for a buy.
+
+        Returns:
+            float: `size` for a buy, -`size` for a sell.
+        """
+        return self.side.value * self.size
+
+    def __repr__(self) -> str:
+        price = "" if self.price is None else f" @ {self.price}"
+        return (
+            f"{self.__class__.__name__}({self.id}, {self.side.name} "
+            f"{self.size} {self.symbol or ''} {self.type.name}{price}, "
+            f"{self.status.name})"
+        )
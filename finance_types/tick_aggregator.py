@@ -0,0 +1,613 @@
+from __future__ import annotations
+from collections.abc import Iterable
+from datetime import timedelta, tzinfo
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+from candle import Candle
+from candle_aggregator import _ORIGIN
+
+if TYPE_CHECKING:
+    from handlers import DataHandler
+
+class TickAggregator:
+    """
+    Builds candles of one or more frequencies from ticks, ie. trades,
+    each a timestamp, a price and a size, and passes every finished
+    candle to the handlers connected to its frequency with update().
+
+    Each frequency keeps the running open, high, low, close and volume
+    of the bucket it is building, so a tick costs O(1) per frequency.
+    Buckets line up with the calendar the same way CandleAggregator's
+    do, and a candle takes the datetime of the start of its bucket. A
+    bucket is only known to be finished when a tick past it arrives,
+    or flush() is given a time past it, so its candle is handed out
+    then. Candles finished by the same tick are handed out oldest
+    first, smallest frequency first.
+
+    Buckets without any ticks are filled with a flat candle at the
+    previous close and no volume, as handlers expect candles without
+    gaps. The first candle of each frequency is marked as the first,
+    and flush() marks the candles it finishes at the end of the data
+    as the last.
+
+    Ticks can also be given in bulk as arrays with update_many(), which
+    works out the candles with NumPy rather than tick by tick. The two
+    can be mixed, and give the same candles.
+
+    The timestamps of ticks are epoch nanoseconds in UTC.
+
+    Args:
+        frequencies (timedelta | Iterable[timedelta]): The frequencies
+            of the candles to build.
+        tz (tzinfo, optional): The timezone of the candles, which the
+            buckets line up with. Defaults to None, naive UTC.
+        symbol (str, optional): The symbol of the ticks, passed on to
+            the handlers with each candle. Defaults to None.
+        fill (bool, optional): Whether to fill buckets without ticks.
+            Defaults to True.
+
+    Raises:
+        TypeError: A frequency is not a timedelta.
+        ValueError: A frequency is not positive, or none are given.
+    """
+    def __init__(
+        self,
+        frequencies: timedelta | Iterable[timedelta],
+        tz: tzinfo = None,
+        symbol: str = None,
+        fill: bool = True
+    ) -> None:
+
+        if isinstance(frequencies, timedelta):
+            frequencies = [frequencies]
+
+        frequencies = list(frequencies)
+
+        for frequency in frequencies:
+            if not isinstance(frequency, timedelta):
+                raise TypeError(
+                    f"Expected argument type: timedelta | "
+                    f"Actual: {type(frequency)}"
+                )
+            if frequency <= timedelta(0):
+                raise ValueError(
+                    f"Frequency must be positive | Actual: {frequency}"
+                )
+
+        if not frequencies:
+            raise ValueError("At least one frequency must be given")
+
+        self.tz: tzinfo = tz
+        self.symbol: str = symbol
+        self.fill: bool = fill
+
+        self._origin: int = pd.Timestamp(*_ORIGIN, tz=tz).value
+        self._buckets: list[_Bucket] = [
+            _Bucket(f) for f in sorted(set(frequencies))
+        ]
+        self._handlers: dict[timedelta, list[DataHandler]] = {}
+
+        # the latest tick, or time flushed to, which ticks can't be older
+        # than
+        self._last: int = None
+
+    @property
+    def frequencies(self) -> list[timedelta]:
+        """
+        The frequencies of the candles built, smallest first.
+        """
+        return [b.frequency for b in self._buckets]
+
+    def connect(
+        self, handler: DataHandler, frequency: timedelta = None
+    ) -> None:
+        """
+        Passes each candle of a frequency to the handler's update() as
+        it is finished, along with the symbol of the aggregator. The
+        handler is given the frequency if it doesn't have one.
+
+        Args:
+            handler (DataHandler): The handler, ie. a strategy.
+            frequency (timedelta, optional): The frequency of the
+                candles passed to it. Defaults to None, the smallest.
+
+        Raises:
+            ValueError: The frequency isn't built by the aggregator, or
+                the handler has another frequency.
+        """
+        if frequency is None:
+            frequency = self._buckets[0].frequency
+
+        if frequency not in self.frequencies:
+            raise ValueError(
+                f"Frequency, {frequency}, is not built by the aggregator: "
+                f"{self.frequencies}"
+            )
+
+        if handler.frequency is None:
+            handler.frequency = frequency
+        elif handler.frequency != frequency:
+            raise ValueError(
+                f"Handler frequency, {handler.frequency}, must be the "
+                f"frequency of the candles passed to it, {frequency}."
+            )
+
+        self._handlers.setdefault(frequency, []).append(handler)
+
+    def update(
+        self, timestamp: int, price: float, size: float = 0.0
+    ) -> list[tuple[timedelta, Candle]]:
+        """
+        Adds a tick to the bucket of each frequency.
+
+        Args:
+            timestamp (int): The epoch nanoseconds of the tick, no older
+                than the tick before it.
+            price (float): The price traded at.
+            size (float, optional): The amount traded. Defaults to 0.
+
+        Raises:
+            ValueError: The tick is older than the tick before it.
+
+        Returns:
+            list[tuple[timedelta, Candle]]: The frequency and candle of
+                every bucket finished by the tick.
+        """
+        if self._last is not None and timestamp < self._last:
+            raise ValueError(
+                f"Tick at {pd.Timestamp(timestamp, tz=self.tz)} is older "
+                f"than {pd.Timestamp(self._last, tz=self.tz)}"
+            )
+
+        self._last = timestamp
+        finished = []
+
+        for b in self._buckets:
+
+            # the common case, the tick falls in the bucket being built
+            if b.start is not None and timestamp < b.end:
+                if price > b.high:
+                    b.high = price
+                elif price < b.low:
+                    b.low = price
+                b.close = price
+                b.volume += size
+                continue
+
+            start = timestamp - (timestamp - self._origin) % b.step
+
+            for candle in self._advance(b, start):
+                finished.append((b.frequency, candle))
+
+            b.start = start
+            b.end = start + b.step
+            b.open = b.high = b.low = b.close = price
+            b.volume = size
+
+        if finished and self._handlers:
+            self._emit(finished)
+
+        return finished
+
+    def update_many(
+        self,
+        timestamps: np.ndarray | pd.DatetimeIndex,
+        prices: np.ndarray,
+        sizes: np.ndarray = None
+    ) -> dict[timedelta, pd.DataFrame]:
+        """
+        Adds ticks in bulk, the same as calling update() for each of
+        them in order, but without touching each tick in python.
+
+        For each frequency, the bucket of every tick is found with
+        integer division and the boundaries between buckets where it
+        changes, then each bucket's high, low and volume are reduced
+        with ufunc.reduceat(). Empty buckets are filled by looking up
+        the last bucket at or before each of them with searchsorted().
+        The last bucket is kept open for the ticks that follow.
+
+        Candles are only made for the finished buckets when handlers
+        are connected, and are passed to them in the order update()
+        would, otherwise the candles are only returned as frames.
+
+        Args:
+            timestamps (np.ndarray | pd.DatetimeIndex): The epoch
+                nanoseconds, or datetimes, of the ticks in time order.
+            prices (np.ndarray): The price of each tick.
+            sizes (np.ndarray, optional): The amount traded by each
+                tick. Defaults to None, no volume.
+
+        Raises:
+            ValueError: The arrays have different lengths, or the ticks
+                are not in time order.
+
+        Returns:
+            dict[timedelta, pd.DataFrame]: The finished candles of each
+                frequency as OHLCV data, indexed by datetime.
+        """
+        timestamps = _nanoseconds_many(timestamps)
+        prices = np.asarray(prices, dtype=np.float64)
+        sizes = (
+            np.zeros(len(prices)) if sizes is None
+            else np.asarray(sizes, dtype=np.float64)
+        )
+
+        if not len(timestamps) == len(prices) == len(sizes):
+            raise ValueError(
+                f"Expected one price and size per timestamp | Actual: "
+                f"{len(timestamps)}, {len(prices)} and {len(sizes)}"
+            )
+
+        if len(timestamps) and (
+            (self._last is not None and timestamps[0] < self._last) or
+            np.any(timestamps[1:] < timestamps[:-1])
+        ):
+            raise ValueError("Ticks must be in time order")
+
+        rows = [
+            self._build(b, timestamps, prices, sizes) for b in self._buckets
+        ]
+
+        if len(timestamps):
+            self._last = int(timestamps[-1])
+
+        if self._handlers:
+            self._emit_many(rows)
+
+        return {
+            b.frequency: self._frame(r) for b, r in zip(self._buckets, rows)
+        }
+
+    def flush(
+        self, timestamp: int = None
+    ) -> list[tuple[timedelta, Candle]]:
+        """
+        Finishes the candles of buckets that have passed without a tick
+        past them to show it, ie. on a timer while the market is quiet,
+        or of every bucket being built at the end of the data.
+
+        Args:
+            timestamp (int, optional): The epoch nanoseconds of the time
+                now. The buckets that end by then are finished, the empty
+                buckets before it are filled and later ticks can't be
+                older than it. Defaults to None, which finishes every
+                bucket being built as the last of the data.
+
+        Raises:
+            ValueError: The timestamp is older than the latest tick.
+
+        Returns:
+            list[tuple[timedelta, Candle]]: The frequency and candle of
+                every bucket finished.
+        """
+        finished = []
+
+        if timestamp is None:
+            for b in self._buckets:
+                if b.start is not None:
+                    finished.append((b.frequency, self._finish(b, True)))
+        else:
+            if self._last is not None and timestamp < self._last:
+                raise ValueError(
+                    f"Can't flush to {pd.Timestamp(timestamp, tz=self.tz)}"
+                    f", the latest tick is at "
+                    f"{pd.Timestamp(self._last, tz=self.tz)}"
+                )
+
+            self._last = timestamp
+
+            for b in self._buckets:
+                start = timestamp - (timestamp - self._origin) % b.step
+
+                for candle in self._advance(b, start):
+                    finished.append((b.frequency, candle))
+
+        if finished and self._handlers:
+            self._emit(finished)
+
+        return finished
+
+    def _advance(self, b: _Bucket, until: int) -> list[Candle]:
+        """
+        Finishes the candle of the bucket being built if it ends by
+        `until`, then fills the empty buckets up to `until`.
+
+        Args:
+            b (_Bucket): The bucket of a frequency.
+            until (int): The start of a bucket of the frequency.
+
+        Returns:
+            list[Candle]: The candles finished, oldest first.
+        """
+        candles = []
+
+        if b.start is not None:
+            if b.end > until:
+                return candles
+            candles.append(self._finish(b))
+
+        if self.fill and b.next is not None and b.next < until:
+            close = b.close
+
+            for start in range(b.next, until, b.step):
+                candles.append(Candle.from_timestamp(
+                    start, close, close, close, close, 0.0, self.tz
+                ))
+
+            b.next = until
+
+        return candles
+
+    def _finish(self, b: _Bucket, is_last: bool = False) -> Candle:
+        """
+        Turns the bucket being built into a candle and empties it.
+
+        Args:
+            b (_Bucket): The bucket of a frequency.
+            is_last (bool, optional): Whether the bucket ends the data.
+                Defaults to False.
+
+        Returns:
+            Candle: The combined candle of the bucket.
+        """
+        candle = Candle.from_timestamp(
+            b.start, b.open, b.high, b.low, b.close, b.volume, self.tz
+        )
+        candle.is_first = not b.emitted
+        candle.is_last = is_last
+
+        b.emitted = True
+        b.next = b.end
+        b.start = None
+        b.end = None
+
+        return candle
+
+    def _build(
+        self,
+        b: _Bucket,
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        sizes: np.ndarray
+    ) -> tuple[np.ndarray, ...]:
+        """
+        Works out the candles of the buckets of one frequency finished
+        by the ticks, see update_many(), and leaves the last bucket open.
+
+        Returns:
+            tuple[np.ndarray, ...]: The start, open, high, low, close and
+                volume of each candle, the index of the tick that
+                finished it and whether it is the first of the frequency.
+        """
+        step = b.step
+        n = len(timestamps)
+        finished = []
+
+        # ticks that fall in the bucket being built carry it on
+        k = 0
+        if b.start is not None:
+            k = int(np.searchsorted(timestamps, b.end))
+
+            if k:
+                b.high = max(b.high, float(prices[:k].max()))
+                b.low = min(b.low, float(prices[:k].min()))
+                b.close = float(prices[k - 1])
+                b.volume += float(sizes[:k].sum())
+
+        if k == n:
+            return _empty_rows()
+
+        if b.start is not None:
+            finished.append((
+                [b.start], [b.open], [b.high], [b.low], [b.close],
+                [b.volume], [k]
+            ))
+
+        timestamps = timestamps[k:]
+        prices = prices[k:]
+        sizes = sizes[k:]
+
+        # the first tick of each bucket, where the bucket changes
+        buckets = (timestamps - self._origin) // step
+        firsts = np.concatenate(
+            ([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1)
+        )
+        lasts = np.append(firsts[1:], len(prices)) - 1
+
+        starts = self._origin + buckets[firsts] * step
+        opens = prices[firsts]
+        highs = np.maximum.reduceat(prices, firsts)
+        lows = np.minimum.reduceat(prices, firsts)
+        closes = prices[lasts]
+        volumes = np.add.reduceat(sizes, firsts)
+
+        # every bucket but the last is finished by the next one's first
+        # tick, the last is kept open
+        finished.append((
+            starts[:-1], opens[:-1], highs[:-1], lows[:-1], closes[:-1],
+            volumes[:-1], firsts[1:] + k
+        ))
+
+        rows = [
+            np.concatenate(c).astype(d)
+            for c, d in zip(zip(*finished), _DTYPES)
+        ]
+
+        if self.fill:
+            rows = self._fill(b, rows, int(starts[-1]))
+
+        first = np.zeros(len(rows[0]), dtype=bool)
+        if len(first) and not b.emitted:
+            first[0] = True
+            b.emitted = True
+
+        if len(first):
+            b.next = int(rows[0][-1]) + step
+
+        b.start = int(starts[-1])
+        b.end = b.start + step
+        b.open = float(opens[-1])
+        b.high = float(highs[-1])
+        b.low = float(lows[-1])
+        b.close = float(closes[-1])
+        b.volume = float(volumes[-1])
+
+        return (*rows, first)
+
+    def _fill(
+        self, b: _Bucket, rows: list[np.ndarray], until: int
+    ) -> list[np.ndarray]:
+        """
+        Adds a flat candle at the previous close for each empty bucket
+        between the finished candles, and from the last candle finished
+        before these ticks, up to the bucket starting at `until`.
+
+        Each bucket looks up the last candle at or before it with
+        searchsorted(), taking its values if it is that candle's bucket
+        and its close otherwise.
+        """
+        step = b.step
+
+        # the last candle finished before these ticks, when no bucket
+        # was being built, is where the filling carries on from
+        if b.start is None and b.next is not None:
+            lo = b.next
+            prior = ([lo - step], [b.close], [b.close], [b.close],
+                     [b.close], [0.0], [0])
+            rows = [
+                np.concatenate((p, r)).astype(d)
+                for p, r, d in zip(prior, rows, _DTYPES)
+            ]
+        elif len(rows[0]):
+            lo = int(rows[0][0])
+        else:
+            return rows
+
+        starts, opens, highs, lows, closes, volumes, closers = rows
+
+        every = np.arange(lo, until, step, dtype=np.int64)
+        at = np.searchsorted(starts, every, side="right") - 1
+        exact = starts[at] == every
+        flat = closes[at]
+
+        return [
+            every,
+            np.where(exact, opens[at], flat),
+            np.where(exact, highs[at], flat),
+            np.where(exact, lows[at], flat),
+            flat,
+            np.where(exact, volumes[at], 0.0),
+            closers[at]
+        ]
+
+    def _emit(self, finished: list[tuple[timedelta, Candle]]) -> None:
+        """
+        Passes finished candles to the handlers of their frequency.
+        """
+        for frequency, candle in finished:
+            for handler in self._handlers.get(frequency, ()):
+                handler.update(candle, self.symbol)
+
+    def _emit_many(self, rows: list[tuple[np.ndarray, ...]]) -> None:
+        """
+        Makes candles of the rows built by update_many() for the
+        frequencies with handlers, and passes them on in the order
+        update() would, by the tick that finished them, then by
+        frequency, then oldest first.
+        """
+        ranks = [
+            r for r, b in enumerate(self._buckets)
+            if b.frequency in self._handlers
+        ]
+        columns = [
+            np.concatenate([rows[r][c] for r in ranks]) for c in range(8)
+        ]
+        rank = np.concatenate([
+            np.full(len(rows[r][0]), r) for r in ranks
+        ])
+
+        order = np.lexsort((columns[0], rank, columns[6]))
+        tz = self.tz
+
+        values = zip(
+            rank[order].tolist(),
+            *(columns[c][order].tolist() for c in (0, 1, 2, 3, 4, 5, 7))
+        )
+
+        for r, start, open, high, low, close, volume, first in values:
+            candle = Candle.from_timestamp(
+                start, open, high, low, close, volume, tz
+            )
+            candle.is_first = first
+
+            for handler in self._handlers[self._buckets[r].frequency]:
+                handler.update(candle, self.symbol)
+
+    def _frame(self, rows: tuple[np.ndarray, ...]) -> pd.DataFrame:
+        """
+        The candles of rows built by update_many() as OHLCV data.
+        """
+        index = pd.DatetimeIndex(rows[0].view("M8[ns]"), name="datetime")
+
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+
+        return pd.DataFrame(
+            dict(zip(("open", "high", "low", "close", "volume"), rows[1:6])),
+            index=index
+        )
+
+class _Bucket:
+    """
+    The candle being built for one frequency, and what is left of the
+    last one finished, which empty buckets are filled from.
+    """
+    __slots__ = (
+        "frequency", "step", "start", "end", "open", "high", "low",
+        "close", "volume", "next", "emitted"
+    )
+
+    def __init__(self, frequency: timedelta) -> None:
+        self.frequency: timedelta = frequency
+        self.step: int = pd.Timedelta(frequency).value
+        self.start: int = None
+        self.end: int = None
+        self.open: float = None
+        self.high: float = None
+        self.low: float = None
+        self.close: float = None
+        self.volume: float = 0.0
+
+        # the start of the bucket after the last candle finished
+        self.next: int = None
+        self.emitted: bool = False
+
+# The dtypes of the rows built by update_many(), before the first flags
+_DTYPES = (
+    np.int64, np.float64, np.float64, np.float64, np.float64, np.float64,
+    np.int64
+)
+
+def _empty_rows() -> tuple[np.ndarray, ...]:
+    """
+    The rows of a frequency no bucket of which was finished.
+    """
+    return (*(np.empty(0, d) for d in _DTYPES), np.empty(0, bool))
+
+def _nanoseconds_many(
+    timestamps: np.ndarray | pd.DatetimeIndex
+) -> np.ndarray:
+    """
+    The epoch nanoseconds of an array of timestamps or datetimes, in UTC
+    for those with a timezone.
+    """
+    if isinstance(timestamps, pd.DatetimeIndex):
+        return timestamps.as_unit("ns").asi8
+
+    timestamps = np.asarray(timestamps)
+
+    if timestamps.dtype.kind == "M":
+        return timestamps.astype("M8[ns]").view(np.int64)
+
+    return timestamps.astype(np.int64, copy=False)
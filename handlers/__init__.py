@@ -1,6 +1,11 @@
 from handler_base import DataHandler
+from dispatch_plan import DispatchPlan
 from indicator_base import IndicatorBase
 from strategy_base import StrategyBase
+from portfolio import Portfolio
 from broker import Broker
 
-__all__ = ["DataHandler", "IndicatorBase", "StrategyBase", "Broker"]
+__all__ = [
+    "DataHandler", "DispatchPlan", "IndicatorBase", "StrategyBase",
+    "Portfolio", "Broker"
+]
@@ -1,7 +1,351 @@
+from __future__ import annotations
+from heapq import heapify, heappop, heappush
+from finance_types import Candle, Order, OrderType, OrderStatus, Side
+from portfolio import Portfolio
 
 class Broker:
-    def __init__(self):
-        pass
+    """
+    Simulated broker that holds the orders sent by a strategy and fills
+    them against the candles that follow.
 
-    def execute_trade(self):
-        pass
\ No newline at end of file
+    Market orders are filled at the open of the next candle. Limit and
+    stop orders rest in a price sorted book for their symbol and are
+    filled at their price, or at the open if the candle gaps through
+    it. Only the orders whose price the candle reaches are looked at,
+    so a candle costs the same however many orders are resting.
+
+    An order is never filled on the candle it was sent on.
+
+    Fills are booked into the broker's portfolio, which is then marked
+    at the candle's close.
+
+    Args:
+        portfolio (Portfolio, optional): The portfolio trades are booked
+            into. Defaults to None, which makes a new one.
+    """
+    def __init__(self, portfolio: Portfolio = None) -> None:
+        self._books: dict[str, _OrderBook] = {}
+        self._orders: dict[int, Order] = {}
+        self._fills: list[Order] = []
+        self._next_id: int = 0
+        self.portfolio = portfolio or Portfolio()
+
+    def submit(self, order: Order) -> Order:
+        """
+        Adds an order to the book of its symbol to be filled from the
+        next candle onwards.
+
+        Args:
+            order (Order): The order to add.
+
+        Raises:
+            TypeError: order is not an Order object.
+            ValueError: order has already been submitted.
+
+        Returns:
+            Order: The order, with its id set.
+        """
+        if not isinstance(order, Order):
+            raise TypeError(
+                f"Expected argument type: Order | Actual: {type(order)}"
+            )
+        if order.id is not None:
+            raise ValueError(f"Order has already been submitted: {order}")
+
+        order.id = self._next_id
+        self._next_id += 1
+
+        self._orders[order.id] = order
+        self._book(order.symbol).add(order)
+        return order
+
+    def cancel(self, order: Order | int) -> bool:
+        """
+        Cancels a pending order. The order is left in its book and
+        dropped when it is next reached, so cancelling is O(1).
+
+        Args:
+            order (Order | int): The order or the id of the order.
+
+        Returns:
+            bool: Whether the order was pending and is now cancelled.
+        """
+        if isinstance(order, Order):
+            order = order.id
+
+        order = self._orders.pop(order, None)
+        if order is None:
+            return False
+
+        order.status = OrderStatus.CANCELLED
+        self._books[order.symbol].discard(order)
+        return True
+
+    def process(self, candle: Candle, symbol: str = None) -> list[Order]:
+        """
+        Fills the pending orders of a symbol that the candle reaches,
+        in the order they were submitted, then marks the symbol in the
+        portfolio at the candle's close.
+
+        Args:
+            candle (Candle): The new candle of the symbol.
+            symbol (str, optional): The symbol the candle belongs to.
+                Defaults to None, a single symbol.
+
+        Returns:
+            list[Order]: The orders filled on this candle.
+        """
+        book = self._books.get(symbol)
+        filled = book.match(candle) if book else []
+
+        for order, price in filled:
+            self.execute_trade(order, price, candle)
+
+        self.portfolio.mark(
+            symbol, candle.close, candle.timestamp, candle.tz
+        )
+
+        return [order for order, _ in filled]
+
+    def execute_trade(
+        self, order: Order, price: float, candle: Candle
+    ) -> None:
+        """
+        Records an order as filled at a price on a candle and books the
+        trade into the portfolio.
+
+        Args:
+            order (Order): The order being filled.
+            price (float): The price it is filled at.
+            candle (Candle): The candle it is filled on.
+        """
+        order.status = OrderStatus.FILLED
+        order.filled_price = price
+        order.filled_at = candle.datetime
+
+        self._orders.pop(order.id, None)
+        self._fills.append(order)
+        self.portfolio.fill(
+            order.symbol, order.quantity, price, candle.timestamp, candle.tz
+        )
+
+    def position(self, symbol: str = None) -> float:
+        """
+        The number of shares held of a symbol, negative when short.
+
+        Args:
+            symbol (str, optional): The symbol. Defaults to None, a
+                single symbol.
+
+        Returns:
+            float: The shares held.
+        """
+        return self.portfolio.position(symbol)
+
+    @property
+    def portfolio(self) -> Portfolio:
+        """
+        The portfolio trades are booked into.
+        """
+        return self._portfolio
+
+    @portfolio.setter
+    def portfolio(self, portfolio: Portfolio) -> None:
+        """
+        Ensures that the portfolio is a Portfolio object.
+
+        Args:
+            portfolio (Portfolio): The portfolio to book trades into.
+
+        Raises:
+            TypeError: portfolio is not a Portfolio object.
+        """
+        if not isinstance(portfolio, Portfolio):
+            raise TypeError(
+                f"Expected argument type: Portfolio | "
+                f"Actual: {type(portfolio)}"
+            )
+
+        self._portfolio = portfolio
+
+    @property
+    def orders(self) -> list[Order]:
+        """
+        The pending orders, in the order they were submitted.
+        """
+        return list(self._orders.values())
+
+    @property
+    def fills(self) -> list[Order]:
+        """
+        The filled orders, in the order they were filled.
+        """
+        return list(self._fills)
+
+    def _book(self, symbol: str) -> _OrderBook:
+        """
+        The order book of a symbol, made the first time it is needed.
+        """
+        book = self._books.get(symbol)
+
+        if book is None:
+            book = self._books[symbol] = _OrderBook()
+
+        return book
+
+class _OrderBook:
+    """
+    The pending orders of one symbol. Market orders wait in a list for
+    the next candle, limit and stop orders wait in one heap per side
+    and type, keyed so the order a falling or rising price reaches
+    first is at the top.
+
+    Cancelled orders are skipped when they reach the top of a heap, and
+    the heaps are rebuilt once most of what they hold is cancelled.
+    """
+
+    # The heaps are rebuilt once they hold this many cancelled orders
+    # and the cancelled orders outnumber the pending ones
+    _COMPACT_AT = 1024
+
+    def __init__(self) -> None:
+        self._market: list[Order] = []
+
+        # Reached by a falling price, the highest price is on top
+        self._buy_limits: list[tuple[float, int, Order]] = []
+        self._sell_stops: list[tuple[float, int, Order]] = []
+
+        # Reached by a rising price, the lowest price is on top
+        self._sell_limits: list[tuple[float, int, Order]] = []
+        self._buy_stops: list[tuple[float, int, Order]] = []
+
+        self._pending: int = 0
+        self._cancelled: int = 0
+
+    def add(self, order: Order) -> None:
+        """
+        Adds a submitted order to the book.
+        """
+        self._pending += 1
+
+        if order.type is OrderType.MARKET:
+            self._market.append(order)
+            return
+
+        falling = (order.type is OrderType.LIMIT) == (order.side is Side.BUY)
+        key = -order.price if falling else order.price
+        heappush(self._heap(order), (key, order.id, order))
+
+    def discard(self, order: Order) -> None:
+        """
+        Accounts for an order of the book being cancelled.
+        """
+        self._pending -= 1
+
+        if order.type is OrderType.MARKET:
+            self._market.remove(order)
+            return
+
+        self._cancelled += 1
+
+        if (
+            self._cancelled >= self._COMPACT_AT and
+            self._cancelled > self._pending
+        ):
+            self._compact()
+
+    def match(self, candle: Candle) -> list[tuple[Order, float]]:
+        """
+        Takes the orders the candle fills out of the book.
+
+        Args:
+            candle (Candle): The new candle of the symbol.
+
+        Returns:
+            list[tuple[Order, float]]: Each order filled and its price,
+                in the order they were submitted.
+        """
+        open, high, low = candle.open, candle.high, candle.low
+
+        filled = [(order, open) for order in self._market]
+        self._market = []
+
+        # A limit fills at its price or better, a stop at its price or
+        # worse when the candle opens past it
+        for order in self._pop_falling(self._buy_limits, low):
+            filled.append((order, min(open, order.price)))
+        for order in self._pop_falling(self._sell_stops, low):
+            filled.append((order, min(open, order.price)))
+        for order in self._pop_rising(self._sell_limits, high):
+            filled.append((order, max(open, order.price)))
+        for order in self._pop_rising(self._buy_stops, high):
+            filled.append((order, max(open, order.price)))
+
+        if len(filled) > 1:
+            filled.sort(key=lambda fill: fill[0].id)
+
+        self._pending -= len(filled)
+        return filled
+
+    def _pop_falling(
+        self, heap: list[tuple[float, int, Order]], low: float
+    ) -> list[Order]:
+        """
+        Pops the orders at or above `low` from a highest first heap.
+        """
+        orders = []
+
+        while heap and -heap[0][0] >= low:
+            order = heappop(heap)[2]
+            if order.status is OrderStatus.CANCELLED:
+                self._cancelled -= 1
+            else:
+                orders.append(order)
+
+        return orders
+
+    def _pop_rising(
+        self, heap: list[tuple[float, int, Order]], high: float
+    ) -> list[Order]:
+        """
+        Pops the orders at or below `high` from a lowest first heap.
+        """
+        orders = []
+
+        while heap and heap[0][0] <= high:
+            order = heappop(heap)[2]
+            if order.status is OrderStatus.CANCELLED:
+                self._cancelled -= 1
+            else:
+                orders.append(order)
+
+        return orders
+
+    def _heap(self, order: Order) -> list[tuple[float, int, Order]]:
+        """
+        The heap a limit or stop order rests in.
+        """
+        buy = order.side is Side.BUY
+
+        if order.type is OrderType.LIMIT:
+            return self._buy_limits if buy else self._sell_limits
+        return self._buy_stops if buy else self._sell_stops
+
+    def _compact(self) -> None:
+        """
+        Rebuilds the heaps without their cancelled orders.
+        """
+        for heap in (
+            self._buy_limits, self._sell_stops,
+            self._sell_limits, self._buy_stops
+        ):
+            heap[:] = [
+                entry for entry in heap
+                if entry[2].status is not OrderStatus.CANCELLED
+            ]
+            heapify(heap)
+
+        self._cancelled = 0
+
+    def __bool__(self) -> bool:
+        return self._pending > 0
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from finance_types import CandleAggregator
+
+if TYPE_CHECKING:
+    from handler_base import DataHandler
+
+class DispatchPlan:
+    """
+    The indicators of a handler compiled into a flat list of steps, so
+    a candle is passed through the whole tree of indicators with one
+    loop instead of each handler deciding again, for every candle, how
+    to pass it on to its own indicators.
+
+    The tree is walked once, depth first, in the order the indicators
+    were added. Each indicator becomes two steps, adding the candle
+    meant for it and then calling its callbacks once the indicators
+    below it have been updated, which is the order update() takes.
+    An indicator held by several handlers is only added the first
+    time it is reached, and is fed by that handler, so it is updated
+    once per candle.
+
+    Each indicator's frequency is checked against the handler feeding
+    it when the plan is compiled, indicators without one are given the
+    handler's, and those at a multiple of it are bound to the handler's
+    aggregator for their frequency. An indicator that isn't given a
+    candle skips the steps of the indicators below it.
+
+    A handler given several symbols has a list of steps for each, made
+    the first time the symbol is dispatched.
+
+    Indicators reached through the plan are given candles without
+    their update() being called, so they should override on_candle()
+    and the other callbacks rather than update().
+
+    Args:
+        root (DataHandler): The handler whose indicators are compiled,
+            with its frequency set.
+
+    Raises:
+        ValueError: An indicator's frequency is not a multiple of the
+            frequency of the handler feeding it.
+    """
+    def __init__(self, root: DataHandler) -> None:
+        self._root: DataHandler = root
+        self._steps: dict[str, tuple[list[tuple], list]] = {}
+
+        books = {symbol: book[1:] for symbol, book in root._books.items()}
+        books[root._symbol] = (root._indicators, root._aggregators)
+
+        for symbol, (indicators, aggregators) in books.items():
+            if indicators:
+                self._steps[symbol] = self._compile(indicators, aggregators)
+
+    def dispatch(self) -> None:
+        """
+        Passes the current candle of the root handler to its indicators,
+        for the symbol it has selected.
+        """
+        steps = self._steps.get(self._root._symbol)
+
+        if steps is None:
+            root = self._root
+            steps = self._steps[root._symbol] = self._compile(
+                root._indicators, root._aggregators
+            )
+
+        steps, current = steps
+        current[0] = self._root._candles.current
+
+        i = 0
+        n = len(steps)
+
+        while i < n:
+            node, slot, source, aggregator, skip = steps[i]
+
+            # the indicator's callbacks, after the indicators below it
+            if slot == 0:
+                node._process_candle()
+                i += 1
+                continue
+
+            candle = current[source]
+
+            if aggregator is not None:
+                finished = aggregator.update(candle)
+
+                # only pass candles newer than the indicators current, as
+                # its own back data may already cover this bucket
+                if (
+                    finished and node._candles and
+                    finished[0].timestamp <= node._candles.current.timestamp
+                ):
+                    latest = node._candles.current.timestamp
+                    finished = [c for c in finished if c.timestamp > latest]
+
+                if not finished:
+                    i = skip
+                    continue
+
+                # a skipped bucket hands out two candles, each is passed
+                # through the indicator's own tree in turn
+                if len(finished) > 1:
+                    for candle in finished:
+                        node.update(candle)
+                    i = skip
+                    continue
+
+                candle = finished[0]
+
+            node._add_candle(candle)
+            current[slot] = candle
+            i += 1
+
+    def _compile(
+        self, indicators: dict, aggregators: dict[int, CandleAggregator]
+    ) -> tuple[list[tuple], list]:
+        """
+        Walks the indicators of one symbol into the steps of the plan.
+
+        Each step is a tuple of the handler, its slot in the list of
+        current candles, the slot of the handler feeding it, the
+        aggregator between them and the step to skip to when it isn't
+        given a candle. Slot 0 holds the root's candle and marks the
+        callback steps.
+
+        Args:
+            indicators (dict): The root handler's indicators of the
+                symbol.
+            aggregators (dict[int, CandleAggregator]): The root handler's
+                aggregators of the symbol, keyed by frequency.
+
+        Returns:
+            tuple[list[tuple], list]: The steps, and the list holding the
+                current candle of each slot.
+        """
+        root = self._root
+        steps = []
+        seen = set()
+
+        # each entry is a handler to add, the handler feeding it, with
+        # its slot and aggregators, or the index of a step to close
+        pending = [
+            (i, root, 0, aggregators) for i in reversed(indicators.values())
+        ]
+
+        while pending:
+            entry = pending.pop()
+
+            # the callbacks of an indicator, once its tree is added
+            if isinstance(entry, int):
+                node, slot, source, aggregator, _ = steps[entry]
+                steps[entry] = (node, slot, source, aggregator, len(steps) + 1)
+                steps.append((node, 0, source, None, None))
+                continue
+
+            node, parent, source, parent_aggregators = entry
+
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+
+            if not node._step:
+                node.frequency = parent.frequency
+
+            if node._step == parent._step:
+                aggregator = None
+            elif node._step % parent._step == 0:
+                aggregator = parent_aggregators.get(node._step)
+
+                if aggregator is None:
+                    aggregator = CandleAggregator(
+                        node.frequency, parent.frequency
+                    )
+                    parent_aggregators[node._step] = aggregator
+            else:
+                raise ValueError(
+                    f"Indicator frequency, {node.frequency}, must be "
+                    "divisible by it's parent handlers frequency, "
+                    f"{parent.frequency}."
+                )
+
+            slot = len(seen)
+            pending.append(len(steps))
+            steps.append((node, slot, source, aggregator, None))
+
+            pending.extend(
+                (i, node, slot, node._aggregators)
+                for i in reversed(node._indicators.values())
+            )
+
+        return steps, [None] * (len(seen) + 1)
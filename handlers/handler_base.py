@@ -1,23 +1,42 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from abc import ABC, abstractmethod
+from copy import deepcopy
 from datetime import timedelta
-from finance_types import Candle, CandleList, IndicatorDict
+import pandas as pd
+from finance_types import Candle, CandleList, IndicatorDict, CandleAggregator
 
 if TYPE_CHECKING:
     from indicator_base import IndicatorBase
+    from dispatch_plan import DispatchPlan
 
 class DataHandler(ABC):
     """
     The DataHandler abstract class is the parent class for StrategyBase
     and IndicatorBase. It contains the methods for users to implement 
     their own data handlers.
+
+    A handler given candles of several symbols keeps a separate
+    CandleList and copy of its indicators for each symbol, see select().
+
+    Args:
+        max_length (int, optional): The most candles kept in
+            self.candles, older candles are dropped once it is full.
+            Defaults to None, which keeps every candle.
     """
-    def __init__(self) -> None:
+    def __init__(self, max_length: int = None) -> None:
 
-        self._candles: CandleList = []
-        self._indicators: IndicatorDict = {}
+        self._candles: CandleList = CandleList(max_length=max_length)
+        self._indicators: IndicatorDict = IndicatorDict()
         self._frequency: timedelta = None
+        self._step: int = 0
+        self._aggregators: dict[int, CandleAggregator] = {}
+        self._max_length: int = max_length
+        self._symbol: str = None
+        self._books: dict[str, tuple] = {}
+        self._templates: IndicatorDict = None
+        self._trusted: bool = False
+        self._plan: DispatchPlan = None
 
     @abstractmethod
     def on_candle(self) -> None:
@@ -55,27 +74,106 @@ class DataHandler(ABC):
         """
         pass
 
-    def update(self, candle: Candle) -> None:
+    def update(self, candle: Candle, symbol: str = None) -> None:
         """
         Updates the data handler with a new candle, adding it to the
         list before updating the stored indicators first, then itself.
+        The indicators are updated through the handler's DispatchPlan
+        when one has been compiled, see self.plan.
 
         Args:
             candle (Candle): New candle to be added.
+            symbol (str, optional): The symbol the candle belongs to,
+                the handler selects it before adding the candle.
+                Defaults to None, the currently selected symbol.
 
         Raises:
             TypeError: The candle argument is not a Candle object.
         """
         if not isinstance(candle, Candle):
             raise TypeError(
-                f"Expected argument type: IndicatorBase | "
-                f"Actual: {type(indicator)}"
+                f"Expected argument type: Candle | "
+                f"Actual: {type(candle)}"
             )
 
-        self.candles.add(candle)
-        self._update_indicators()
+        if symbol is not None and symbol != self._symbol:
+            self.select(symbol)
+
+        self._add_candle(candle)
+
+        if self._plan is None:
+            self._update_indicators()
+        else:
+            self._plan.dispatch()
+
         self._process_candle()
 
+    def select(self, symbol: str) -> None:
+        """
+        Switches self.candles and self.indicators to those of `symbol`.
+
+        The indicators the handler holds before its first symbol is
+        selected are kept as templates, and each symbol is given its
+        own copy of them the first time it is selected along with an
+        empty CandleList. Indicators should be reached through
+        self.indicators rather than kept references to the templates.
+
+        Args:
+            symbol (str): The symbol to select.
+        """
+        if symbol == self._symbol:
+            return
+
+        if self._templates is None:
+            self._templates = self._indicators
+
+        if self._symbol is not None:
+            self._books[self._symbol] = (
+                self._candles, self._indicators, self._aggregators
+            )
+
+        book = self._books.get(symbol)
+
+        if book is None:
+            candles = CandleList(max_length=self._max_length)
+            candles.frequency = self._frequency
+            candles.validate = not self._trusted
+
+            book = (candles, self._copy_templates(), {})
+            self._books[symbol] = book
+
+        self._candles, self._indicators, self._aggregators = book
+        self._symbol = symbol
+
+    def _copy_templates(self) -> IndicatorDict:
+        """
+        Deep copies the template indicators for a new symbol, sharing
+        rather than copying any back data they hold.
+
+        Returns:
+            IndicatorDict: The new symbol's indicators.
+        """
+        memo = {}
+        pending = list(self._templates.values())
+
+        while pending:
+            i = pending.pop()
+            if i.data is not None:
+                memo[id(i.data)] = i.data
+            pending.extend(i.indicators.values())
+
+        return deepcopy(self._templates, memo)
+
+    def _add_candle(self, candle: Candle) -> None:
+        """
+        Adds a new candle to self.candles, before the indicators are
+        updated with it.
+
+        Args:
+            candle (Candle): New candle to be added.
+        """
+        self._candles.add(candle)
+
     def _update_indicators(self) -> None:
         """
         Updates the indicators with current candle after new candles
@@ -86,18 +184,20 @@ class DataHandler(ABC):
             ValueError: The indicator frequency is not compatible.
         """
 
+        step = self._step
+
         for i in self.indicators.values():
 
             # if indicator has no back data, the frequency is not set
-            if not i.frequency:
+            if not i._step:
                 i.frequency = self.frequency
 
             # if indicator has the same frequency as the data, update
-            if i.frequency == self.frequency:
+            if i._step == step:
                 i.update(self.candles.current)
 
             # if indicator has a different frequency, try to compress
-            elif i.frequency % self.frequency == timedelta(0):
+            elif i._step % step == 0:
                 self._attempt_compress(i)
 
             else: # indicator frequency is not divisible by this freq.
@@ -119,48 +219,36 @@ class DataHandler(ABC):
         else: # if its not the first or last
             self.on_candle()
         if self.candles.current.is_last:
-            self.on_end
+            self.on_end()
 
     def _attempt_compress(self, indicator: IndicatorBase):
         """
-        Attempts to compress candle data for the indicator by checking
-        if there is a enough new data to fulfill the indicators candle.
+        Passes the current candle to the aggregator for the indicator's
+        frequency, creating it on first use. Indicators with the same
+        frequency share an aggregator.
         
-        If there is enough new data, the candles are combined and the
-        new candle is passed to indicator, if not, it does nothing.
+        If the current candle finishes a bucket, the combined candle is
+        passed to the indicator, if not, it does nothing.
 
         Args:
             indicator (IndicatorBase): Indicator to pass the compressed
                 the data if fulfilled.
-
-        Raises:
-            TypeError: Indicator is not an instance of IndicatorBase
         """
-        if not isinstance(indicator, IndicatorBase):
-            raise TypeError(
-                f"Expected argument type: IndicatorBase | "
-                f"Actual: {type(indicator)}"
-            )
-
-        # number of candles needed to fulfill the indicator's candle
-        n = int(indicator.frequency / self.frequency)
+        aggregator = self._aggregators.get(indicator._step)
 
-        # grab a slice of n candles from this handler's candles
-        nframe = self.candles[0:n]
+        if aggregator is None:
+            aggregator = CandleAggregator(indicator.frequency, self.frequency)
+            self._aggregators[indicator._step] = aggregator
 
-        # if there are enough candles in the slice
-        is_full_frame = len(nframe) == n
+        for candle in aggregator.update(self.candles.current):
 
-        # if the slice's oldest candle is newer than indicators current
-        frame_is_new = (
-            not indicator.candles or 
-            nframe.initial.datetime > indicator.candles.current.datetime
-        )
-
-        if is_full_frame and frame_is_new:
-            # compress and update the indicator
-            candle = nframe.compress()
-            indicator.update(candle)
+            # only pass candles newer than the indicators current, as
+            # its own back data may already cover this bucket
+            if (
+                not indicator.candles or 
+                candle.timestamp > indicator.candles.current.timestamp
+            ):
+                indicator.update(candle)
 
     @property
     def candles(self) -> CandleList:
@@ -182,10 +270,87 @@ class DataHandler(ABC):
         """
         return self._indicators
     
+    @property
+    def symbol(self) -> str:
+        """
+        The symbol currently selected, None for a single symbol.
+
+        Returns:
+            str: The symbol of self.candles and self.indicators.
+        """
+        return self._symbol
+
+    @property
+    def plan(self) -> DispatchPlan:
+        """
+        The compiled plan the indicators are updated through, None to
+        have each handler pass the candles on to its own indicators.
+
+        Returns:
+            DispatchPlan: The plan of this handler's indicators.
+        """
+        return self._plan
+
+    @plan.setter
+    def plan(self, plan: DispatchPlan) -> None:
+        """
+        Sets the plan to update the indicators through. It should be
+        compiled again if indicators are added or removed.
+
+        Args:
+            plan (DispatchPlan): The plan, compiled for this handler, or
+                None.
+
+        Raises:
+            ValueError: The plan was compiled for another handler.
+        """
+        if plan is not None and plan._root is not self:
+            raise ValueError("Plan was compiled for another handler")
+
+        self._plan = plan
+
+    @property
+    def trusted(self) -> bool:
+        """
+        Whether the candles given to this handler come from data that
+        was validated as a whole, so each one is added to self.candles
+        without being checked against the timeline.
+
+        Returns:
+            bool: Whether the per candle checks are skipped.
+        """
+        return self._trusted
+
+    @trusted.setter
+    def trusted(self, trusted: bool) -> None:
+        """
+        Skips or restores the per candle checks of this handler and of
+        its indicators, for every symbol. Indicators with back data keep
+        their checks, as nothing else checks that the data they are
+        given carries on from their back data.
+
+        Args:
+            trusted (bool): Whether to skip the per candle checks.
+        """
+        self._trusted = trusted
+
+        books = [(self._candles, self._indicators), (None, self._templates)]
+        books += [book[:2] for book in self._books.values()]
+
+        for candles, indicators in books:
+
+            if candles is not None:
+                candles.validate = not trusted
+
+            for i in (indicators or {}).values():
+                i.trusted = trusted and (i.data is None or i.data.empty)
+
     @property
     def frequency(self) -> timedelta:
         """
         Frequency of the Candles that have been added to this handler.
+        It is compared against the frequencies of the indicators in
+        nanoseconds, as ints.
 
         Returns:
             timedelta: The frequency of candles as a timedelta object
@@ -236,7 +401,10 @@ class DataHandler(ABC):
     @frequency.setter
     def frequency(self, frequency: timedelta) -> None:
         """
-        Ensures the frequency argument is a timedelta object.
+        Ensures the frequency argument is a timedelta object, and gives
+        it to the CandleList of every symbol, so their timelines are
+        checked against it rather than the step between their first
+        two candles.
 
         Args:
             frequency (timedelta): The frequency in which candles are
@@ -252,6 +420,11 @@ class DataHandler(ABC):
             )
         
         self._frequency = frequency
+        self._step = pd.Timedelta(frequency).value
+
+        self._candles.frequency = frequency
+        for book in self._books.values():
+            book[0].frequency = frequency
 
     def __eq__(self, other):
 
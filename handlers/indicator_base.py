@@ -1,9 +1,9 @@
-from typing import TYPE_CHECKING
-from data import validate_data
+from __future__ import annotations
+from data import validate_data, IndicatorCache
+import numpy as np
 import pandas as pd
-
-if TYPE_CHECKING:
-    from handler_base import DataHandler
+from finance_types import Candle
+from handler_base import DataHandler
 
 class IndicatorBase(DataHandler):
     """
@@ -14,12 +14,158 @@ class IndicatorBase(DataHandler):
     Stored data frequency must be divisible by the frequency of the
     handler that uses it.
 
+    Indicators that can be worked out for a whole dataset at once may
+    override compute(). The engine then calls it once before the first
+    candle and the values for the current candle are read back with
+    lookup(), instead of being worked out in on_candle(). The frames
+    it returns can be kept across runs with an IndicatorCache.
+
     Args:
         data (pd.Dataframe, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
     """
-    def __init__(self, data: pd.DataFrame = None) -> None:
-        super().__init__()
+    def __new__(cls, *args, **kwargs) -> IndicatorBase:
+
+        # the arguments are part of the key of an IndicatorCache entry
+        indicator = super().__new__(cls)
+        indicator._arguments = (args, kwargs)
+        return indicator
+
+    def __init__(
+        self, data: pd.DataFrame = None, max_length: int = None
+    ) -> None:
+        super().__init__(max_length)
         self._data: pd.DataFrame = data
+        self._computed: pd.DataFrame = None
+        self._columns: dict[str, np.ndarray] = {}
+        self._position: int = -1
+
+    def on_candle(self) -> None:
+        """
+        The default method that is called when a new candle is added to
+        the indicator. By default this does nothing, so indicators that
+        only override compute() don't need to implement it.
+        """
+        pass
+
+    def compute(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Optional hook to work out the indicator for every row of a
+        dataset at once. Row i of the returned frame must hold the
+        values of the indicator as of row i of data.
+
+        The data passed in is the indicator's back data followed by
+        its parent's data at this indicator's frequency.
+
+        Args:
+            data (pd.DataFrame): The OHLCV data the indicator will be
+                updated with, in order.
+
+        Raises:
+            NotImplementedError: The indicator doesn't override this.
+
+        Returns:
+            pd.DataFrame: The indicator values, one row per row of data.
+        """
+        raise NotImplementedError
+
+    def precompute(
+        self, data: pd.DataFrame, cache: IndicatorCache = None
+    ) -> None:
+        """
+        Calls compute() on the data and stores the result so that
+        lookup() can read it back as the candles arrive.
+
+        Args:
+            data (pd.DataFrame): The OHLCV data the indicator will be
+                updated with, in order.
+            cache (IndicatorCache, optional): Loads the result from the
+                cache if it is there, and stores it otherwise. Defaults
+                to None, which always calls compute().
+
+        Raises:
+            TypeError: compute() didn't return a pd.DataFrame.
+            ValueError: compute() didn't return one row per row of data.
+        """
+        key = None if cache is None else cache.key(self, data)
+        computed = None if key is None else cache.get(key)
+
+        if computed is None:
+            computed = self.compute(data)
+        else:
+            key = None
+
+        if not isinstance(computed, pd.DataFrame):
+            raise TypeError(
+                f"Expected compute() to return: pd.DataFrame | "
+                f"Actual: {type(computed)}"
+            )
+        if len(computed) != len(data):
+            raise ValueError(
+                f"Expected compute() to return {len(data)} rows | "
+                f"Actual: {len(computed)}"
+            )
+
+        if key is not None:
+            cache.put(key, computed)
+
+        self._computed = computed
+        self._columns = {c: computed[c].to_numpy() for c in computed.columns}
+
+    def lookup(self, column: str, ago: int = 0) -> float:
+        """
+        Reads a precomputed value for the current candle, or for the
+        candle `ago` candles before it.
+
+        Args:
+            column (str): The column of the computed frame to read.
+            ago (int, optional): How many candles back to read.
+                Defaults to 0, the current candle.
+
+        Raises:
+            RuntimeError: The indicator has not been precomputed.
+            IndexError: There is no precomputed value for that candle.
+
+        Returns:
+            float: The precomputed value.
+        """
+        if self._computed is None:
+            raise RuntimeError("Indicator has not been precomputed")
+
+        position = self._position - ago
+
+        if not 0 <= position < len(self._computed):
+            raise IndexError(
+                f"No precomputed value {ago} candles before the current"
+            )
+
+        return self._columns[column][position]
+
+    def _add_candle(self, candle: Candle) -> None:
+        """
+        Moves the position read by lookup() to the new candle before
+        adding it.
+
+        Args:
+            candle (Candle): New candle to be added.
+        """
+        self._position += 1
+        super()._add_candle(candle)
+
+    @property
+    def precomputable(self) -> bool:
+        """
+        Whether this indicator overrides compute().
+        """
+        return type(self).compute is not IndicatorBase.compute
+
+    @property
+    def computed(self) -> pd.DataFrame:
+        """
+        The frame returned by compute(), None if not precomputed.
+        """
+        return self._computed
 
     @property
     def data(self) -> pd.DataFrame:
@@ -40,8 +186,10 @@ class IndicatorBase(DataHandler):
             data (pd.DataFrame): The backdata to be stored.
 
         Raises:
-            InvalidDataException: Data argument is not a pd.DataFrame.
+            ValueError: Data argument is not properly formatted OHLCV
+                data, see validate_data().
         """
-        validate_data(data)
+        if not validate_data(data):
+            raise ValueError("Data is improperly formatted")
         
         self._data = data
\ No newline at end of file
@@ -0,0 +1,408 @@
+from __future__ import annotations
+from datetime import datetime, tzinfo
+import numpy as np
+import pandas as pd
+
+class Portfolio:
+    """
+    Keeps the cash, positions and fills of a backtest, and its equity
+    curve, in NumPy arrays.
+
+    Each symbol is given a slot the first time it is traded or marked,
+    and its shares and last price are held at that slot. Marking a
+    symbol records the equity as of its candle, worked out as the cash
+    plus the dot product of every position with its last price, so the
+    cost of a candle doesn't grow with a python loop over positions.
+
+    Candles of several symbols with the same datetime share one point
+    of the equity curve, which holds the equity after the last of them.
+
+    Args:
+        cash (float, optional): The starting cash. Defaults to 100,000.
+        commission (float, optional): The fee charged on every trade as
+            a fraction of its value. Defaults to 0.
+    """
+
+    # Slots and fills are grown by doubling from this size
+    _MIN_CAPACITY = 16
+
+    def __init__(
+        self, cash: float = 100_000.0, commission: float = 0.0
+    ) -> None:
+        if commission < 0:
+            raise ValueError(
+                f"Commission can't be negative | Actual: {commission}"
+            )
+
+        self._initial_cash: float = float(cash)
+        self._cash: float = float(cash)
+        self._commission: float = float(commission)
+        self._fees: float = 0.0
+        self._tz = None
+
+        self._slots: dict[str, int] = {}
+        self._positions: np.ndarray = np.zeros(self._MIN_CAPACITY)
+        self._prices: np.ndarray = np.zeros(self._MIN_CAPACITY)
+
+        self._fill_count: int = 0
+        self._fill_times: np.ndarray = np.empty(self._MIN_CAPACITY, np.int64)
+        self._fill_slots: np.ndarray = np.empty(self._MIN_CAPACITY, np.int32)
+        self._fill_quantities: np.ndarray = np.empty(self._MIN_CAPACITY)
+        self._fill_prices: np.ndarray = np.empty(self._MIN_CAPACITY)
+        self._fill_fees: np.ndarray = np.empty(self._MIN_CAPACITY)
+
+        self._length: int = 0
+        self._times: np.ndarray = np.empty(0, np.int64)
+        self._equity: np.ndarray = np.empty(0)
+
+    def reserve(self, length: int) -> None:
+        """
+        Allocates the equity curve for `length` points up front, ie. the
+        number of candles of the run. The curve still grows if more
+        points are recorded.
+
+        Args:
+            length (int): The number of points to allocate.
+        """
+        if length > len(self._equity):
+            self._resize_curve(length)
+
+    def fill(
+        self,
+        symbol: str,
+        quantity: float,
+        price: float,
+        datetime: datetime | int,
+        tz: tzinfo = None
+    ) -> None:
+        """
+        Records a trade, moving its cost and fee out of cash and the
+        shares into the position of the symbol.
+
+        Args:
+            symbol (str): The symbol traded, None for a single symbol.
+            quantity (float): The shares traded, negative for a sell.
+            price (float): The price traded at.
+            datetime (datetime | int): The datetime of the candle traded
+                on, or its epoch nanoseconds.
+            tz (tzinfo, optional): The timezone of epoch nanoseconds.
+                Defaults to None.
+        """
+        slot = self._slot(symbol)
+        n = self._fill_count
+
+        if n == len(self._fill_prices):
+            self._resize_fills(2 * n)
+
+        self._fill_times[n] = self._nanoseconds(datetime, tz)
+        self._fill_slots[n] = slot
+        self._fill_quantities[n] = quantity
+        self._fill_prices[n] = price
+
+        cost = quantity * price
+        fee = abs(cost) * self._commission
+
+        self._fill_fees[n] = fee
+        self._fill_count += 1
+
+        self._cash -= cost + fee
+        self._fees += fee
+        self._positions[slot] += quantity
+        self._prices[slot] = price
+
+    def fill_many(
+        self,
+        symbol: str,
+        datetimes: pd.DatetimeIndex,
+        quantities: np.ndarray,
+        prices: np.ndarray
+    ) -> None:
+        """
+        Records the trades of a symbol in bulk, the same as calling
+        fill() for each of them in order.
+
+        Args:
+            symbol (str): The symbol traded, None for a single symbol.
+            datetimes (pd.DatetimeIndex): The datetime of each trade.
+            quantities (np.ndarray): The shares of each trade, negative
+                for a sell.
+            prices (np.ndarray): The price of each trade.
+        """
+        quantities = np.asarray(quantities, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+
+        slot = self._slot(symbol)
+        n, m = self._fill_count, len(quantities)
+
+        if m == 0:
+            return
+        if n + m > len(self._fill_prices):
+            self._resize_fills(max(2 * len(self._fill_prices), n + m))
+
+        costs = quantities * prices
+        fees = np.abs(costs) * self._commission
+
+        self._fill_times[n:n + m] = self._nanoseconds_many(datetimes)
+        self._fill_slots[n:n + m] = slot
+        self._fill_quantities[n:n + m] = quantities
+        self._fill_prices[n:n + m] = prices
+        self._fill_fees[n:n + m] = fees
+        self._fill_count += m
+
+        self._cash -= costs.sum() + fees.sum()
+        self._fees += fees.sum()
+        self._positions[slot] += quantities.sum()
+        self._prices[slot] = prices[-1]
+
+    def set_price(self, symbol: str, price: float) -> None:
+        """
+        Values the symbol at a new price without recording the equity.
+
+        Args:
+            symbol (str): The symbol, None for a single symbol.
+            price (float): Its latest price.
+        """
+        slot = self._slot(symbol)
+        self._prices[slot] = price
+
+    def mark(
+        self,
+        symbol: str,
+        price: float,
+        datetime: datetime | int,
+        tz: tzinfo = None
+    ) -> float:
+        """
+        Values the symbol at a new price and records the equity of the
+        portfolio as of `datetime` on the equity curve.
+
+        Args:
+            symbol (str): The symbol, None for a single symbol.
+            price (float): Its latest price, ie. the candle's close.
+            datetime (datetime | int): The datetime of the candle, or
+                its epoch nanoseconds as the broker passes it.
+            tz (tzinfo, optional): The timezone of epoch nanoseconds.
+                Defaults to None.
+
+        Returns:
+            float: The equity of the portfolio.
+        """
+        self.set_price(symbol, price)
+
+        time = self._nanoseconds(datetime, tz)
+        n = self._length
+
+        if n and self._times[n - 1] == time:
+            n -= 1
+        else:
+            if n == len(self._equity):
+                self._resize_curve(max(2 * n, self._MIN_CAPACITY))
+            self._length += 1
+
+        equity = self.equity
+        self._times[n] = time
+        self._equity[n] = equity
+        return equity
+
+    def record_many(
+        self, datetimes: pd.DatetimeIndex, equity: np.ndarray
+    ) -> None:
+        """
+        Adds points to the end of the equity curve in bulk.
+
+        Args:
+            datetimes (pd.DatetimeIndex): The datetime of each point, in
+                order and after any point already recorded.
+            equity (np.ndarray): The equity at each point.
+        """
+        n, m = self._length, len(equity)
+
+        if n + m > len(self._equity):
+            self._resize_curve(n + m)
+
+        self._times[n:n + m] = self._nanoseconds_many(datetimes)
+        self._equity[n:n + m] = equity
+        self._length += m
+
+    def position(self, symbol: str = None) -> float:
+        """
+        The shares held of a symbol, negative when short.
+
+        Args:
+            symbol (str, optional): The symbol. Defaults to None, a
+                single symbol.
+
+        Returns:
+            float: The shares held.
+        """
+        slot = self._slots.get(symbol)
+        return 0.0 if slot is None else float(self._positions[slot])
+
+    @property
+    def cash(self) -> float:
+        """
+        The cash held.
+        """
+        return self._cash
+
+    @property
+    def initial_cash(self) -> float:
+        """
+        The cash held before any trades.
+        """
+        return self._initial_cash
+
+    @property
+    def commission(self) -> float:
+        """
+        The fee charged on every trade as a fraction of its value.
+        """
+        return self._commission
+
+    @property
+    def fees(self) -> float:
+        """
+        The fees paid so far.
+        """
+        return self._fees
+
+    @property
+    def value(self) -> float:
+        """
+        The value of every position at its last price.
+        """
+        k = len(self._slots)
+        return float(self._positions[:k] @ self._prices[:k])
+
+    @property
+    def equity(self) -> float:
+        """
+        The cash plus the value of every position.
+        """
+        return self._cash + self.value
+
+    @property
+    def positions(self) -> pd.Series:
+        """
+        The shares held of each symbol that has been traded or marked.
+        """
+        k = len(self._slots)
+        return pd.Series(
+            self._positions[:k].copy(), index=list(self._slots), dtype=float
+        )
+
+    @property
+    def equity_curve(self) -> pd.Series:
+        """
+        The equity recorded as of each candle, indexed by datetime.
+        """
+        n = self._length
+        return pd.Series(
+            self._equity[:n].copy(),
+            index=self._index(self._times[:n]),
+            name="equity"
+        )
+
+    @property
+    def fills(self) -> pd.DataFrame:
+        """
+        Every trade in the order they were made, indexed by datetime,
+        with the symbol, quantity, price and fee of each.
+        """
+        n = self._fill_count
+        symbols = np.array(list(self._slots) or [None], dtype=object)
+
+        return pd.DataFrame(
+            {
+                "symbol": symbols[self._fill_slots[:n]],
+                "quantity": self._fill_quantities[:n].copy(),
+                "price": self._fill_prices[:n].copy(),
+                "fee": self._fill_fees[:n].copy()
+            },
+            index=self._index(self._fill_times[:n])
+        )
+
+    def _slot(self, symbol: str) -> int:
+        """
+        The slot of a symbol, given the next free one the first time
+        the symbol is seen.
+        """
+        slot = self._slots.get(symbol)
+
+        if slot is None:
+            slot = self._slots[symbol] = len(self._slots)
+
+            if slot == len(self._positions):
+                self._positions = np.resize(self._positions, 2 * slot)
+                self._prices = np.resize(self._prices, 2 * slot)
+                self._positions[slot:] = 0
+                self._prices[slot:] = 0
+
+        return slot
+
+    def _nanoseconds(
+        self, datetime: datetime | int, tz: tzinfo = None
+    ) -> int:
+        """
+        The epoch nanoseconds of a datetime, remembering its timezone
+        for when the datetimes are given back. Epoch nanoseconds are
+        passed through as they are.
+        """
+        if isinstance(datetime, int):
+            if self._tz is None and tz is not None:
+                self._tz = tz
+            return datetime
+
+        if not isinstance(datetime, pd.Timestamp):
+            datetime = pd.Timestamp(datetime)
+
+        if self._tz is None and datetime.tzinfo is not None:
+            self._tz = datetime.tzinfo
+
+        return datetime.value
+
+    def _nanoseconds_many(self, datetimes: pd.DatetimeIndex) -> np.ndarray:
+        """
+        The epoch nanoseconds of a DatetimeIndex, remembering its
+        timezone for when the datetimes are given back.
+        """
+        datetimes = pd.DatetimeIndex(datetimes)
+
+        if self._tz is None and datetimes.tz is not None:
+            self._tz = datetimes.tz
+
+        return datetimes.as_unit("ns").asi8
+
+    def _index(self, times: np.ndarray) -> pd.DatetimeIndex:
+        """
+        The datetimes of epoch nanosecond timestamps.
+        """
+        index = pd.DatetimeIndex(times.astype("datetime64[ns]"))
+
+        if self._tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._tz)
+
+        return index
+
+    def _resize_curve(self, length: int) -> None:
+        """
+        Moves the equity curve into arrays of a new length.
+        """
+        n = self._length
+
+        times = np.empty(length, np.int64)
+        equity = np.empty(length)
+        times[:n] = self._times[:n]
+        equity[:n] = self._equity[:n]
+
+        self._times, self._equity = times, equity
+
+    def _resize_fills(self, length: int) -> None:
+        """
+        Moves the fills into arrays of a new length.
+        """
+        self._fill_times = np.resize(self._fill_times, length)
+        self._fill_slots = np.resize(self._fill_slots, length)
+        self._fill_quantities = np.resize(self._fill_quantities, length)
+        self._fill_prices = np.resize(self._fill_prices, length)
+        self._fill_fees = np.resize(self._fill_fees, length)
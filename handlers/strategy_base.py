@@ -1,3 +1,7 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from finance_types import Candle, Order, OrderType, Side
 from handler_base import DataHandler
 from broker import Broker
 
@@ -7,31 +11,202 @@ class StrategyBase(DataHandler):
     only difference being the addition of broker field that handles
     any buying or selling decisions.
 
+    Orders sent with long(), short() and close() are filled by the
+    broker from the next candle onwards, before the strategy sees it.
+
+    Strategies whose positions are a function of the data alone may
+    override signals(), so the engine can run them in one vectorized
+    pass with Engine.run_vectorized().
+
     Args:
         broker (Broker): The broker handles everything regarding buying
             and selling.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
     """
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, max_length: int = None) -> None:
+        super().__init__(max_length)
         self._broker: Broker = None
 
-    def long(self) -> None:
+    def update(self, candle: Candle, symbol: str = None) -> None:
+        """
+        Lets the broker fill the pending orders the new candle reaches
+        before updating the strategy with it.
+
+        Args:
+            candle (Candle): New candle to be added.
+            symbol (str, optional): The symbol the candle belongs to.
+                Defaults to None, the currently selected symbol.
+        """
+        if self._broker is not None:
+            self._broker.process(
+                candle, self._symbol if symbol is None else symbol
+            )
+
+        super().update(candle, symbol)
+
+    def signals(self, data: pd.DataFrame) -> pd.Series | np.ndarray:
+        """
+        Optional hook to work out the position the strategy wants to
+        hold after every row of a dataset at once. Row i is decided on
+        the close of row i and traded at the open of row i + 1, the
+        same as a market order sent from on_candle().
+
+        Precomputed indicators can be read with their `computed` frame.
+        NaN keeps the previous position, and the position starts at 0.
+
+        Args:
+            data (pd.DataFrame): The OHLCV data of the current symbol.
+
+        Raises:
+            NotImplementedError: The strategy doesn't override this.
+
+        Returns:
+            pd.Series | np.ndarray: The shares to hold after each row,
+                negative for a short.
+        """
+        raise NotImplementedError
+
+    def long(
+        self, size: float = 1, limit: float = None, stop: float = None
+    ) -> Order:
+        """
+        Sends an order to buy the current symbol.
+
+        Args:
+            size (float, optional): Amount of shares. Defaults to 1.
+            limit (float, optional): Only buy at this price or lower.
+                Defaults to None.
+            stop (float, optional): Only buy once the price rises to
+                this. Defaults to None.
+
+        Returns:
+            Order: The order sent, a market order if neither limit nor
+                stop is given.
+        """
+        return self._order(Side.BUY, size, limit, stop)
+
+    def short(
+        self, size: float = 1, limit: float = None, stop: float = None
+    ) -> Order:
+        """
+        Sends an order to sell the current symbol.
+
+        Args:
+            size (float, optional): Amount of shares. Defaults to 1.
+            limit (float, optional): Only sell at this price or higher.
+                Defaults to None.
+            stop (float, optional): Only sell once the price falls to
+                this. Defaults to None.
+
+        Returns:
+            Order: The order sent, a market order if neither limit nor
+                stop is given.
+        """
+        return self._order(Side.SELL, size, limit, stop)
+
+    def close(self) -> Order | None:
+        """
+        Sends a market order that closes the position held in the
+        current symbol. Pending orders are left as they are.
+
+        Returns:
+            Order | None: The order sent, None if no position is held.
+        """
+        position = self._get_broker().position(self._symbol)
+
+        if position == 0:
+            return None
+
+        side = Side.SELL if position > 0 else Side.BUY
+        return self._order(side, abs(position))
+
+    def target(self, position: float) -> Order | None:
+        """
+        Sends the market order that takes the position held in the
+        current symbol to `position`, counting market orders that are
+        still pending. Mirrors a row of signals() from on_candle().
+
+        Args:
+            position (float): The shares to hold, negative for a short.
+
+        Returns:
+            Order | None: The order sent, None if no order is needed.
+        """
+        broker = self._get_broker()
+        held = broker.position(self._symbol) + sum(
+            o.quantity for o in broker.orders
+            if o.symbol == self._symbol and o.type is OrderType.MARKET
+        )
+        difference = position - held
+
+        if difference == 0:
+            return None
+
+        side = Side.BUY if difference > 0 else Side.SELL
+        return self._order(side, abs(difference))
+
+    def cancel(self, order: Order) -> bool:
+        """
+        Cancels a pending order.
+
+        Args:
+            order (Order): The order sent by long(), short() or close().
+
+        Returns:
+            bool: Whether the order was still pending.
+        """
+        return self._get_broker().cancel(order)
+
+    @property
+    def vectorizable(self) -> bool:
         """
-        Responsible for long positions.
+        Whether this strategy overrides signals().
         """
-        pass
+        return type(self).signals is not StrategyBase.signals
 
-    def short(self) -> None:
+    @property
+    def position(self) -> float:
         """
-        Responsible for short positions.
+        The shares held of the current symbol, negative when short.
         """
-        pass
+        return self._get_broker().position(self._symbol)
 
-    def close(self) -> None:
+    def _order(
+        self, side: Side, size: float, limit: float = None, stop: float = None
+    ) -> Order:
         """
-        Responsible for closing positions.
+        Sends an order for the current symbol to the broker.
+
+        Raises:
+            ValueError: Both limit and stop are given.
         """
-        pass
+        if limit is not None and stop is not None:
+            raise ValueError("An order takes either a limit or a stop price")
+
+        if limit is not None:
+            order = Order(side, size, OrderType.LIMIT, limit, self._symbol)
+        elif stop is not None:
+            order = Order(side, size, OrderType.STOP, stop, self._symbol)
+        else:
+            order = Order(side, size, symbol=self._symbol)
+
+        return self._get_broker().submit(order)
+
+    def _get_broker(self) -> Broker:
+        """
+        The broker, which is set once the strategy is loaded into an
+        engine.
+
+        Raises:
+            RuntimeError: The strategy has no broker.
+        """
+        if self._broker is None:
+            raise RuntimeError(
+                "Strategy has no broker, load it into an engine"
+            )
+
+        return self._broker
 
     @property
     def broker(self) -> Broker:
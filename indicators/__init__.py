@@ -0,0 +1,9 @@
+from moving_average import SMA, EMA
+from rsi import RSI
+from atr import ATR
+from bollinger import BollingerBands
+from extrema import RollingMax, RollingMin
+
+__all__ = [
+    "SMA", "EMA", "RSI", "ATR", "BollingerBands", "RollingMax", "RollingMin"
+]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import pandas as pd
+from handlers import IndicatorBase
+
+class ATR(IndicatorBase):
+    """
+    Average true range using Wilder's smoothing, each update is O(1).
+    The true range of the first candle is its high minus its low.
+
+    Attributes:
+        value (float): The current ATR, None until `period` candles
+            have been added.
+
+    Args:
+        period (int, optional): Number of true ranges smoothed.
+            Defaults to 14.
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int = 14,
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period < 1:
+            raise ValueError(f"period must be at least 1 | Actual: {period}")
+
+        self.period: int = period
+        self.value: float = None
+
+        self._previous_close: float = None
+        self._sum: float = 0.0
+        self._count: int = 0
+
+    def on_candle(self) -> None:
+        candle = self.candles.current
+
+        true_range = candle.high - candle.low
+        if self._previous_close is not None:
+            true_range = max(
+                true_range,
+                abs(candle.high - self._previous_close),
+                abs(candle.low - self._previous_close)
+            )
+        self._previous_close = candle.close
+
+        if self.value is not None:
+            self.value += (true_range - self.value) / self.period
+            return
+
+        self._sum += true_range
+        self._count += 1
+
+        if self._count == self.period:
+            self.value = self._sum / self.period
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from collections import deque
+from math import sqrt
+from operator import attrgetter
+import pandas as pd
+from handlers import IndicatorBase
+
+class BollingerBands(IndicatorBase):
+    """
+    Bollinger bands, a moving average of the last `period` candles with
+    bands `num_std` standard deviations above and below it. The mean and
+    variance of the window are kept with Welford's method, updated for
+    the value entering and the value leaving the window, so each update
+    is O(1).
+
+    Attributes:
+        value (float): The middle band, None until `period` candles
+            have been added.
+        upper (float): The upper band.
+        lower (float): The lower band.
+        std (float): The standard deviation of the window.
+
+    Args:
+        period (int, optional): Number of candles in the window.
+            Defaults to 20.
+        num_std (float, optional): Width of the bands in standard
+            deviations. Defaults to 2.
+        ddof (int, optional): Delta degrees of freedom of the standard
+            deviation. Defaults to 0.
+        source (str, optional): The candle attribute used. Defaults to
+            "close".
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int = 20,
+        num_std: float = 2.0,
+        ddof: int = 0,
+        source: str = "close",
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period <= ddof:
+            raise ValueError(
+                f"period must be greater than ddof | Actual: {period}"
+            )
+
+        self.period: int = period
+        self.num_std: float = num_std
+        self.ddof: int = ddof
+        self.source: str = source
+        self.value: float = None
+        self.upper: float = None
+        self.lower: float = None
+        self.std: float = None
+
+        self._price = attrgetter(source)
+        self._window: deque[float] = deque(maxlen=period)
+        self._mean: float = 0.0
+        self._m2: float = 0.0
+
+    def on_candle(self) -> None:
+        price = self._price(self.candles.current)
+
+        if len(self._window) < self.period:
+            self._window.append(price)
+            delta = price - self._mean
+            self._mean += delta / len(self._window)
+            self._m2 += delta * (price - self._mean)
+
+            if len(self._window) < self.period:
+                return
+        else:
+            old = self._window[0]
+            self._window.append(price)
+            mean = self._mean + (price - old) / self.period
+            self._m2 += (price - old) * (price - mean + old - self._mean)
+            self._mean = mean
+
+        # rounding can leave a tiny negative sum for a flat window
+        self.std = sqrt(max(self._m2, 0.0) / (self.period - self.ddof))
+        self.value = self._mean
+        self.upper = self._mean + self.num_std * self.std
+        self.lower = self._mean - self.num_std * self.std
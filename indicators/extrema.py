@@ -0,0 +1,113 @@
+from __future__ import annotations
+from collections import deque
+from operator import attrgetter
+import pandas as pd
+from handlers import IndicatorBase
+
+class RollingMax(IndicatorBase):
+    """
+    Highest value over the last `period` candles. Candidates are kept
+    in a monotonic deque, so each update is amortized O(1).
+
+    Attributes:
+        value (float): The current highest value, None until `period`
+            candles have been added.
+
+    Args:
+        period (int): Number of candles in the window.
+        source (str, optional): The candle attribute used. Defaults to
+            "high".
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int,
+        source: str = "high",
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period < 1:
+            raise ValueError(f"period must be at least 1 | Actual: {period}")
+
+        self.period: int = period
+        self.source: str = source
+        self.value: float = None
+
+        self._price = attrgetter(source)
+        # (update number, value) pairs with decreasing values
+        self._candidates: deque[tuple[int, float]] = deque()
+        self._count: int = 0
+
+    def on_candle(self) -> None:
+        price = self._price(self.candles.current)
+        candidates = self._candidates
+
+        while candidates and candidates[-1][1] <= price:
+            candidates.pop()
+        candidates.append((self._count, price))
+
+        if candidates[0][0] <= self._count - self.period:
+            candidates.popleft()
+
+        self._count += 1
+
+        if self._count >= self.period:
+            self.value = candidates[0][1]
+
+class RollingMin(IndicatorBase):
+    """
+    Lowest value over the last `period` candles. Candidates are kept
+    in a monotonic deque, so each update is amortized O(1).
+
+    Attributes:
+        value (float): The current lowest value, None until `period`
+            candles have been added.
+
+    Args:
+        period (int): Number of candles in the window.
+        source (str, optional): The candle attribute used. Defaults to
+            "low".
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int,
+        source: str = "low",
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period < 1:
+            raise ValueError(f"period must be at least 1 | Actual: {period}")
+
+        self.period: int = period
+        self.source: str = source
+        self.value: float = None
+
+        self._price = attrgetter(source)
+        # (update number, value) pairs with increasing values
+        self._candidates: deque[tuple[int, float]] = deque()
+        self._count: int = 0
+
+    def on_candle(self) -> None:
+        price = self._price(self.candles.current)
+        candidates = self._candidates
+
+        while candidates and candidates[-1][1] >= price:
+            candidates.pop()
+        candidates.append((self._count, price))
+
+        if candidates[0][0] <= self._count - self.period:
+            candidates.popleft()
+
+        self._count += 1
+
+        if self._count >= self.period:
+            self.value = candidates[0][1]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from collections import deque
+from operator import attrgetter
+import pandas as pd
+from handlers import IndicatorBase
+
+# Number of updates between re-summing the window, so rounding errors
+# in the running sum can't build up over a long run
+_RESUM_INTERVAL = 4096
+
+class SMA(IndicatorBase):
+    """
+    Simple moving average of the last `period` candles, kept as a
+    running sum so each update is O(1).
+
+    Attributes:
+        value (float): The current average, None until `period`
+            candles have been added.
+
+    Args:
+        period (int): Number of candles averaged.
+        source (str, optional): The candle attribute averaged.
+            Defaults to "close".
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int,
+        source: str = "close",
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period < 1:
+            raise ValueError(f"period must be at least 1 | Actual: {period}")
+
+        self.period: int = period
+        self.source: str = source
+        self.value: float = None
+
+        self._price = attrgetter(source)
+        self._window: deque[float] = deque(maxlen=period)
+        self._sum: float = 0.0
+        self._updates: int = 0
+
+    def on_candle(self) -> None:
+        price = self._price(self.candles.current)
+
+        if len(self._window) == self.period:
+            self._sum -= self._window[0]
+
+        self._window.append(price)
+        self._sum += price
+        self._updates += 1
+
+        if self._updates % _RESUM_INTERVAL == 0:
+            self._sum = sum(self._window)
+
+        if len(self._window) == self.period:
+            self.value = self._sum / self.period
+
+class EMA(IndicatorBase):
+    """
+    Exponential moving average with a smoothing factor of
+    2 / (period + 1), seeded with the simple average of the first
+    `period` candles.
+
+    Attributes:
+        value (float): The current average, None until `period`
+            candles have been added.
+
+    Args:
+        period (int): Number of candles in the span of the average.
+        source (str, optional): The candle attribute averaged.
+            Defaults to "close".
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int,
+        source: str = "close",
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period < 1:
+            raise ValueError(f"period must be at least 1 | Actual: {period}")
+
+        self.period: int = period
+        self.source: str = source
+        self.value: float = None
+
+        self._price = attrgetter(source)
+        self._alpha: float = 2 / (period + 1)
+        self._seed: float = 0.0
+        self._count: int = 0
+
+    def on_candle(self) -> None:
+        price = self._price(self.candles.current)
+
+        if self.value is not None:
+            self.value += self._alpha * (price - self.value)
+            return
+
+        self._seed += price
+        self._count += 1
+
+        if self._count == self.period:
+            self.value = self._seed / self.period
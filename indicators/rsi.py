@@ -0,0 +1,72 @@
+from __future__ import annotations
+from operator import attrgetter
+import pandas as pd
+from handlers import IndicatorBase
+
+class RSI(IndicatorBase):
+    """
+    Relative strength index using Wilder's smoothing of the average
+    gain and loss, each update is O(1).
+
+    Attributes:
+        value (float): The current RSI between 0 and 100, None until
+            `period` changes have been seen.
+
+    Args:
+        period (int, optional): Number of changes smoothed. Defaults
+            to 14.
+        source (str, optional): The candle attribute used. Defaults to
+            "close".
+        data (pd.DataFrame, optional): Backdata stored by indicator.
+        max_length (int, optional): The most candles kept in
+            self.candles. Defaults to None, which keeps every candle.
+    """
+    def __init__(
+        self,
+        period: int = 14,
+        source: str = "close",
+        data: pd.DataFrame = None,
+        max_length: int = None
+    ) -> None:
+        super().__init__(data, max_length)
+
+        if period < 1:
+            raise ValueError(f"period must be at least 1 | Actual: {period}")
+
+        self.period: int = period
+        self.source: str = source
+        self.value: float = None
+
+        self._price = attrgetter(source)
+        self._previous: float = None
+        self._gain: float = 0.0
+        self._loss: float = 0.0
+        self._count: int = 0
+
+    def on_candle(self) -> None:
+        price = self._price(self.candles.current)
+        previous, self._previous = self._previous, price
+
+        if previous is None:
+            return
+
+        change = price - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if self._count < self.period:
+            # the first averages are plain means of the first changes
+            self._gain += gain / self.period
+            self._loss += loss / self.period
+            self._count += 1
+
+            if self._count < self.period:
+                return
+        else:
+            self._gain += (gain - self._gain) / self.period
+            self._loss += (loss - self._loss) / self.period
+
+        if self._loss == 0:
+            self.value = 50.0 if self._gain == 0 else 100.0
+        else:
+            self.value = 100 - 100 / (1 + self._gain / self._loss)
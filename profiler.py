@@ -0,0 +1,263 @@
+from __future__ import annotations
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from functools import wraps
+from time import perf_counter_ns
+import pandas as pd
+from handlers import DataHandler, DispatchPlan, Broker
+
+# The profiler of the run in the current context, which the timed
+# methods record into. Each thread and asyncio task has its own.
+_ACTIVE: ContextVar[Profiler] = ContextVar("profiler", default=None)
+
+# The timed methods swapped onto each class, by class and name, with
+# the original method and the number of profilers using them
+_INSTALLED: dict[tuple[type, str], list] = {}
+
+class Profiler:
+    """
+    Times where a run spends its time, per handler and per phase of
+    handling a candle.
+
+    While any profiler is started, the methods of each phase are
+    swapped on their class for a wrapper counting its calls and their
+    total and longest wall time with perf_counter_ns. The wrappers are
+    shared by every profiler and swapped back once the last of them
+    stops, so an engine that isn't profiling runs the unwrapped methods
+    untouched. A call is only recorded by the profiler started in the
+    same context, ie. the same thread or asyncio task, so engines
+    profiled at the same time each see only their own run.
+
+    The phases are:
+        update: DataHandler.update, everything done with one candle.
+        indicators: DataHandler._update_indicators, or the handler's
+            DispatchPlan.dispatch during a run, passing the candle to
+            the indicators, including their own updates.
+        compress: DataHandler._attempt_compress, aggregating candles
+            for an indicator at a lower frequency outside of a plan.
+        callbacks: DataHandler._process_candle, the handler's own
+            on_candle(), on_first() and on_last().
+        broker: Broker.process, filling orders and marking the
+            portfolio before the strategy sees the candle.
+        run and precompute: the engine's whole run and its work on
+            indicators that override compute().
+
+    Times include the phases nested inside them. Indicators updated
+    through a plan aren't passed their candles with update(), so only
+    their callbacks are timed on their own. Handlers are named by
+    their path from the root handler, ie. "MyStrategy.sma.rsi", and the
+    copies of an indicator made for each symbol share its name.
+
+    Args:
+        root (DataHandler): The handler being run, ie. the strategy.
+        engine (object, optional): The engine running it, whose run and
+            precompute phases are timed too. Defaults to None.
+    """
+
+    # The methods timed for each phase, and the class they are on
+    _PHASES: tuple[tuple[str, type, str], ...] = (
+        ("update", DataHandler, "update"),
+        ("indicators", DataHandler, "_update_indicators"),
+        ("indicators", DispatchPlan, "dispatch"),
+        ("compress", DataHandler, "_attempt_compress"),
+        ("callbacks", DataHandler, "_process_candle"),
+        ("broker", Broker, "process")
+    )
+
+    def __init__(self, root: DataHandler, engine: object = None) -> None:
+        self._root: DataHandler = root
+        self._engine: object = engine
+        self._stats: dict[tuple[str, str], list[int]] = {}
+        self._labels: dict[int, str] = {}
+        self._methods: list[tuple[type, str]] = []
+        self._token: Token = None
+
+    def start(self) -> None:
+        """
+        Swaps in the timed methods, if no other profiler has, and makes
+        this the profiler of the current context.
+
+        Raises:
+            RuntimeError: The profiler has already been started.
+        """
+        if self.active:
+            raise RuntimeError("Profiler has already been started")
+
+        phases = list(self._PHASES)
+
+        if self._engine is not None:
+            phases += [
+                ("run", type(self._engine), "_run"),
+                ("precompute", type(self._engine), "_precompute_indicators")
+            ]
+
+        for phase, cls, name in phases:
+            installed = _INSTALLED.get((cls, name))
+
+            if installed is None:
+                original = cls.__dict__[name]
+                timed = _timed(phase, original)
+                installed = _INSTALLED[(cls, name)] = [original, timed, 0]
+                setattr(cls, name, timed)
+
+            installed[2] += 1
+            self._methods.append((cls, name))
+
+        self._token = _ACTIVE.set(self)
+
+    def stop(self) -> None:
+        """
+        Stops recording in the current context, and swaps the original
+        methods back once no other profiler is using them. A method is
+        left alone if something else has replaced the timed one since.
+        """
+        if self._token is not None:
+            _ACTIVE.reset(self._token)
+            self._token = None
+
+        for cls, name in reversed(self._methods):
+            installed = _INSTALLED[(cls, name)]
+            installed[2] -= 1
+
+            if installed[2] == 0:
+                del _INSTALLED[(cls, name)]
+                if cls.__dict__.get(name) is installed[1]:
+                    setattr(cls, name, installed[0])
+
+        self._methods = []
+
+    def report(self) -> pd.DataFrame:
+        """
+        The time spent by each handler in each phase, slowest first.
+
+        Returns:
+            pd.DataFrame: One row per handler and phase, with the
+                number of calls, the total, mean and longest call in
+                milliseconds, and the total as a percent of the run.
+        """
+        rows = [
+            (handler, phase, calls, total, maximum)
+            for (handler, phase), (calls, total, maximum)
+            in self._stats.items()
+        ]
+        report = pd.DataFrame(
+            rows, columns=["handler", "phase", "calls", "total", "max"]
+        )
+
+        run = report.loc[report["phase"] == "run", "total"].max()
+        if pd.isna(run) or not run:
+            run = report["total"].max()
+
+        report["percent"] = 100 * report["total"] / run if run else 0.0
+        report["mean_ms"] = report["total"] / report["calls"] / 1e6
+        report["total_ms"] = report["total"] / 1e6
+        report["max_ms"] = report["max"] / 1e6
+
+        report = report.sort_values("total", ascending=False, kind="stable")
+        return report[
+            ["handler", "phase", "calls", "total_ms", "mean_ms", "max_ms",
+             "percent"]
+        ].reset_index(drop=True)
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether the timed methods are swapped in.
+        """
+        return self._token is not None
+
+    def _record(self, instance: object, phase: str, elapsed: int) -> None:
+        """
+        Counts a call of a phase against the handler it was called on.
+        """
+        key = (self._label(instance), phase)
+        entry = self._stats.get(key)
+
+        if entry is None:
+            self._stats[key] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def _label(self, instance: object) -> str:
+        """
+        The name of a handler, worked out again from the root handler
+        whenever one isn't known, ie. after a symbol is first selected.
+        """
+        label = self._labels.get(id(instance))
+
+        if label is None:
+            self._labels = self._name_handlers()
+            label = self._labels.setdefault(
+                id(instance), type(instance).__name__
+            )
+
+        return label
+
+    def _name_handlers(self) -> dict[int, str]:
+        """
+        Names every handler reachable from the root handler by the keys
+        of the indicators leading to it, including the templates and
+        per symbol copies of indicators.
+        """
+        labels = {}
+        pending = [(self._root, type(self._root).__name__)]
+
+        while pending:
+            handler, label = pending.pop()
+            labels[id(handler)] = label
+
+            if handler._plan is not None:
+                labels[id(handler._plan)] = label
+
+            dicts = [handler._indicators, handler._templates or {}]
+            dicts += [book[1] for book in handler._books.values()]
+
+            for indicators in dicts:
+                for key, indicator in indicators.items():
+                    if id(indicator) not in labels:
+                        pending.append((indicator, f"{label}.{key}"))
+
+        if self._engine is not None:
+            labels[id(self._engine)] = type(self._engine).__name__
+
+        broker = getattr(self._root, "broker", None)
+        if broker is not None:
+            labels[id(broker)] = type(broker).__name__
+
+        return labels
+
+    def __str__(self) -> str:
+        return self.report().to_string(
+            index=False, float_format=lambda x: f"{x:,.3f}"
+        )
+
+    def __enter__(self) -> Profiler:
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def _timed(phase: str, method: Callable) -> Callable:
+    """
+    Wraps a method so each call is timed and recorded by the profiler
+    of the current context, if there is one.
+    """
+    @wraps(method)
+    def timed(instance, *args, **kwargs):
+        profiler = _ACTIVE.get()
+
+        if profiler is None:
+            return method(instance, *args, **kwargs)
+
+        began = perf_counter_ns()
+
+        try:
+            return method(instance, *args, **kwargs)
+        finally:
+            profiler._record(instance, phase, perf_counter_ns() - began)
+
+    return timed
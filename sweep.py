@@ -0,0 +1,180 @@
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import ceil
+import os
+import numpy as np
+import pandas as pd
+from handlers import StrategyBase
+from data import SharedFrame, IndicatorCache
+from engine import Engine
+
+# Set in each worker process by _init_worker, so the data, factory and
+# evaluate function are sent to a worker once rather than once per run
+_worker: dict = {}
+
+def sweep(
+    strategy_factory: Callable[..., StrategyBase],
+    param_grid: Mapping[str, Iterable] | Iterable[Mapping],
+    data: pd.DataFrame | SharedFrame,
+    evaluate: Callable[[StrategyBase], dict] = None,
+    processes: int = None,
+    chunksize: int = None,
+    cache: IndicatorCache = None,
+    rows: slice = None
+) -> pd.DataFrame:
+    """
+    Runs a strategy once for every combination of parameters, spread
+    over a pool of worker processes, and collects the results into one
+    table.
+
+    The strategy factory and evaluate function are sent to the workers
+    by pickling, so they must be defined at the top level of a module.
+
+    Args:
+        strategy_factory (Callable[..., StrategyBase]): Called with the
+            parameters of a run as keyword arguments to make its
+            strategy, ie. the StrategyBase subclass itself.
+        param_grid (Mapping[str, Iterable] | Iterable[Mapping]): Either
+            the values to try for each parameter, where every
+            combination is run, or the parameters of each run.
+        data (pd.DataFrame | SharedFrame): The data every run is tested
+            on. A SharedFrame is attached to by each worker instead of
+            being copied into it.
+        evaluate (Callable[[StrategyBase], dict], optional): Called
+            with the strategy after its run, returns the results to
+            record. Defaults to None, which records the final equity,
+            total return, max drawdown and number of trades of the
+            strategy's portfolio.
+        processes (int, optional): Number of worker processes. Defaults
+            to None, which uses every core. 1 runs in this process.
+        chunksize (int, optional): Number of runs sent to a worker at a
+            time. Defaults to None, which splits the runs into about 4
+            chunks per worker.
+        cache (IndicatorCache, optional): Shared by the runs, so an
+            indicator that overrides compute() is only computed once
+            for the same parameters. Defaults to None.
+        rows (slice, optional): The rows of the data every run is
+            tested on. Each worker takes them from the data it was
+            given, so the rows of a SharedFrame are read from the
+            shared block rather than copied to every worker. Defaults
+            to None, which tests on every row.
+
+    Returns:
+        pd.DataFrame: One row per run, with a column for each parameter
+            followed by the results returned by evaluate.
+    """
+    params = _expand_grid(param_grid)
+    evaluate = evaluate or _evaluate_portfolio
+    processes = processes or os.cpu_count() or 1
+
+    if processes == 1 or len(params) < 2:
+        _init_worker(strategy_factory, data, evaluate, cache, rows)
+
+        # the data may be laid over a SharedFrame's block, which can be
+        # unlinked once the sweep returns
+        try:
+            results = [_run(p) for p in params]
+        finally:
+            _worker.clear()
+    else:
+        processes = min(processes, len(params))
+        chunksize = chunksize or max(1, ceil(len(params) / (processes * 4)))
+
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(strategy_factory, data, evaluate, cache, rows)
+        ) as executor:
+            results = list(executor.map(_run, params, chunksize=chunksize))
+
+    return pd.DataFrame([{**p, **r} for p, r in zip(params, results)])
+
+def _expand_grid(
+    param_grid: Mapping[str, Iterable] | Iterable[Mapping]
+) -> list[dict]:
+    """
+    Turns a parameter grid into the list of parameters for each run.
+
+    Args:
+        param_grid (Mapping[str, Iterable] | Iterable[Mapping]): The
+            values to try for each parameter, or the parameters of each
+            run.
+
+    Returns:
+        list[dict]: The keyword arguments of each run.
+    """
+    if isinstance(param_grid, Mapping):
+        names = list(param_grid)
+        return [
+            dict(zip(names, values))
+            for values in product(*(param_grid[n] for n in names))
+        ]
+
+    return [dict(p) for p in param_grid]
+
+def _init_worker(
+    strategy_factory: Callable[..., StrategyBase],
+    data: pd.DataFrame | SharedFrame,
+    evaluate: Callable[[StrategyBase], dict],
+    cache: IndicatorCache = None,
+    rows: slice = None
+) -> None:
+    """
+    Stores what every run in this process needs.
+    """
+    if isinstance(data, SharedFrame):
+        data = data.frame
+    if rows is not None:
+        data = data.iloc[rows]
+
+    _worker["strategy_factory"] = strategy_factory
+    _worker["data"] = data
+    _worker["evaluate"] = evaluate
+    _worker["cache"] = cache
+
+def _run(params: dict) -> dict:
+    """
+    Runs the strategy made with one set of parameters.
+
+    Args:
+        params (dict): The keyword arguments for the strategy factory.
+
+    Returns:
+        dict: The results returned by evaluate.
+    """
+    strategy = _worker["strategy_factory"](**params)
+
+    engine = Engine(cache=_worker["cache"])
+    engine.load_data(_worker["data"])
+    engine.load_strategy(strategy)
+    engine.run()
+
+    return _worker["evaluate"](strategy)
+
+def _evaluate_portfolio(strategy: StrategyBase) -> dict:
+    """
+    Summarises the portfolio of a strategy after its run.
+
+    Args:
+        strategy (StrategyBase): The strategy that was run.
+
+    Returns:
+        dict: The final equity, total return, max drawdown as a
+            fraction of the peak equity and number of trades.
+    """
+    portfolio = strategy.broker.portfolio
+    equity = portfolio.equity_curve.to_numpy()
+
+    if len(equity) == 0:
+        equity = np.array([portfolio.equity])
+
+    peaks = np.maximum.accumulate(equity)
+
+    return {
+        "equity": float(equity[-1]),
+        "return": float(equity[-1] / portfolio.initial_cash - 1),
+        "max_drawdown": float(np.max(1 - equity / peaks)),
+        "trades": len(portfolio.fills)
+    }
@@ -0,0 +1,37 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules import each other by name, ie. `from candle import Candle`,
+# so the root and each package are put on the path as they would be run
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _path in ("indicators", "data", "handlers", "finance_types", ""):
+    sys.path.insert(0, os.path.join(_ROOT, _path))
+
+def make_ohlcv(
+    periods: int, freq: str = "min", start: str = "2020-01-01", seed: int = 0
+) -> pd.DataFrame:
+    """
+    A random walk of OHLCV candles, every row one `freq` apart.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, periods).cumsum()
+    open_ = np.concatenate([[100.0], close[:-1]])
+
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + rng.uniform(0, 1, periods),
+            "low": np.minimum(open_, close) - rng.uniform(0, 1, periods),
+            "close": close,
+            "volume": rng.uniform(1, 10, periods)
+        },
+        index=pd.date_range(start, periods=periods, freq=freq)
+    )
+
+@pytest.fixture
+def ohlcv() -> pd.DataFrame:
+    return make_ohlcv(300)
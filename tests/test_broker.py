@@ -0,0 +1,130 @@
+import pandas as pd
+import pytest
+from finance_types import Candle, Order, OrderType, OrderStatus, Side
+from handlers import Broker
+from broker import _OrderBook
+
+class Candles:
+    """
+    Candles a minute apart, so each test can ask for the next one.
+    """
+    def __init__(self) -> None:
+        self._datetime = pd.Timestamp("2020-01-01")
+
+    def __call__(
+        self, open: float, high: float, low: float, close: float
+    ) -> Candle:
+        self._datetime += pd.Timedelta(minutes=1)
+        return Candle.from_values(self._datetime, open, high, low, close, 1.0)
+
+@pytest.fixture
+def candle() -> Candles:
+    return Candles()
+
+def _limit(side: Side, price: float) -> Order:
+    return Order(side, 1, OrderType.LIMIT, price)
+
+def _stop(side: Side, price: float) -> Order:
+    return Order(side, 1, OrderType.STOP, price)
+
+def test_fills_in_submission_order(candle):
+    broker = Broker()
+    orders = [
+        broker.submit(_limit(Side.SELL, 104)),
+        broker.submit(Order(Side.BUY, 1)),
+        broker.submit(_stop(Side.BUY, 103)),
+        broker.submit(_limit(Side.BUY, 97)),
+        broker.submit(_stop(Side.SELL, 98))
+    ]
+
+    filled = broker.process(candle(100, 105, 95, 100))
+
+    assert filled == orders
+    assert broker.fills == orders
+    assert broker.orders == []
+    assert all(o.status is OrderStatus.FILLED for o in orders)
+
+@pytest.mark.parametrize("order, bar, price", [
+    # the candle trades through the price
+    (_limit(Side.BUY, 100), (103, 104, 99, 101), 100),
+    (_limit(Side.SELL, 100), (97, 101, 96, 99), 100),
+    (_stop(Side.BUY, 100), (97, 101, 96, 99), 100),
+    (_stop(Side.SELL, 100), (103, 104, 99, 101), 100),
+    # the candle opens past the price
+    (_limit(Side.BUY, 100), (95, 97, 94, 96), 95),
+    (_limit(Side.SELL, 100), (105, 106, 104, 105), 105),
+    (_stop(Side.BUY, 100), (105, 106, 104, 105), 105),
+    (_stop(Side.SELL, 100), (95, 97, 94, 96), 95)
+])
+def test_fill_price(candle, order, bar, price):
+    broker = Broker()
+    broker.submit(order)
+
+    # a candle out of reach first
+    if (order.type is OrderType.LIMIT) == (order.side is Side.BUY):
+        far = (110, 111, 109, 110)
+    else:
+        far = (90, 91, 89, 90)
+
+    assert broker.process(candle(*far)) == []
+    assert broker.process(candle(*bar)) == [order]
+    assert order.filled_price == price
+
+def test_cancel_resting_order(candle):
+    broker = Broker()
+    kept = broker.submit(_limit(Side.BUY, 99))
+    cancelled = broker.submit(_limit(Side.BUY, 98))
+    market = broker.submit(Order(Side.SELL, 1))
+
+    assert broker.cancel(cancelled)
+    assert broker.cancel(market.id)
+    assert not broker.cancel(cancelled)
+    assert cancelled.status is OrderStatus.CANCELLED
+    assert broker.orders == [kept]
+
+    assert broker.process(candle(100, 101, 95, 96)) == [kept]
+    assert cancelled.filled_price is None
+    assert broker.position() == 1
+
+def test_cancelled_orders_are_dropped_lazily(candle):
+    broker = Broker()
+    orders = [broker.submit(_limit(Side.BUY, 90 + i % 5)) for i in range(20)]
+
+    for order in orders[:10]:
+        broker.cancel(order)
+
+    book = broker._books[None]
+
+    # left in the heap until reached
+    assert len(book._buy_limits) == 20
+    assert (book._pending, book._cancelled) == (10, 10)
+
+    assert broker.process(candle(100, 100, 80, 85)) == orders[10:]
+    assert (book._pending, book._cancelled) == (0, 0)
+    assert book._buy_limits == []
+    assert not book
+
+def test_heaps_compacted_once_mostly_cancelled(candle):
+    broker = Broker()
+    orders = [
+        broker.submit(_stop(Side.BUY, 110 + i % 7))
+        for i in range(3 * _OrderBook._COMPACT_AT)
+    ]
+    book = broker._books[None]
+
+    # every third order is kept, so the cancelled ones come to outnumber
+    # the pending ones and the heap is rebuilt without them
+    for i, order in enumerate(orders):
+        if i % 3:
+            broker.cancel(order)
+
+    kept = orders[::3]
+
+    assert book._pending == len(kept)
+    assert book._cancelled < book._COMPACT_AT
+    assert len(book._buy_stops) == len(kept) + book._cancelled
+    assert broker.orders == kept
+
+    assert broker.process(candle(100, 120, 99, 115)) == kept
+    assert (book._pending, book._cancelled) == (0, 0)
+    assert book._buy_stops == []
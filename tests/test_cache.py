@@ -0,0 +1,45 @@
+import os
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from data import prep_data
+from cache import read_cache
+
+@pytest.fixture
+def csv(tmp_path) -> str:
+    path = str(tmp_path / "data.csv")
+    make_ohlcv(500).to_csv(path, index_label="datetime")
+    return path
+
+def test_prep_data_cache_matches_csv(csv):
+    parsed = prep_data(csv, cache=True)
+    cached = prep_data(csv, cache=True)
+
+    assert os.path.exists(csv + ".cache.bin")
+    assert not cached["close"].to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(cached, parsed)
+    pd.testing.assert_frame_equal(
+        cached, prep_data(csv), check_index_type=False
+    )
+
+def test_cache_invalidated_when_csv_changes(csv):
+    prep_data(csv, cache=True)
+    assert read_cache(csv) is not None
+
+    # same contents, only touched
+    stat = os.stat(csv)
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert read_cache(csv) is None
+
+    prep_data(csv, cache=True)
+    assert read_cache(csv) is not None
+
+    # a row appended, so the size changes too
+    longer = make_ohlcv(501)
+    longer.to_csv(csv, index_label="datetime")
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert read_cache(csv) is None
+
+    data = prep_data(csv, cache=True)
+    assert len(data) == 501
+    assert data["close"].iloc[-1] == pytest.approx(longer["close"].iloc[-1])
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import timedelta
+import pandas as pd
+import pytest
+from finance_types import Candle, CandleList
+from handlers import StrategyBase
+from indicators import SMA
+from data import ReplaySource, stream_data
+from engine import Engine
+
+class Recorder(StrategyBase):
+
+    def __init__(self, back_data: pd.DataFrame = None) -> None:
+        super().__init__()
+        self.indicators["sma"] = SMA(3)
+        self.indicators["slow"] = SMA(2)
+        self.indicators["slow"].frequency = timedelta(minutes=5)
+        if back_data is not None:
+            self.indicators["back"] = SMA(3, data=back_data)
+        self.times = []
+
+    def on_candle(self) -> None:
+        self.times.append(self.candles.current.timestamp)
+
+def test_run_gapped_data(ohlcv):
+    # starts with a gap, so the frequency can't come from the first two
+    gapped = pd.concat(
+        [ohlcv.iloc[100:101], ohlcv.iloc[110:150], ohlcv.iloc[163:]]
+    )
+    strategy = Recorder(back_data=ohlcv.iloc[:90])
+
+    engine = Engine()
+    engine.load_strategy(strategy)
+    engine.load_data(gapped)
+    engine.run()
+
+    assert strategy.candles.frequency == timedelta(minutes=1)
+    assert strategy.times == list(gapped.index.as_unit("ns").asi8)
+    assert strategy.indicators["sma"].value == pytest.approx(
+        gapped["close"].iloc[-3:].mean()
+    )
+    assert len(strategy.indicators["back"].candles) == 90 + len(gapped)
+
+def test_candle_list_refuses_off_step_candles():
+    candles = CandleList()
+    candles.frequency = timedelta(minutes=1)
+
+    def candle(datetime: str) -> Candle:
+        return Candle.from_values(
+            pd.Timestamp(datetime), 1.0, 1.0, 1.0, 1.0, 1.0
+        )
+
+    for minute in ("00:00", "00:01", "00:10"):
+        candles.add(candle(f"2020-01-01 {minute}"))
+
+    with pytest.raises(ValueError):
+        candles.add(candle("2020-01-01 00:10:30"))
+    with pytest.raises(ValueError):
+        candles.add(candle("2020-01-01 00:10"))
+
+class Ending(StrategyBase):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.ends = 0
+
+    def on_candle(self) -> None:
+        pass
+
+    def on_end(self) -> None:
+        self.ends += 1
+
+def test_on_end_called_once_in_backtest_and_live(ohlcv):
+    backtest, live = Ending(), Ending()
+
+    engine = Engine()
+    engine.load_strategy(backtest)
+    engine.load_data(ohlcv)
+    engine.run()
+
+    engine = Engine()
+    engine.load_strategy(live)
+    asyncio.run(engine.run_live(ReplaySource(ohlcv)))
+
+    assert backtest.ends == live.ends == 1
+
+class Crossing(StrategyBase):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.indicators["fast"] = SMA(5)
+        self.indicators["slow"] = SMA(20)
+
+    def on_candle(self) -> None:
+        fast = self.indicators["fast"].value
+        slow = self.indicators["slow"].value
+        if slow is not None:
+            self.target(10 if fast > slow else -10)
+
+@pytest.mark.parametrize("noted", [False, True])
+@pytest.mark.parametrize("gapped", [False, True])
+def test_resume_matches_a_whole_run(ohlcv, tmp_path, gapped, noted):
+    if gapped:
+        ohlcv = ohlcv.drop(ohlcv.index[150:170])
+    if noted:
+        ohlcv = ohlcv.assign(note="x")
+
+    whole = Engine()
+    whole.load_strategy(Crossing())
+    whole.load_data(ohlcv)
+    whole.run()
+
+    path = str(tmp_path / "snapshot")
+    resumed = Engine()
+    resumed.load_strategy(Crossing())
+    resumed.load_data(ohlcv.iloc[:100])
+    resumed.run(snapshot=path)
+
+    # each resume writes a snapshot of its own to carry on from
+    for data in (ohlcv.iloc[:200], ohlcv):
+        resumed = Engine()
+        resumed.load_data(data)
+        resumed.resume(path)
+
+    expected = whole.broker.portfolio
+    actual = resumed.broker.portfolio
+
+    pd.testing.assert_series_equal(actual.equity_curve, expected.equity_curve)
+    pd.testing.assert_frame_equal(actual.fills, expected.fills)
+    assert resumed.strategy.indicators["slow"].value == (
+        whole.strategy.indicators["slow"].value
+    )
+
+def test_candle_list_refuses_reordering(ohlcv):
+    candles = CandleList()
+    for row in ohlcv.iloc[:3].itertuples():
+        candles.add(Candle.from_values(
+            row.Index, row.open, row.high, row.low, row.close, row.volume
+        ))
+
+    for reorder in (candles.reverse, candles.sort):
+        with pytest.raises(TypeError):
+            reorder()
+
+    assert [c.datetime for c in candles] == list(ohlcv.index[2::-1])
+
+class Bucketed(StrategyBase):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.indicators["slow"] = SMA(3)
+        self.indicators["slow"].frequency = timedelta(minutes=5)
+        self.seen = []
+        self.ends = 0
+
+    def on_candle(self) -> None:
+        c = self.candles.current
+        slow = self.indicators["slow"]
+        self.seen.append((
+            c.timestamp, c.close, c.is_first, c.is_last, slow.value,
+            len(slow.candles)
+        ))
+
+    def on_end(self) -> None:
+        self.ends += 1
+
+def test_stream_matches_a_whole_run(ohlcv, tmp_path):
+    path = str(tmp_path / "data.csv")
+    ohlcv.to_csv(path, index_label="datetime")
+
+    whole = Bucketed()
+    engine = Engine()
+    engine.load_strategy(whole)
+    engine.load_data(ohlcv)
+    engine.run()
+
+    # 7 rows a chunk, so chunks end part way through 5 minute buckets
+    for chunks in (
+        stream_data(path, chunksize=7),
+        (ohlcv.iloc[i:i + 7] for i in range(0, len(ohlcv), 7))
+    ):
+        streamed = Bucketed()
+        engine = Engine()
+        engine.load_strategy(streamed)
+        engine.load_stream(chunks)
+        engine.run()
+
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(streamed.seen), pd.DataFrame(whole.seen),
+            check_exact=False, rtol=1e-12
+        )
+        assert streamed.ends == whole.ends == 1
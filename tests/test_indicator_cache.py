@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from handlers import IndicatorBase, StrategyBase
+from data import IndicatorCache
+from engine import Engine
+
+class Momentum(IndicatorBase):
+    """
+    The change of the close over `period` candles, counting the times
+    it is computed.
+    """
+    computed_count = 0
+
+    def __init__(self, period: int, weights: object = None) -> None:
+        super().__init__()
+        self.period = period
+
+    def compute(self, data: pd.DataFrame) -> pd.DataFrame:
+        Momentum.computed_count += 1
+        change = data["close"].diff(self.period)
+        return pd.DataFrame(
+            {"change": change, "rising": change > 0}, index=data.index
+        )
+
+class Recorder(StrategyBase):
+
+    def __init__(self, weights: object = None) -> None:
+        super().__init__()
+        self.indicators["momentum"] = Momentum(5, weights)
+        self.changes = []
+
+    def on_candle(self) -> None:
+        self.changes.append(self.indicators["momentum"].lookup("change"))
+
+@pytest.fixture
+def cache(tmp_path) -> IndicatorCache:
+    return IndicatorCache(str(tmp_path / "cache"))
+
+@pytest.mark.parametrize("index", [
+    pd.date_range(
+        "2020-03-06", periods=100, freq="h", tz="US/Eastern", name="datetime"
+    ),
+    pd.RangeIndex(100)
+])
+def test_put_get_round_trip(cache, index):
+    frame = pd.DataFrame({
+        "value": np.linspace(0, 1, 100),
+        "count": np.arange(100, dtype=np.int32),
+        "flag": np.arange(100) % 2 == 0
+    }, index=index)
+
+    assert cache.put("entry", frame)
+
+    pd.testing.assert_frame_equal(cache.get("entry"), frame)
+    assert cache.get("missing") is None
+
+def test_key_changes_with_arguments_and_data(cache, ohlcv):
+    key = cache.key(Momentum(5), ohlcv)
+
+    changed = ohlcv.copy()
+    changed.iloc[-1, changed.columns.get_loc("volume")] += 1
+
+    assert key == cache.key(Momentum(5), ohlcv.copy())
+    assert key != cache.key(Momentum(6), ohlcv)
+    assert key != cache.key(Momentum(5), changed)
+    assert cache.key(Momentum(5, np.ones(3)), ohlcv) != (
+        cache.key(Momentum(5, np.zeros(3)), ohlcv)
+    )
+
+    cache.put(key, Momentum(5).compute(ohlcv))
+
+    assert cache.get(key) is not None
+    assert cache.get(cache.key(Momentum(6), ohlcv)) is None
+    assert cache.get(cache.key(Momentum(5), changed)) is None
+
+def test_undescribable_argument_is_not_cached(cache, ohlcv):
+    assert cache.key(Momentum(5, weights=object()), ohlcv) is None
+
+    for _ in range(2):
+        engine = Engine(cache=cache)
+        engine.load_strategy(Recorder(weights=object()))
+        engine.load_data(ohlcv)
+        before = Momentum.computed_count
+        engine.run()
+
+        assert Momentum.computed_count == before + 1
+
+    assert cache.size == 0
+
+def test_least_recently_used_evicted(tmp_path):
+    frame = pd.DataFrame({"value": np.zeros(100)})
+    cache = IndicatorCache(str(tmp_path / "cache"), max_bytes=2 * 800)
+
+    cache.put("a", frame)
+    cache.put("b", frame)
+    cache.get("a")
+    cache.put("c", frame)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size <= cache.max_bytes
+
+def test_cached_run_matches_uncached_run(cache, ohlcv):
+    runs = []
+
+    for engine_cache in (None, cache, cache):
+        strategy = Recorder()
+        engine = Engine(cache=engine_cache)
+        engine.load_strategy(strategy)
+        engine.load_data(ohlcv)
+
+        before = Momentum.computed_count
+        engine.run()
+        runs.append((strategy.changes, Momentum.computed_count - before))
+
+    (uncached, computed), (first, stored), (second, loaded) = runs
+
+    assert (computed, stored, loaded) == (1, 1, 0)
+    np.testing.assert_array_equal(first, uncached)
+    np.testing.assert_array_equal(second, uncached)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from handlers import StrategyBase
+from indicators import SMA, EMA, BollingerBands, RollingMax, RollingMin
+from engine import Engine
+
+class Recorder(StrategyBase):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.indicators["sma"] = SMA(10)
+        self.indicators["ema"] = EMA(10)
+        self.indicators["bands"] = BollingerBands(20)
+        self.indicators["max"] = RollingMax(15)
+        self.indicators["min"] = RollingMin(15)
+        self.values = []
+
+    def on_candle(self) -> None:
+        i = self.indicators
+        self.values.append({
+            "sma": i["sma"].value,
+            "ema": i["ema"].value,
+            "middle": i["bands"].value,
+            "std": i["bands"].std,
+            "max": i["max"].value,
+            "min": i["min"].value
+        })
+
+def test_streaming_indicators_match_pandas(ohlcv):
+    strategy = Recorder()
+
+    engine = Engine()
+    engine.load_strategy(strategy)
+    engine.load_data(ohlcv)
+    engine.run()
+
+    streamed = pd.DataFrame(strategy.values, index=ohlcv.index).astype(float)
+    close = ohlcv["close"]
+
+    # the ema is seeded with the mean of its first period
+    seeded = close.copy()
+    seeded.iloc[:9] = np.nan
+    seeded.iloc[9] = close.iloc[:10].mean()
+
+    expected = pd.DataFrame({
+        "sma": close.rolling(10).mean(),
+        "ema": seeded.ewm(span=10, adjust=False, ignore_na=True).mean(),
+        "middle": close.rolling(20).mean(),
+        "std": close.rolling(20).std(ddof=0),
+        "max": ohlcv["high"].rolling(15).max(),
+        "min": ohlcv["low"].rolling(15).min()
+    })
+
+    pd.testing.assert_frame_equal(streamed, expected, rtol=1e-9)
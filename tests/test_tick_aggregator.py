@@ -0,0 +1,66 @@
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from finance_types import TickAggregator
+from handlers import StrategyBase
+
+class Recorder(StrategyBase):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen = []
+
+    def on_candle(self) -> None:
+        c = self.candles.current
+        self.seen.append((
+            c.timestamp, c.open, c.high, c.low, c.close, c.volume,
+            c.is_first, c.is_last
+        ))
+
+def _ticks(count: int, seed: int = 0) -> tuple[np.ndarray, ...]:
+    """
+    Ticks a few seconds apart with a quiet spell of several minutes.
+    """
+    rng = np.random.default_rng(seed)
+    gaps = rng.integers(1, 20, count) * 1_000_000_000
+    gaps[count // 2] = 7 * 60 * 1_000_000_000
+
+    timestamps = pd.Timestamp("2020-01-01 09:30").value + np.cumsum(gaps)
+    prices = 100 + rng.normal(0, 0.1, count).cumsum()
+    sizes = rng.uniform(1, 5, count)
+    return timestamps, prices, sizes
+
+@pytest.mark.parametrize("fill", [True, False])
+def test_update_many_matches_update(fill):
+    timestamps, prices, sizes = _ticks(400)
+    frequencies = [timedelta(minutes=1), timedelta(minutes=5)]
+
+    def run(feed) -> dict:
+        aggregator = TickAggregator(frequencies, fill=fill)
+        recorders = {f: Recorder() for f in frequencies}
+        for frequency, recorder in recorders.items():
+            aggregator.connect(recorder, frequency)
+
+        feed(aggregator)
+        aggregator.flush()
+        return {f: r.seen for f, r in recorders.items()}
+
+    def one_by_one(aggregator: TickAggregator) -> None:
+        for tick in zip(timestamps.tolist(), prices, sizes):
+            aggregator.update(*tick)
+
+    def in_bulk(aggregator: TickAggregator) -> None:
+        # split mid bucket, so the open bucket carries over
+        aggregator.update_many(timestamps[:123], prices[:123], sizes[:123])
+        aggregator.update_many(timestamps[123:], prices[123:], sizes[123:])
+
+    expected, actual = run(one_by_one), run(in_bulk)
+
+    for frequency in frequencies:
+        assert len(expected[frequency]) > 1
+        np.testing.assert_allclose(
+            np.array(actual[frequency], dtype=np.float64),
+            np.array(expected[frequency], dtype=np.float64),
+            rtol=1e-12
+        )
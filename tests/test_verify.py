@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from handlers import StrategyBase
+from indicators import SMA
+from verify import verify_vectorized
+
+class AboveAverage(StrategyBase):
+    """
+    Holds 10 shares while the close is above its 10 candle average.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.indicators["sma"] = SMA(10)
+
+    def on_candle(self) -> None:
+        average = self.indicators["sma"].value
+        above = average is not None and self.candles.current.close > average
+        self.target(10 if above else 0)
+
+    def signals(self, data: pd.DataFrame) -> np.ndarray:
+        close = data["close"]
+        return np.where(close > close.rolling(10).mean(), 10.0, 0.0)
+
+class LateSignals(AboveAverage):
+    """
+    Signals a candle later than it trades.
+    """
+    def signals(self, data: pd.DataFrame) -> np.ndarray:
+        return np.roll(super().signals(data), 1)
+
+@pytest.mark.parametrize("symbols", [1, 2])
+def test_verify_vectorized_matches_event_run(symbols):
+    data = {f"S{n}": make_ohlcv(300, seed=n) for n in range(symbols)}
+    if symbols == 1:
+        data = data["S0"]
+
+    curves = verify_vectorized(AboveAverage, data, commission=0.001)
+
+    assert len(curves) == 300
+    assert (curves["event"] != curves["event"].iloc[0]).any()
+
+def test_verify_vectorized_refuses_mismatched_signals(ohlcv):
+    with pytest.raises(AssertionError):
+        verify_vectorized(LateSignals, ohlcv)
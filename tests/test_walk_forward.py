@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from conftest import make_ohlcv
+from handlers import StrategyBase
+from indicators import SMA
+from engine import Engine
+from walk_forward import walk_forward
+from sweep import sweep, _worker
+
+DAILY = make_ohlcv(30, freq="D", start="2020-01-01")
+HOURLY = make_ohlcv(24 * 12, freq="h", start="2020-01-31 05:00", seed=1)
+
+class DailyTrend(StrategyBase):
+    """
+    Holds 10 shares while the close is above a daily average whose
+    back data ends before the hourly data starts.
+    """
+    def __init__(self, period: int) -> None:
+        super().__init__()
+        self.indicators["daily"] = SMA(period, data=DAILY)
+
+    def on_candle(self) -> None:
+        average = self.indicators["daily"].value
+        self.target(10 if self.candles.current.close > average else 0)
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_refit_folds_start_after_back_data(processes):
+    window, step = 24 * 3, 24 * 2
+
+    folds, equity = walk_forward(
+        DailyTrend, {"period": [3, 5]}, HOURLY, window, step,
+        refit=True, processes=processes
+    )
+
+    assert len(folds) == 5
+    assert equity.index[-1] == HOURLY.index[-1]
+
+    # each fold is scored on a fresh run over only its own rows
+    for _, fold in folds.iterrows():
+        start = HOURLY.index.get_loc(fold["train_start"])
+        end = HOURLY.index.get_loc(fold["test_end"]) + 1
+
+        strategy = DailyTrend(period=int(fold["period"]))
+        engine = Engine()
+        engine.load_data(HOURLY.iloc[start:end])
+        engine.load_strategy(strategy)
+        engine.run()
+
+        test = strategy.broker.portfolio.equity_curve.iloc[window - 1:]
+        assert fold["test_score"] == pytest.approx(
+            test.iloc[-1] / test.iloc[0] - 1
+        )
+
+def test_sweep_in_process_keeps_no_data():
+    sweep(DailyTrend, {"period": [3]}, HOURLY, processes=1)
+    assert _worker == {}
+
+    # one set of parameters runs in this process, on a SharedFrame that
+    # is unlinked once the walk forward is done
+    walk_forward(
+        DailyTrend, {"period": [3]}, HOURLY, 24 * 3, 24 * 2,
+        refit=True, processes=2
+    )
+    assert _worker == {}
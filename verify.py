@@ -0,0 +1,123 @@
+from __future__ import annotations
+from collections.abc import Callable, Mapping
+import numpy as np
+import pandas as pd
+from handlers import StrategyBase, Broker, Portfolio
+from engine import Engine
+
+def verify_vectorized(
+    strategy_factory: Callable[[], StrategyBase],
+    data: pd.DataFrame | Mapping[str, pd.DataFrame],
+    cash: float = 100_000.0,
+    commission: float = 0.0,
+    rtol: float = 1e-9,
+    atol: float = 1e-6
+) -> pd.DataFrame:
+    """
+    Checks that a strategy gives the same results when run candle by
+    candle as when run vectorized with Engine.run_vectorized(), so its
+    signals() can be trusted to match its on_candle().
+
+    Each run is given a fresh strategy and engine. The equity curves
+    must match at every datetime, and the trades must match in
+    datetime, symbol, quantity and price.
+
+    Args:
+        strategy_factory (Callable[[], StrategyBase]): Makes a new
+            strategy for each run, ie. the StrategyBase subclass itself.
+        data (pd.DataFrame | Mapping[str, pd.DataFrame]): The data both
+            runs are tested on, or the data of each symbol.
+        cash (float, optional): The starting cash of both runs.
+            Defaults to 100,000.
+        commission (float, optional): The fee charged on every trade as
+            a fraction of its value. Defaults to 0.
+        rtol (float, optional): The relative tolerance of the check.
+            Defaults to 1e-9.
+        atol (float, optional): The absolute tolerance of the check.
+            Defaults to 1e-6.
+
+    Raises:
+        AssertionError: The runs differ, the message says where first.
+
+    Returns:
+        pd.DataFrame: The equity curve of each run and the difference
+            between them, indexed by datetime.
+    """
+    event = _engine(strategy_factory, data, cash, commission)
+    event.run()
+
+    vectorized = _engine(strategy_factory, data, cash, commission)
+    vectorized.run_vectorized()
+
+    event, vectorized = event.broker.portfolio, vectorized.broker.portfolio
+    curves = pd.DataFrame({
+        "event": event.equity_curve,
+        "vectorized": vectorized.equity_curve
+    })
+    curves["difference"] = curves["vectorized"] - curves["event"]
+
+    mismatched = ~np.isclose(
+        curves["event"], curves["vectorized"], rtol=rtol, atol=atol
+    )
+    if mismatched.any():
+        row = curves[mismatched].iloc[0]
+        raise AssertionError(
+            f"Equity differs first at {row.name}: event {row['event']} | "
+            f"vectorized {row['vectorized']}"
+        )
+
+    event_fills = _sorted_fills(event)
+    vectorized_fills = _sorted_fills(vectorized)
+
+    if len(event_fills) != len(vectorized_fills):
+        raise AssertionError(
+            f"Event run made {len(event_fills)} trades | "
+            f"Vectorized run made {len(vectorized_fills)}"
+        )
+
+    mismatched = (
+        (event_fills.index != vectorized_fills.index) |
+        (event_fills["symbol"].to_numpy() !=
+            vectorized_fills["symbol"].to_numpy())
+    )
+    for column in ("quantity", "price"):
+        mismatched |= ~np.isclose(
+            event_fills[column], vectorized_fills[column],
+            rtol=rtol, atol=atol
+        )
+
+    if mismatched.any():
+        i = np.flatnonzero(mismatched)[0]
+        raise AssertionError(
+            f"Trades differ first at trade {i}: "
+            f"event {event_fills.iloc[i].to_dict()} at "
+            f"{event_fills.index[i]} | vectorized "
+            f"{vectorized_fills.iloc[i].to_dict()} at "
+            f"{vectorized_fills.index[i]}"
+        )
+
+    return curves
+
+def _engine(
+    strategy_factory: Callable[[], StrategyBase],
+    data: pd.DataFrame | Mapping[str, pd.DataFrame],
+    cash: float,
+    commission: float
+) -> Engine:
+    """
+    An engine loaded with the data, a new strategy and a new portfolio.
+    """
+    engine = Engine()
+    engine.broker = Broker(Portfolio(cash, commission))
+    engine.load_data(data)
+    engine.load_strategy(strategy_factory())
+    return engine
+
+def _sorted_fills(portfolio: Portfolio) -> pd.DataFrame:
+    """
+    The trades of a portfolio ordered by datetime then symbol, the
+    order the two runs can be compared in.
+    """
+    fills = portfolio.fills
+    order = np.lexsort((fills["symbol"].astype(str), fills.index.asi8))
+    return fills.iloc[order]
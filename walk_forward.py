@@ -0,0 +1,248 @@
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Mapping
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from handlers import StrategyBase
+from data import SharedFrame, IndicatorCache, get_frequency
+from sweep import sweep
+
+def walk_forward(
+    strategy_factory: Callable[..., StrategyBase],
+    param_grid: Mapping[str, Iterable] | Iterable[Mapping],
+    data: pd.DataFrame | SharedFrame,
+    window: int | timedelta,
+    step: int | timedelta,
+    score: Callable[[pd.Series], float] = None,
+    anchored: bool = False,
+    refit: bool = False,
+    processes: int = None,
+    chunksize: int = None,
+    cache: IndicatorCache = None
+) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Walk-forward optimisation of a strategy's parameters. The data is
+    split into folds that each train on `window` candles and test on
+    the `step` candles after them, moving forward by `step` each fold.
+    The parameters that score best over a fold's training window are
+    the ones tested on its test window.
+
+    By default, rather than running the strategy again for every fold,
+    each set of parameters is run once over the whole data with
+    sweep(), spread over a pool of processes, and the folds are scored
+    on slices of the equity curve of that run. Indicators therefore
+    stay warm from one window to the next, and the whole optimisation
+    costs one pass over the data per set of parameters.
+
+    This is not a fit of each fold on its own. The training score of a
+    set of parameters is taken from a run that started at the first
+    candle, so the positions and indicator values it carries into the
+    training window, from data before it, count towards that score.
+    Likewise the test window is traded with the positions the picked
+    parameters held at its start in that run, as a live strategy whose
+    parameters are switched without closing its positions would be.
+    Folds are still only scored on data up to the end of their test
+    window, so nothing is seen ahead of time.
+
+    With `refit` each fold is fitted on its own instead. Every set of
+    parameters is run from a fresh strategy at the start of the fold's
+    training window through to the end of its test window, picked by
+    its score over the training window, and tested on the rest of the
+    same run, so the test window starts with the state warmed up over
+    the training window. This costs one pass over every fold's windows
+    per set of parameters. The workers take each fold's rows from a
+    SharedFrame of the data, so data given as a dataframe is published
+    into shared memory until the optimisation is done.
+
+    Args:
+        strategy_factory (Callable[..., StrategyBase]): Called with the
+            parameters of a run as keyword arguments to make its
+            strategy, ie. the StrategyBase subclass itself.
+        param_grid (Mapping[str, Iterable] | Iterable[Mapping]): Either
+            the values to try for each parameter, where every
+            combination is run, or the parameters of each run.
+        data (pd.DataFrame | SharedFrame): The data to walk forward
+            through.
+        window (int | timedelta): The length of each training window,
+            in candles or as a duration.
+        step (int | timedelta): The length of each test window, and how
+            far each fold moves forward, in candles or as a duration.
+        score (Callable[[pd.Series], float], optional): Scores the
+            equity curve of a window, starting from the equity before
+            its first candle, higher is better. Defaults to None, which
+            scores the total return of the window.
+        anchored (bool, optional): Whether every training window starts
+            at the first candle and grows by `step` each fold, instead
+            of sliding along. Defaults to False.
+        refit (bool, optional): Whether each fold is fitted with runs
+            of its own, starting at its training window. Defaults to
+            False, which scores every fold on one run over the data.
+        processes (int, optional): Number of worker processes. Defaults
+            to None, which uses every core. 1 runs in this process.
+        chunksize (int, optional): Number of runs sent to a worker at a
+            time. Defaults to None, see sweep().
+        cache (IndicatorCache, optional): Shared by the runs, see
+            sweep(). Defaults to None.
+
+    Raises:
+        ValueError: The window or step is shorter than a candle, or the
+            data is too short for one fold.
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: One row per fold with the start
+            and end datetimes of its training and test windows, the
+            parameters picked and their training and test scores, and
+            the equity curve of trading each fold's test window with its
+            picked parameters, chained together from the equity of the
+            first fold's run before its test window.
+    """
+    frame = data.frame if isinstance(data, SharedFrame) else data
+    index = frame.index
+
+    window = _candles(window, frame)
+    step = _candles(step, frame)
+
+    folds = [
+        (0 if anchored else start, start + window, start + window + step)
+        for start in range(0, len(index) - window, step)
+    ]
+
+    if not folds:
+        raise ValueError(
+            f"Data of {len(index)} candles is too short for a training "
+            f"window of {window} candles and a test window"
+        )
+
+    score = score or _total_return
+    offset = 0
+
+    if not refit:
+        results, curves = _sweep(
+            strategy_factory, param_grid, data, index, processes,
+            chunksize, cache
+        )
+
+    # the folds are sent the data once and slice their rows from it
+    published = (
+        refit and processes != 1 and not isinstance(data, SharedFrame)
+    )
+    if published:
+        data = SharedFrame.publish(frame)
+
+    rows = []
+    chained = []
+    equity = None
+
+    try:
+        for fold, (train_start, train_end, test_end) in enumerate(folds):
+            test_end = min(test_end, len(index))
+
+            if refit:
+                results, curves = _sweep(
+                    strategy_factory, param_grid, data,
+                    index[train_start:test_end], processes, chunksize,
+                    cache, slice(train_start, test_end)
+                )
+                offset = train_start
+
+            train_scores = [
+                score(_window(c, train_start - offset, train_end - offset))
+                for c in curves
+            ]
+            best = int(np.nanargmax(train_scores))
+            test = _window(
+                curves[best], train_end - offset, test_end - offset
+            )
+
+            if equity is None:
+                equity = test.iloc[0]
+
+            # the test window's own returns, from where the last one ended
+            growth = test.iloc[1:].to_numpy() / test.iloc[0]
+            chained.append(pd.Series(equity * growth, index=test.index[1:]))
+            equity *= growth[-1]
+
+            rows.append({
+                "fold": fold,
+                "train_start": index[train_start],
+                "train_end": index[train_end - 1],
+                "test_start": index[train_end],
+                "test_end": index[test_end - 1],
+                **{
+                    n: results[n].iloc[best]
+                    for n in results.columns if n != "equity"
+                },
+                "train_score": train_scores[best],
+                "test_score": score(test)
+            })
+    finally:
+        if published:
+            data.unlink()
+
+    return pd.DataFrame(rows), pd.concat(chained).rename("equity")
+
+def _sweep(
+    strategy_factory: Callable[..., StrategyBase],
+    param_grid: Mapping[str, Iterable] | Iterable[Mapping],
+    data: pd.DataFrame | SharedFrame,
+    index: pd.DatetimeIndex,
+    processes: int,
+    chunksize: int,
+    cache: IndicatorCache,
+    rows: slice = None
+) -> tuple[pd.DataFrame, list[pd.Series]]:
+    """
+    Runs every set of parameters over the data, or the given rows of
+    it, with sweep(), returning its results and the equity curve of
+    each run.
+    """
+    results = sweep(
+        strategy_factory, param_grid, data, _equity_curve, processes,
+        chunksize, cache, rows
+    )
+    curves = [
+        pd.Series(curve, index=index, name="equity")
+        for curve in results["equity"]
+    ]
+
+    return results, curves
+
+def _candles(length: int | timedelta, data: pd.DataFrame) -> int:
+    """
+    A length in candles of the data, given in candles or as a duration.
+
+    Raises:
+        ValueError: The length is shorter than one candle.
+    """
+    if isinstance(length, timedelta):
+        frequency = pd.Timedelta(get_frequency(data))
+        candles = int(pd.Timedelta(length) // frequency)
+    else:
+        candles = int(length)
+
+    if candles < 1:
+        raise ValueError(
+            f"Window and step must be at least one candle | Actual: {length}"
+        )
+
+    return candles
+
+def _window(curve: pd.Series, start: int, end: int) -> pd.Series:
+    """
+    The equity curve of rows start to end, starting from the equity
+    before row start when there is a row before it.
+    """
+    return curve.iloc[max(start - 1, 0):end]
+
+def _total_return(equity: pd.Series) -> float:
+    """
+    The default score, the return over the window.
+    """
+    return float(equity.iloc[-1] / equity.iloc[0] - 1)
+
+def _equity_curve(strategy: StrategyBase) -> dict:
+    """
+    Records the equity curve of a run of the sweep, one value for each
+    candle of the data.
+    """
+    return {"equity": strategy.broker.portfolio.equity_curve.to_numpy()}